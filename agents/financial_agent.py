@@ -1,7 +1,10 @@
 import anthropic
 import json
 import config
-from tools.data_fetcher import get_stock_data, format_large_number
+from tools.data_fetcher import get_stock_data, get_fundamentals, format_large_number
+from tools.peer_groups import peer_comparison, format_peer_summary
+from tools.xbrl_facts import get_financial_trends, format_trends_summary
+from tools.risk_metrics import format_risk_summary
 
 client = anthropic.Anthropic(api_key=config.ANTHROPIC_API_KEY)
 
@@ -19,6 +22,22 @@ def run_financial_agent(ticker: str) -> dict:
     if raw_data.get("status") == "failed":
         return {"error": raw_data.get("error"), "status": "failed"}
 
+    # Peers: sector tables are shared across tickers, so usually a cache hit
+    try:
+        raw_data["peers"] = peer_comparison(
+            ticker, get_fundamentals(ticker), return_1y=raw_data["performance"]["1_year"] / 100
+        )
+    except Exception as e:
+        print(f"  [Agent 1/4] Peer comparison unavailable: {e}")
+        raw_data["peers"] = {"error": str(e), "status": "failed"}
+
+    # Multi-year line items from SEC XBRL (cached per CIK)
+    try:
+        raw_data["trends"] = get_financial_trends(ticker)
+    except Exception as e:
+        print(f"  [Agent 1/4] SEC trend data unavailable: {e}")
+        raw_data["trends"] = {"error": str(e), "status": "failed"}
+
     # Step 2: Format financials for Claude
     fin = raw_data["financials"]
     perf = raw_data["performance"]
@@ -57,6 +76,15 @@ FINANCIAL HEALTH:
 - Dividend Yield: {fin['dividend_yield']}
 
 VOLATILITY: {raw_data['volatility_annualized_pct']}% annualized
+
+MULTI-YEAR TRENDS (SEC 10-K XBRL):
+{format_trends_summary(raw_data['trends'])}
+
+PEER COMPARISON (percentile 0-100 within peers; for P/E higher = pricier):
+{format_peer_summary(raw_data['peers'])}
+
+RISK (last {raw_data.get('risk', {}).get('lookback_days', 'N/A')} trading days):
+{format_risk_summary(raw_data.get('risk'))}
 """
 
     # Step 3: Claude analyzes the fundamentals
@@ -67,11 +95,12 @@ Analyze the following fundamental data for {ticker} and provide a concise assess
 
 Provide your analysis in this exact JSON format:
 {{
-    "valuation_assessment": "one sentence on whether stock is cheap/fair/expensive",
+    "valuation_assessment": "one sentence on whether stock is cheap/fair/expensive relative to peers",
     "financial_health_score": "1-10 score with one sentence explanation",
-    "growth_outlook": "one sentence on growth prospects",
+    "growth_outlook": "one sentence on growth prospects, using the multi-year trend",
     "key_strengths": ["strength 1", "strength 2", "strength 3"],
     "key_concerns": ["concern 1", "concern 2"],
+    "risk_assessment": "one sentence on the measured risk profile (volatility, drawdown, beta)",
     "fundamental_signal": "BULLISH or BEARISH or NEUTRAL",
     "fundamental_confidence": 0.0,
     "analyst_summary": "2-3 sentence overall fundamental assessment"
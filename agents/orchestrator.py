@@ -14,6 +14,7 @@ Public API (drop-in for existing code):
     run_orchestrator(ticker, profile)          ← sync + personalised
     run_orchestrator_async(ticker, profile)    ← native async for FastAPI
     stream_analysis(ticker, profile)           ← async generator for SSE
+    run_screen_async(query, profile, n)        ← "top N for me": screen → analyze shortlist
 """
 
 import asyncio
@@ -29,6 +30,9 @@ from agents.financial_agent import run_financial_agent
 from agents.sentiment_agent import run_sentiment_agent
 from agents.technical_agent import run_technical_agent
 from agents.rag_agent import run_rag_agent
+from tools.screener import screen, parse_screen_query
+from tools.risk_metrics import format_risk_summary
+from tools.dca_simulator import simulate_dca, format_dca_summary
 
 client   = anthropic.Anthropic(api_key=config.ANTHROPIC_API_KEY)
 _pool    = ThreadPoolExecutor(max_workers=8)
@@ -80,7 +84,8 @@ class UserProfile:
 
     def cache_key(self, ticker: str) -> str:
         # Different profiles get different cached synthesis
-        return f"{ticker}:{self.experience}:{self.risk_tolerance}"
+        # (budget included: position sizing and the DCA simulation depend on it)
+        return f"{ticker}:{self.experience}:{self.risk_tolerance}:{self.monthly_investable}"
 
 
 # ── Async wrappers for sync agents ────────────────────────────────────────────
@@ -104,6 +109,16 @@ async def _run_technical(ticker: str, price_history) -> dict:
     return await loop.run_in_executor(_pool, run_technical_agent, ticker, price_history)
 
 
+def _simulate_dca(price_history, profile: UserProfile) -> dict:
+    if price_history is None or getattr(price_history, "empty", True):
+        return {"error": "No price history", "status": "failed"}
+    try:
+        return simulate_dca(price_history["Close"], profile.monthly_investable)
+    except Exception as e:
+        print(f"[Orchestrator] DCA simulation FAILED: {e}")
+        return {"error": str(e), "status": "failed"}
+
+
 # ── Synthesis prompt ───────────────────────────────────────────────────────────
 
 def _build_prompt(
@@ -111,6 +126,7 @@ def _build_prompt(
     results: dict,
     signals: dict,
     profile: UserProfile,
+    dca:     Optional[dict] = None,
 ) -> str:
     fin     = results["financial"].get("analysis", {})
     sent    = results["sentiment"].get("analysis", {})
@@ -191,6 +207,12 @@ Sentiment:    {sent.get("news_summary",    "N/A")}
 Technical:    {tech.get("technical_summary","N/A")}
 SEC Filings:  {rag.get("sec_summary",      "N/A")}
 
+MEASURED RISK (from price history — use these, don't estimate):
+{format_risk_summary(raw.get("risk"))}
+
+DCA SIMULATION (resampled history, not a forecast — ground position_sizing in it):
+{format_dca_summary(dca)}
+
 STRENGTHS:  {fin.get("key_strengths",        [])}
 CONCERNS:   {fin.get("key_concerns",         [])}
 RISKS:      {rag.get("key_risk_factors",     [])}
@@ -279,7 +301,8 @@ async def run_orchestrator_async(
     print(f"[Orchestrator] Signals: {signals}")
 
     # ── Phase 4: synthesis with user profile ──────────────────────────────────
-    prompt   = _build_prompt(ticker, results, signals, profile)
+    dca      = _simulate_dca(price_history, profile)
+    prompt   = _build_prompt(ticker, results, signals, profile, dca)
     response = client.messages.create(
         model      = config.MODEL,
         max_tokens = config.MAX_TOKENS,
@@ -300,6 +323,8 @@ async def run_orchestrator_async(
         "company_name":  raw_data.get("company",    {}).get("name",          ticker),
         "current_price": raw_data.get("financials", {}).get("current_price", "N/A"),
         "signals":       signals,
+        "risk_metrics":  raw_data.get("risk", {}),
+        "dca_simulation": dca,
         "recommendation": recommendation,
         "agent_results": results,
         "elapsed_seconds": elapsed,
@@ -310,6 +335,7 @@ async def run_orchestrator_async(
             "experience":    profile.experience,
             "goal":          profile.goal,
             "risk_tolerance": profile.risk_tolerance,
+            "monthly_investable": profile.monthly_investable,
         },
     }
 
@@ -323,6 +349,66 @@ async def run_orchestrator_async(
     return final
 
 
+# ── Screener: "top N stocks for me" ───────────────────────────────────────────
+
+async def run_screen_async(
+    query:   str = "",
+    profile: Optional[UserProfile] = None,
+    n:       Optional[int] = None,
+    analyze: bool = True,
+    max_analyses: Optional[int] = None,
+) -> dict:
+    """
+    Rank the local universe for the profile (numbers only, no LLM), then run
+    the full agent pipeline on the shortlist alone — concurrently.
+    The query can override the profile: "3 safe dividend stocks, $100/month".
+    max_analyses caps the agent runs (remaining usage quota); the rest of the
+    shortlist is returned ranked but not analysed.
+    """
+    start  = time.time()
+    base   = profile or UserProfile()
+    parsed = parse_screen_query(query)
+    profile = UserProfile(
+        experience         = base.experience,
+        goal               = parsed.get("goal",               base.goal),
+        monthly_investable = parsed.get("monthly_investable", base.monthly_investable),
+        risk_tolerance     = parsed.get("risk_tolerance",     base.risk_tolerance),
+        user_id            = base.user_id,
+    )
+    n = max(1, min(n or parsed.get("n") or config.SCREENER_DEFAULT_N, config.SCREENER_MAX_N))
+
+    loop = asyncio.get_event_loop()
+    shortlist = await loop.run_in_executor(
+        _pool, lambda: screen(profile.risk_tolerance, profile.goal, n)
+    )
+    print(f"[Orchestrator] Screen {profile.risk_tolerance}/{profile.goal}: "
+          f"{[c['ticker'] for c in shortlist]}")
+
+    analyses = {}
+    to_analyze = shortlist if max_analyses is None else shortlist[:max(0, max_analyses)]
+    if analyze and to_analyze:
+        reports = await asyncio.gather(
+            *(run_orchestrator_async(c["ticker"], profile) for c in to_analyze),
+            return_exceptions=True,
+        )
+        for c, r in zip(to_analyze, reports):
+            if isinstance(r, Exception):
+                print(f"[Orchestrator] screen {c['ticker']} FAILED: {r}")
+                analyses[c["ticker"]] = {"status": "failed", "error": str(r)}
+            else:
+                analyses[c["ticker"]] = r
+
+    return {
+        "query":     query,
+        "criteria":  {"n": n, "goal": profile.goal, "risk_tolerance": profile.risk_tolerance,
+                      "monthly_investable": profile.monthly_investable},
+        "shortlist": shortlist,
+        "analyses":  analyses,
+        "elapsed_seconds": round(time.time() - start, 1),
+        "status":    "success",
+    }
+
+
 # ── Streaming generator for SSE ───────────────────────────────────────────────
 
 async def stream_analysis(
@@ -393,7 +479,8 @@ async def stream_analysis(
     yield json.dumps({"type": "signals", "data": signals})
 
     # Phase 3: streaming synthesis
-    prompt    = _build_prompt(ticker, results, signals, profile)
+    dca       = _simulate_dca(price_history, profile)
+    prompt    = _build_prompt(ticker, results, signals, profile, dca)
     full_text = ""
 
     with client.messages.stream(
@@ -416,6 +503,8 @@ async def stream_analysis(
         "company_name":  raw_data.get("company",    {}).get("name",          ticker),
         "current_price": raw_data.get("financials", {}).get("current_price", "N/A"),
         "signals":       signals,
+        "risk_metrics":  raw_data.get("risk", {}),
+        "dca_simulation": dca,
         "recommendation": recommendation,
         "agent_results": results,
         "errors":        errors,
@@ -425,6 +514,7 @@ async def stream_analysis(
             "experience":    profile.experience,
             "goal":          profile.goal,
             "risk_tolerance": profile.risk_tolerance,
+            "monthly_investable": profile.monthly_investable,
         },
     }
 
@@ -3,6 +3,7 @@ import json
 import config
 from tools.data_fetcher import get_stock_data
 from tools.technical_indicators import calculate_indicators
+from tools.price_store import indicator_values
 
 client = anthropic.Anthropic(api_key=config.ANTHROPIC_API_KEY)
 
@@ -12,7 +13,8 @@ def run_technical_agent(ticker: str, price_history=None) -> dict:
         if price_history is None:
             raw_data = get_stock_data(ticker)
             price_history = raw_data["price_history"]
-        indicators = calculate_indicators(price_history)
+        # O(1) incremental snapshot when it lines up with this history
+        indicators = calculate_indicators(price_history, raw=indicator_values(ticker, price_history))
         if indicators.get("status") == "failed":
             return {"error": indicators.get("error"), "status": "failed"}
         tech_summary = f"""
@@ -25,8 +27,15 @@ Volume Ratio: {indicators["volume"]["ratio"]}x
 Signals: {indicators["bullish_count"]} bullish, {indicators["bearish_count"]} bearish
 Overall: {indicators["overall_signal"]}
 """
+        for name, tf in indicators.get("timeframes", {}).items():
+            tech_summary += (
+                f"{name.capitalize()} ({tf['bars']} bars): RSI {tf['rsi']} | "
+                f"MACD Histogram {tf['macd']['histogram']} | Bollinger Position {tf['bb_position_pct']}% | "
+                f"Trend vs SMA 20: {tf['trend']} | "
+                f"{tf['bullish_count']} bullish, {tf['bearish_count']} bearish\n"
+            )
         prompt = f"""You are a technical analyst with 20 years of experience.
-Analyze these technical indicators for {ticker}.
+Analyze these technical indicators for {ticker} (daily, plus weekly and monthly context).
 
 {tech_summary}
 
@@ -39,6 +48,7 @@ Provide your analysis in this exact JSON format:
     "technical_signal": "BULLISH or BEARISH or NEUTRAL",
     "technical_confidence": 0.0,
     "key_levels_to_watch": ["level 1", "level 2"],
+    "timeframe_alignment": "one sentence on whether daily, weekly and monthly trends agree",
     "technical_summary": "2-3 sentence overall technical assessment"
 }}
 Return ONLY the JSON, no other text."""
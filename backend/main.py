@@ -4,6 +4,10 @@ Changes from previous version:
   - POST /profile now also updates profiles.onboarding_complete = True (fix: onboarding showing every time)
   - FREE_TIER_DAILY_LIMIT default changed from 3 to 20
   - Hardcoded stock list removed — search uses live yfinance only
+  - /search served from the in-process symbol index; yfinance only on a miss
+  - GET /watchlist/analytics — correlation, volatility, beta, drawdown of the watchlist
+  - POST /screen — "top N stocks for me": local screen, then analysis of the shortlist
+  - GET /filings/search — semantic search across every indexed company's SEC filings
 """
 
 from fastapi import FastAPI, HTTPException, Depends, Request
@@ -11,6 +15,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from contextlib import asynccontextmanager
+from typing import Optional
+from datetime import date
 import sys, os, asyncio, json
 from concurrent.futures import ThreadPoolExecutor
 
@@ -18,6 +24,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from agents.orchestrator import (
     run_orchestrator_async,
+    run_screen_async,
     stream_analysis,
     UserProfile,
 )
@@ -27,8 +34,14 @@ from backend.auth import (
     increment_usage,
     log_analysis,
     supabase,
+    FREE_TIER_DAILY_LIMIT,
 )
 from backend.payments import create_checkout_session, create_portal_session, handle_webhook
+from tools.ticker_index import search_tickers, ensure_index_fresh
+from tools.indicator_engine import evaluate, CHART_OVERLAYS
+from tools.screener import build_feature_matrix, ensure_feature_matrix, FeatureMatrixUnavailable
+from tools.portfolio import watchlist_analytics
+from tools.vector_store import search_filings, warm_topic_embeddings
 
 
 # ── Background scheduler ───────────────────────────────────────────────────────
@@ -59,8 +72,19 @@ async def _watchlist_refresh():
         print(f"[Scheduler] Job failed: {e}")
 
 
+async def _screener_refresh():
+    print("[Scheduler] Rebuilding screener feature matrix...")
+    try:
+        await asyncio.get_event_loop().run_in_executor(executor, build_feature_matrix)
+    except Exception as e:
+        print(f"[Scheduler] Screener rebuild failed: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    ensure_index_fresh()   # build the search index in the background at boot
+    ensure_feature_matrix()   # first boot only: screener data until the 07:00 rebuild
+    asyncio.get_event_loop().run_in_executor(executor, warm_topic_embeddings)   # RAG topic vectors
     if _scheduler_available:
         scheduler = AsyncIOScheduler()
         scheduler.add_job(
@@ -69,8 +93,14 @@ async def lifespan(app: FastAPI):
             id="watchlist_refresh",
             replace_existing=True,
         )
+        scheduler.add_job(
+            _screener_refresh,
+            CronTrigger(hour=7, minute=0),
+            id="screener_refresh",
+            replace_existing=True,
+        )
         scheduler.start()
-        print("[Scheduler] Started — watchlist refresh at 07:30 UTC daily")
+        print("[Scheduler] Started — screener rebuild 07:00, watchlist refresh 07:30 UTC daily")
         yield
         scheduler.shutdown()
     else:
@@ -106,6 +136,11 @@ class ProfileRequest(BaseModel):
 class WatchlistRequest(BaseModel):
     ticker: str
 
+class ScreenRequest(BaseModel):
+    query:   str = ""             # e.g. "top 5 dividend stocks, $300/month"
+    n:       Optional[int] = None
+    analyze: bool = True          # False → ranked shortlist only, no agent runs
+
 
 # ── Helpers ────────────────────────────────────────────────────────────────────
 
@@ -131,13 +166,19 @@ def health():
     return {"status": "healthy"}
 
 
-# ── Search — live yfinance only, hardcoded list removed ───────────────────────
+# ── Search — in-process index, live yfinance fallback ─────────────────────────
 
 @app.get("/search")
 async def search_stocks(q: str = ""):
-    """Search any publicly listed stock globally using yfinance live search."""
+    """
+    Type-ahead search. Answered from the in-memory SEC/ETF symbol index;
+    falls back to yfinance live search only when the index has no match.
+    """
     if not q or len(q) < 1:
         return []
+    results = search_tickers(q)
+    if results:
+        return results
     try:
         import yfinance as yf
         search  = yf.Search(q, max_results=10, enable_fuzzy_query=True)
@@ -162,24 +203,62 @@ async def search_stocks(q: str = ""):
 
 # ── Chart ──────────────────────────────────────────────────────────────────────
 
+# Overlays (SMA-200, Bollinger, ...) need bars before the first visible one.
+# With overlays requested the chart downloads a longer period at the same
+# interval — at least 200 extra bars — computes, then cuts back to the
+# visible window. MAX has no earlier history to add.
+CHART_WARMUP_PERIOD = {"1D":"5d","1W":"3mo","1M":"1y","3M":"2y","6M":"2y","1Y":"2y","5Y":"10y","MAX":"max"}
+CHART_VISIBLE       = {"1W":{"days":7},"1M":{"months":1},"3M":{"months":3},"6M":{"months":6},
+                       "1Y":{"years":1},"5Y":{"years":5}}
+
+
+def _visible_bars(index, period: str) -> int:
+    """Position of the first bar inside the visible window of `period`."""
+    import pandas as pd
+    if period == "MAX":
+        return 0
+    if period == "1D":                       # the latest session only
+        return int(index.searchsorted(index[-1].normalize()))
+    return int(index.searchsorted(index[-1] - pd.DateOffset(**CHART_VISIBLE[period]), side="right"))
+
+
 @app.get("/chart/{ticker}")
-async def get_chart_data(ticker: str, period: str = "1M"):
+async def get_chart_data(ticker: str, period: str = "1M", overlays: str = ""):
+    """
+    OHLCV for the chart. `overlays` is a comma list from CHART_OVERLAYS
+    (e.g. "sma_20,bb_upper,bb_lower"); only those series are computed.
+    """
+    requested = [o.strip() for o in overlays.split(",") if o.strip()]
+    unknown   = [o for o in requested if o not in CHART_OVERLAYS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown overlays: {unknown}")
     try:
         import yfinance as yf
         period_map   = {"1D":"1d","1W":"5d","1M":"1mo","3M":"3mo","6M":"6mo","1Y":"1y","5Y":"5y","MAX":"max"}
         interval_map = {"1D":"5m","1W":"1h","1M":"1d","3M":"1d","6M":"1d","1Y":"1d","5Y":"1wk","MAX":"1mo"}
+        key  = period if period in period_map else "1M"
         hist = yf.Ticker(ticker.upper()).history(
-            period   = period_map.get(period, "1mo"),
-            interval = interval_map.get(period, "1d"),
+            period   = CHART_WARMUP_PERIOD[key] if requested else period_map[key],
+            interval = interval_map[key],
         )
         if hist.empty:
             raise HTTPException(status_code=404, detail="No data found")
+        series = {}
+        if requested:
+            series = evaluate({"close": hist["Close"].to_numpy()},
+                              {o: CHART_OVERLAYS[o] for o in requested}, last_only=False)
+            visible = _visible_bars(hist.index, key)
+            hist    = hist.iloc[visible:]
+            series  = {name: values[visible:] for name, values in series.items()}
         data = [
             {"date": str(d), "close": round(float(r["Close"]),2),
              "open": round(float(r["Open"]),2), "high": round(float(r["High"]),2),
              "low": round(float(r["Low"]),2), "volume": int(r["Volume"])}
             for d, r in hist.iterrows()
         ]
+        for name, values in series.items():
+            for point, v in zip(data, values):
+                point[name] = round(float(v), 2) if v == v else None
         first, last = data[0]["close"], data[-1]["close"]
         chg = round(((last - first) / first) * 100, 2) if first else 0
         return {"ticker": ticker.upper(), "period": period, "data": data,
@@ -229,6 +308,44 @@ async def analyze_stock(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ── Screen ─────────────────────────────────────────────────────────────────────
+
+@app.post("/screen")
+async def screen_stocks(
+    request: ScreenRequest,
+    current_user=Depends(get_current_user),
+):
+    quota = None
+    usage = check_usage_limit(current_user.id)          # both paths: ranking isn't free either
+    if request.analyze and usage.get("tier") == "free":
+        # every shortlisted ticker is a full analysis — only run what's left today
+        quota = FREE_TIER_DAILY_LIMIT - usage.get("analyses_today", 0)
+    profile = await _load_profile(current_user.id)
+
+    try:
+        result = await run_screen_async(request.query, profile, request.n, request.analyze,
+                                        max_analyses=quota)
+    except FeatureMatrixUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    for ticker, analysis in result["analyses"].items():
+        if analysis.get("status") != "success":
+            continue
+        if not analysis.get("from_cache"):
+            increment_usage(current_user.id)
+            log_analysis(
+                user_id        = current_user.id,
+                ticker         = ticker,
+                recommendation = analysis["recommendation"]["recommendation"],
+                confidence     = analysis["recommendation"]["confidence_score"],
+                elapsed        = analysis["elapsed_seconds"],
+            )
+        analysis.get("agent_results", {}).get("financial", {}).get("raw_data", {}).pop("price_history", None)
+    return result
+
+
 # ── Analyze stream ─────────────────────────────────────────────────────────────
 
 @app.post("/analyze/stream")
@@ -395,6 +512,54 @@ async def watchlist_brief(current_user=Depends(get_current_user)):
     return {"items": items, "count": len(items)}
 
 
+@app.get("/watchlist/analytics")
+async def watchlist_portfolio(current_user=Depends(get_current_user)):
+    try:
+        resp    = supabase.table("watchlist").select("ticker").eq(
+            "user_id", current_user.id
+        ).execute()
+        tickers = [r["ticker"] for r in (resp.data or [])]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if not tickers:
+        return {"tickers": [], "status": "empty"}
+
+    loop   = asyncio.get_event_loop()
+    result = await loop.run_in_executor(executor, watchlist_analytics, tickers)
+    if result.get("status") != "success":
+        raise HTTPException(status_code=422, detail=result.get("error", "Analytics failed"))
+    return result
+
+
+# ── Filing search ──────────────────────────────────────────────────────────────
+
+@app.get("/filings/search")
+async def filings_search(
+    q: str,
+    tickers: str = "",
+    forms: str = "",
+    since: Optional[str] = None,
+    limit: int = 10,
+    current_user=Depends(get_current_user),
+):
+    """Companies whose filings best match `q`, e.g. "tariff exposure", with passages."""
+    if since:
+        try:
+            date.fromisoformat(since)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="since must be a date (YYYY-MM-DD)")
+    ticker_list = [t.strip() for t in tickers.split(",") if t.strip()]
+    form_list   = [f.strip() for f in forms.split(",") if f.strip()]
+    loop   = asyncio.get_event_loop()
+    result = await loop.run_in_executor(
+        executor, lambda: search_filings(q, ticker_list, form_list, since, max(1, min(limit, 50)))
+    )
+    if result.get("status") != "success":
+        raise HTTPException(status_code=422, detail=result.get("error", "Search failed"))
+    return result
+
+
 # ── Me / History / Payments ────────────────────────────────────────────────────
 
 @app.get("/me")
@@ -17,6 +17,10 @@ MAX_RETRIES = 3           # retry failed agent calls this many times
 DEFAULT_PERIOD = "2y"     # 2 years of historical data
 DEFAULT_INTERVAL = "1d"   # daily candles
 BENCHMARK_TICKER = "SPY"  # S&P 500 ETF as benchmark
+PRICE_STORE_DIR = "./output/prices"   # local daily bars + indicator state
+PRICE_STORE_TTL = 60 * 60             # re-check for new bars after 1 hour
+FUNDAMENTALS_DIR = "./output/fundamentals"
+FUNDAMENTALS_TTL = 24 * 60 * 60       # yfinance info refreshed daily
 
 # ─── Technical Indicators ─────────────────────────────────────
 RSI_PERIOD = 14
@@ -24,17 +28,100 @@ MACD_FAST = 12
 MACD_SLOW = 26
 MACD_SIGNAL = 9
 BBANDS_PERIOD = 20
+RSI_OVERSOLD = 30         # RSI below → BULLISH
+RSI_OVERBOUGHT = 70       # RSI above → BEARISH
+BB_LOWER_PCT = 20         # position in Bollinger band (%) below → BULLISH
+BB_UPPER_PCT = 80         # ... above → BEARISH
+
+# ─── Risk Metrics ─────────────────────────────────────────────
+RISK_LOOKBACK_DAYS = 252          # 1 year of daily returns
+RISK_ROLLING_WINDOW = 21          # rolling volatility window (~1 month)
+RISK_VAR_CONFIDENCE = 0.95        # historical 1-day VaR / CVaR level
+RISK_FREE_RATE = 0.04             # annual, for Sharpe / Sortino
+
+# ─── DCA Simulation ───────────────────────────────────────────
+DCA_MONTHLY_AMOUNTS = {           # UserProfile.monthly_investable → $ per month
+    "under_200": 100,
+    "200_500":   350,
+    "500_plus":  750,
+}
+DCA_HORIZONS_MONTHS = [12, 36, 60]
+DCA_PATHS = 5000
+DCA_SEED = 7                      # fixed → same numbers for the same history
+
+# ─── Backtest ─────────────────────────────────────────────────
+BACKTEST_HORIZONS = [5, 21, 63]   # forward-return windows, trading days
 
 # ─── RAG Settings ─────────────────────────────────────────────
 CHUNK_SIZE = 512          # characters per chunk for SEC filings
 CHUNK_OVERLAP = 50        # overlap between chunks
 TOP_K_RESULTS = 5         # number of chunks to retrieve
 EMBEDDING_MODEL = "all-MiniLM-L6-v2"  # fast, free, runs locally
+EMBEDDING_BACKEND = "torch"           # "torch" | "onnx" | "onnx-int8" — check with python -m tools.embedding_backend
+EMBEDDING_ONNX_INT8_FILE = "onnx/model_quint8_avx2.onnx"   # quantized weights in the model repo
+EMBEDDING_STORE_DTYPE = "float16"     # embedding cache vectors on disk (halves the memmap)
 CHROMA_DB_PATH = "./output/chromadb"
+SEC_GLOBAL_INDEX = False          # one "sec_all" collection with ticker/CIK/form/date metadata
+                                  # instead of sec_{ticker}; re-run python -m tools.ingest --force after switching
+EMBEDDING_CACHE_DIR = "./output/embeddings"   # vectors keyed by chunk-text hash, per model
+EMBEDDING_CACHE_NEAR_DUP_BITS = 3     # simhash distance treated as "same chunk" (0 = exact only)
+EMBEDDING_SERVICE_AUTHKEY = os.getenv("EMBEDDING_SERVICE_AUTHKEY", "").encode()   # no default: unset = service off
+EMBEDDING_SERVICE_ENABLED = bool(EMBEDDING_SERVICE_AUTHKEY)   # use python -m tools.embedding_service when running
+EMBEDDING_SERVICE_SOCKET = os.getenv("EMBEDDING_SERVICE_SOCKET", "./output/embedding_service.sock")
+EMBEDDING_SERVICE_MAX_BATCH = 256     # texts per merged model call
+EMBEDDING_SERVICE_MAX_WAIT_MS = 10    # how long the first request waits for others to join
+
+# ─── Bulk Ingestion ───────────────────────────────────────────
+INGEST_DIR = "./output/ingest"    # checkpoint for python -m tools.ingest
+INGEST_EMBED_WORKERS = 2          # embedding processes (each loads the model)
+INGEST_EMBED_BATCH = 64
 
 # ─── SEC EDGAR Settings ───────────────────────────────────────
 SEC_FILING_TYPES = ["10-K", "10-Q"]
 MAX_FILINGS = 2           # most recent filings to analyze
+SEC_CACHE_DIR = "./output/sec"
+SEC_USER_AGENT = "FinSight Research Tool contact@finsight.com"   # required by SEC
+SEC_RATE_LIMIT = 10               # requests/second, SEC fair-access policy
+SEC_MAX_WORKERS = 4               # concurrent SEC requests per analysis
+SEC_TICKERS_TTL = 24 * 60 * 60    # revalidate company_tickers_exchange.json daily
+SEC_SUBMISSIONS_TTL = 60 * 60     # filing lists: no request within 1h, then conditional GET
+SEC_FACTS_TTL = 24 * 60 * 60      # XBRL companyfacts: re-check daily (and only after a new filing)
+XBRL_YEARS = 5                    # fiscal years of line-item history for the agents
+SEC_SECTIONS = {                  # filing sections kept for RAG ("Part:Item" for 10-Q)
+    "10-K": ["1", "1A", "7"],
+    "10-Q": ["I:2", "II:1A"],
+}
+SEC_SECTION_MAX_CHARS = 20_000    # per section
+SEC_SECTION_MIN_CHARS = 2_000     # less than this found → fall back to document start
+FILING_STORE_MAX_BYTES = 2 * 1024 ** 3   # compressed filing HTML + text, LRU-evicted
+
+# ─── Screener ─────────────────────────────────────────────────
+SCREENER_DIR = "./output/screener"
+SCREENER_TTL = 24 * 60 * 60       # feature matrix rebuilt nightly
+SCREENER_DEFAULT_N = 5
+SCREENER_MAX_N = 10
+SCREENER_UNIVERSE = [
+    "AAPL", "MSFT", "NVDA", "AMZN", "GOOGL", "META", "BRK-B", "AVGO", "TSLA", "LLY",
+    "JPM", "V", "UNH", "XOM", "MA", "JNJ", "PG", "HD", "COST", "ABBV",
+    "MRK", "ORCL", "CVX", "KO", "PEP", "BAC", "ADBE", "CRM", "WMT", "NFLX",
+    "TMO", "MCD", "CSCO", "ABT", "ACN", "LIN", "AMD", "DHR", "TXN", "DIS",
+    "WFC", "PM", "INTU", "VZ", "CAT", "IBM", "QCOM", "AMGN", "NEE", "UNP",
+    "HON", "LOW", "GS", "SPGI", "RTX", "T", "PFE", "BLK", "DE", "SBUX",
+    "MO", "O", "MMM", "DUK", "SO", "ENB", "UPS", "TGT", "CL", "GIS",
+    "SPY", "VTI", "QQQ", "SCHD", "VYM", "BND",
+]
+
+# ─── Peer Groups ──────────────────────────────────────────────
+PEER_CACHE_TTL = 24 * 60 * 60     # per-sector peer table, in memory
+PEER_MIN_INDUSTRY = 4             # fewer industry peers → compare to whole sector
+PEER_MAX_PEERS = 25
+
+# ─── Watchlist Analytics ──────────────────────────────────────
+PORTFOLIO_CACHE_TTL = 60 * 60     # per-watchlist analytics, in memory
+
+# ─── Ticker Search ────────────────────────────────────────────
+SEARCH_INDEX_TTL = 24 * 60 * 60   # rebuild in-memory symbol index daily
+SEARCH_MAX_RESULTS = 8            # suggestions returned per keystroke
 
 # ─── Output Settings ──────────────────────────────────────────
 REPORTS_DIR = "./output/reports"
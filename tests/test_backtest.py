@@ -0,0 +1,47 @@
+"""
+tests/test_backtest.py — forward outcomes and rule scoring
+"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("yfinance")             # tools.backtest → tools.price_store
+from tools.backtest import _shift_back, prepare_backtest, run_backtest   # noqa: E402
+
+
+def _universe(days: int = 400, tickers: int = 3):
+    rng   = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (days, tickers)), axis=0))
+    return close, close * 1.01, close * 0.99, np.full_like(close, 1e6)
+
+
+def test_shift_back():
+    x = np.arange(5.0)
+    np.testing.assert_array_equal(_shift_back(x, 2), [2.0, 3.0, 4.0, np.nan, np.nan])
+    np.testing.assert_array_equal(_shift_back(x, 0), x)
+
+
+def test_forward_outcomes():
+    close, high, low, volume = _universe()
+    prepared = prepare_backtest(close, high, low, volume, horizons=[1, 5])
+    np.testing.assert_allclose(prepared["forward"][5][:-5], close[5:] / close[:-5] - 1)
+    assert np.isnan(prepared["forward"][5][-5:]).all()
+    window = close[1:6, 0]
+    assert prepared["worst"][5][0, 0] == pytest.approx(window.min() / close[0, 0] - 1)
+    assert prepared["best"][5][0, 0] == pytest.approx(window.max() / close[0, 0] - 1)
+
+
+@pytest.mark.parametrize("horizons", [[0], [5, -1]])
+def test_non_positive_horizons_are_rejected(horizons):
+    close, high, low, volume = _universe(days=60, tickers=1)
+    with pytest.raises(ValueError):
+        prepare_backtest(close, high, low, volume, horizons=horizons)
+
+
+def test_run_backtest_reports_every_rule():
+    close, high, low, volume = _universe()
+    result = run_backtest(prepare_backtest(close, high, low, volume, horizons=[5]))
+    assert result["status"] == "success"
+    assert result["tickers"] == 3
+    assert set(result["rules"]) == {"RSI", "MACD", "MA", "BBANDS", "overall"}
+    assert result["baseline"]["5d"]["samples"] == 3 * (400 - 5)
@@ -0,0 +1,54 @@
+"""
+tests/test_dca_simulator.py — closed-form DCA paths vs a month-by-month loop
+"""
+
+import numpy as np
+import pandas as pd
+
+from tools.dca_simulator import BLOCK_DAYS, monthly_block_returns, simulate_dca, simulate_paths
+
+
+def _close(days: int = 600, seed: int = 0) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    return pd.Series(100 * np.exp(np.cumsum(rng.normal(0.0004, 0.015, days))),
+                     index=pd.bdate_range("2022-01-03", periods=days))
+
+
+def test_block_returns_are_overlapping_log_growth():
+    close  = _close(100).to_numpy()
+    blocks = monthly_block_returns(close)
+    assert len(blocks) == 100 - BLOCK_DAYS
+    np.testing.assert_allclose(blocks, np.log(close[BLOCK_DAYS:] / close[:-BLOCK_DAYS]))
+    assert len(monthly_block_returns(close[:BLOCK_DAYS])) == 0
+
+
+def test_paths_match_month_by_month_loop():
+    blocks = monthly_block_returns(_close())
+    values = simulate_paths(blocks, monthly=350, months=24, paths=50, seed=3)
+
+    draws = blocks[np.random.default_rng(3).integers(0, len(blocks), size=(50, 24))]
+    for p in range(50):
+        balance = 0.0
+        for m in range(24):
+            balance = (balance + 350) * np.exp(draws[p, m])     # contribute, then grow
+            np.testing.assert_allclose(values[p, m], balance, rtol=1e-12)
+
+
+def test_flat_history_returns_contributions():
+    close  = pd.Series(np.full(200, 50.0))
+    values = simulate_paths(monthly_block_returns(close), monthly=100, months=12, paths=10, seed=0)
+    np.testing.assert_allclose(values[:, -1], 1200.0)
+
+
+def test_simulate_dca_outcomes():
+    dca = simulate_dca(_close(), monthly=200)
+    assert dca["status"] == "success"
+    for outcome in dca["outcomes"].values():
+        assert outcome["invested"] == 200 * outcome["months"]
+        p = list(outcome["percentiles"].values())
+        assert p == sorted(p)
+        assert 0 <= outcome["probability_of_loss"] <= 1
+
+
+def test_simulate_dca_needs_history():
+    assert simulate_dca(_close(30))["status"] == "failed"
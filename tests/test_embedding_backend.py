@@ -0,0 +1,64 @@
+"""
+tests/test_embedding_backend.py — backend resolution and the cache key
+"""
+
+import sys
+import types
+
+import pytest
+
+import config
+from tools import embedding_backend
+from tools.embedding_backend import load_model, model_id, resolve_backend
+
+
+@pytest.fixture(autouse=True)
+def fresh_resolution():
+    resolve_backend.cache_clear()
+    embedding_backend._missing_onnx_deps.cache_clear()
+    yield
+    resolve_backend.cache_clear()
+    embedding_backend._missing_onnx_deps.cache_clear()
+
+
+@pytest.fixture
+def onnx_missing(monkeypatch):
+    monkeypatch.setattr(embedding_backend, "_missing_onnx_deps", lambda: ("onnxruntime",))
+
+
+@pytest.fixture
+def onnx_installed(monkeypatch):
+    monkeypatch.setattr(embedding_backend, "_missing_onnx_deps", lambda: ())
+
+
+def test_missing_onnx_deps_resolve_to_torch(onnx_missing):
+    assert resolve_backend("onnx-int8") == "torch"
+    assert model_id("onnx-int8") == f"{config.EMBEDDING_MODEL}@torch"
+
+
+def test_installed_onnx_keeps_its_cache_key(onnx_installed):
+    assert model_id("onnx") == f"{config.EMBEDDING_MODEL}@onnx"
+    assert model_id("torch") != model_id("onnx")
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        resolve_backend("tensorrt")
+
+
+def test_failed_onnx_load_raises_instead_of_falling_back(onnx_installed, monkeypatch):
+    loaded = []
+
+    class SentenceTransformer:
+        def __init__(self, name, backend="torch", model_kwargs=None):
+            if backend == "onnx":
+                raise OSError("model.onnx not found")
+            loaded.append(backend)
+
+    monkeypatch.setitem(sys.modules, "sentence_transformers",
+                        types.SimpleNamespace(SentenceTransformer=SentenceTransformer))
+    with pytest.raises(RuntimeError, match="onnx"):
+        load_model("onnx")
+    assert loaded == []
+    load_model("torch")
+    assert loaded == ["torch"]
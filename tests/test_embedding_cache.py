@@ -0,0 +1,85 @@
+"""
+tests/test_embedding_cache.py — persistent content-hash embedding cache
+"""
+
+import numpy as np
+import pytest
+
+import config
+from tools import embedding_cache
+from tools.embedding_cache import EmbeddingCache, encode_cached, simhash, normalize
+
+WORDS = ("revenue risk market customers supply chain competition regulation growth "
+         "margin pricing demand inventory capital liquidity debt interest rates foreign "
+         "exchange cybersecurity litigation").split()
+
+
+def _paragraph(seed: int, words: int = 60) -> str:
+    rng = np.random.default_rng(seed)
+    return " ".join(rng.choice(WORDS, words))
+
+
+def _vectors(n: int, dim: int = 8, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "EMBEDDING_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(embedding_cache, "_caches", {})
+    return tmp_path
+
+
+def test_exact_hits_ignore_whitespace(cache_dir):
+    cache = EmbeddingCache("model-a")
+    texts = ["Item 1A. Risk  Factors", "Item 7. MD&A"]
+    vectors = _vectors(2)
+    cache.put(texts, vectors)
+    found, missing = cache.lookup(["Item 1A.\nRisk Factors ", "something new"])
+    assert missing == [1]
+    np.testing.assert_allclose(found[0], vectors[0], rtol=1e-3)     # float16 storage
+    assert found[0].dtype == np.float32
+
+
+def test_rows_persist_and_are_shared_between_instances(cache_dir):
+    writer = EmbeddingCache("model-a")
+    reader = EmbeddingCache("model-a")
+    writer.put(["one", "two"], _vectors(2))
+    found, missing = reader.lookup(["two", "one"])          # written after reader opened
+    assert missing == [] and set(found) == {0, 1}
+    assert EmbeddingCache("model-b").lookup(["one"]) == ({}, [0])
+
+
+def test_near_duplicates_reuse_vectors(cache_dir, monkeypatch):
+    monkeypatch.setattr(config, "EMBEDDING_CACHE_NEAR_DUP_BITS", 3)
+    cache = EmbeddingCache("model-a")
+    base  = _paragraph(1, words=300)
+    cache.put([base], _vectors(1))
+    edited = base.replace(base.split()[150], "trademark", 1)
+    assert bin(simhash(normalize(base)) ^ simhash(normalize(edited))).count("1") <= 3
+    found, missing = cache.lookup([edited, _paragraph(2)])
+    assert list(found) == [0] and missing == [1]
+
+
+def test_orphan_vector_rows_are_trimmed(cache_dir):
+    cache = EmbeddingCache("model-a")
+    cache.put(["first"], _vectors(1, seed=1))
+    with open(cache.vecs_path, "ab") as f:                  # crashed writer: vector, no key
+        f.write(_vectors(1, seed=9).astype(cache.dtype).tobytes())
+    second = _vectors(1, seed=2)
+    cache.put(["second"], second)
+    np.testing.assert_allclose(cache.lookup(["second"])[0][0], second[0], rtol=1e-3)
+
+
+def test_encode_cached_only_encodes_misses(cache_dir):
+    calls = []
+
+    def encode(texts):
+        calls.append(list(texts))
+        return np.stack([np.full(4, len(t), dtype=np.float32) for t in texts])
+
+    first  = encode_cached(["a", "bb"], encode, model_name="model-a")
+    second = encode_cached(["bb", "ccc", "a"], encode, model_name="model-a")
+    assert calls == [["a", "bb"], ["ccc"]]
+    np.testing.assert_array_equal(second[:, 0], [2, 3, 1])
+    np.testing.assert_array_equal(first[:, 0], [1, 2])
@@ -0,0 +1,135 @@
+"""
+tests/test_embedding_service.py — micro-batching server and client fallback
+"""
+
+import queue
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import config
+from tools import embedding_service
+from tools.embedding_service import (
+    _Request, _batcher, _bind, _decode_response, _encode_response, _error_response,
+    _handle, service_encode,
+)
+
+
+class _Model:
+    """Vector of each text is [len(text), position]; records batch sizes."""
+
+    def __init__(self, fail_on: str = None):
+        self.batches = []
+        self.fail_on = fail_on
+
+    def encode(self, texts, batch_size=64):
+        self.batches.append(len(texts))
+        if self.fail_on in texts:
+            raise RuntimeError("model exploded")
+        return np.array([[len(t), i] for i, t in enumerate(texts)], dtype=np.float32)
+
+
+def _start_batcher(model, monkeypatch, max_wait_ms=200):
+    monkeypatch.setattr(config, "EMBEDDING_SERVICE_MAX_WAIT_MS", max_wait_ms)
+    requests = queue.Queue()
+    stats    = {"batches": 0, "texts": 0}
+    threading.Thread(target=_batcher, args=(model, requests, stats), daemon=True).start()
+    return requests, stats
+
+
+def test_response_round_trip():
+    vectors = np.arange(12, dtype=np.float32).reshape(3, 4)
+    np.testing.assert_array_equal(_decode_response(_encode_response(vectors)), vectors)
+    with pytest.raises(RuntimeError, match="boom"):
+        _decode_response(_error_response("boom"))
+
+
+def test_concurrent_requests_share_one_model_call(monkeypatch):
+    model = _Model()
+    requests, stats = _start_batcher(model, monkeypatch)
+    reqs = [_Request(["a" * (i + 1)] * (i + 1)) for i in range(4)]
+    for req in reqs:
+        requests.put(req)
+    for req in reqs:
+        assert req.done.wait(5)
+    assert model.batches == [10]
+    for i, req in enumerate(reqs):
+        assert req.error is None
+        np.testing.assert_array_equal(req.result[:, 0], [i + 1] * (i + 1))   # caller's own rows
+    assert stats == {"batches": 1, "texts": 10}
+
+
+def test_batch_size_caps_a_batch(monkeypatch):
+    monkeypatch.setattr(config, "EMBEDDING_SERVICE_MAX_BATCH", 4)
+    model = _Model()
+    requests, _ = _start_batcher(model, monkeypatch)
+    reqs = [_Request(["x", "y"]) for _ in range(4)]
+    for req in reqs:
+        requests.put(req)
+    for req in reqs:
+        assert req.done.wait(5)
+    assert model.batches == [4, 4]
+
+
+def test_model_error_reaches_every_caller_in_the_batch(monkeypatch):
+    requests, _ = _start_batcher(_Model(fail_on="bad"), monkeypatch)
+    reqs = [_Request(["ok"]), _Request(["bad"])]
+    for req in reqs:
+        requests.put(req)
+    for req in reqs:
+        assert req.done.wait(5)
+        assert req.result is None and "exploded" in req.error
+
+
+@pytest.fixture
+def service(monkeypatch):
+    directory = tempfile.mkdtemp(prefix="emb")      # Unix socket paths are length-limited
+    path = f"{directory}/svc.sock"
+    monkeypatch.setattr(config, "EMBEDDING_SERVICE_SOCKET", path)
+    monkeypatch.setattr(config, "EMBEDDING_SERVICE_AUTHKEY", b"test-secret")
+    monkeypatch.setattr(config, "EMBEDDING_SERVICE_ENABLED", True)
+    monkeypatch.setattr(embedding_service, "_down_until", 0.0)
+    embedding_service._local.conn = None
+
+    model = _Model(fail_on="bad")
+    requests, _ = _start_batcher(model, monkeypatch, max_wait_ms=5)
+    listener = _bind(path)
+
+    def accept():
+        while True:
+            try:
+                conn = listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=_handle, args=(conn, requests), daemon=True).start()
+
+    threading.Thread(target=accept, daemon=True).start()
+    yield model
+    embedding_service._local.conn = None
+    listener.close()
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_service_encode_end_to_end(service):
+    vectors = service_encode(["ab", "abcd"])
+    np.testing.assert_array_equal(vectors[:, 0], [2, 4])
+
+
+def test_failed_batch_falls_back_but_keeps_the_connection(service):
+    assert service_encode(["bad"]) is None
+    assert embedding_service._down_until == 0.0
+    assert service_encode(["fine"]) is not None
+
+
+def test_unreachable_service_backs_off(monkeypatch):
+    monkeypatch.setattr(config, "EMBEDDING_SERVICE_ENABLED", True)
+    monkeypatch.setattr(config, "EMBEDDING_SERVICE_SOCKET", "/nonexistent/svc.sock")
+    monkeypatch.setattr(config, "EMBEDDING_SERVICE_AUTHKEY", b"test-secret")
+    monkeypatch.setattr(embedding_service, "_down_until", 0.0)
+    embedding_service._local.conn = None
+    assert service_encode(["a"]) is None
+    assert embedding_service._down_until > time.time()
@@ -0,0 +1,67 @@
+"""
+tests/test_filing_sections.py — section-aware filing text extraction
+"""
+
+import config
+from tools.filing_sections import FALLBACK_CHARS, extract_sections
+
+
+def _paragraphs(label: str, n: int = 40) -> str:
+    return "".join(f"<p>{label} paragraph {i} " + "lorem ipsum " * 10 + "</p>" for i in range(n))
+
+
+TEN_K = (
+    "<html><head><title>10-K</title><style>p {margin: 0}</style></head><body>"
+    # table of contents: the same headings with almost nothing after them
+    "<table><tr><td>Item 1. Business</td></tr><tr><td>Item 1A. Risk Factors</td></tr>"
+    "<tr><td>Item 7. MD&amp;A</td></tr></table>"
+    "<div><span>Item</span> <span>1.</span> Business</div>" + _paragraphs("business") +
+    "<div>Item 1A. Risk Factors</div>" + _paragraphs("risk") +
+    "<div>Item 2. Properties</div>" + _paragraphs("properties") +
+    "<div>Item 7. Management&#8217;s Discussion</div>" + _paragraphs("mdna") +
+    "<div>Item 8. Financial Statements</div>" + _paragraphs("financials") +
+    "</body></html>"
+)
+
+
+def test_keeps_configured_sections_and_skips_the_rest():
+    text = extract_sections(TEN_K, "10-K")
+    for title in ("Item 1. Business", "Item 1A. Risk Factors",
+                  "Item 7. Management's Discussion and Analysis"):
+        assert title in text
+    assert "business paragraph 39" in text
+    assert "risk paragraph 0" in text
+    assert "mdna paragraph 39" in text
+    assert "properties" not in text
+    assert "financials" not in text
+    assert "margin" not in text                  # <style> content is skipped
+
+
+def test_streamed_chunks_match_whole_document():
+    # Chunk boundaries fall inside tags, entities and heading words
+    chunks = [TEN_K[i:i + 7] for i in range(0, len(TEN_K), 7)]
+    assert extract_sections(iter(chunks), "10-K") == extract_sections(TEN_K, "10-K")
+
+
+def test_10q_sections_are_keyed_by_part():
+    html = ("<body><p>PART I</p><p>Item 2. MD&amp;A</p>" + _paragraphs("q-mdna") +
+            "<p>PART II</p><p>Item 1. Legal Proceedings</p>" + _paragraphs("legal") +
+            "<p>Item 1A. Risk Factors</p>" + _paragraphs("q-risk") + "</body>")
+    text = extract_sections(html, "10-Q")
+    assert "Part I, Item 2." in text and "q-mdna paragraph 0" in text
+    assert "Part II, Item 1A. Risk Factors" in text and "q-risk paragraph 0" in text
+    assert "legal" not in text
+
+
+def test_falls_back_to_document_start_without_item_headings():
+    html = "<body>" + _paragraphs("exhibit", n=1000) + "</body>"
+    text = extract_sections(html, "10-K")
+    assert text.startswith("exhibit paragraph 0")
+    assert len(text) <= FALLBACK_CHARS
+
+
+def test_falls_back_when_sections_are_too_short():
+    html = "<body><p>Item 1. Business</p><p>We make widgets.</p><p>Item 2. Properties</p></body>"
+    assert len("We make widgets.") < config.SEC_SECTION_MIN_CHARS
+    assert extract_sections(html, "10-K") == (
+        "Item 1. Business We make widgets. Item 2. Properties")
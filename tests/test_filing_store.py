@@ -0,0 +1,66 @@
+"""
+tests/test_filing_store.py — accession-keyed compressed filing store
+"""
+
+import os
+
+import pytest
+
+import config
+from tools import filing_store
+
+
+@pytest.fixture(autouse=True)
+def store_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "SEC_CACHE_DIR", str(tmp_path))
+    return tmp_path / "filings"
+
+
+HTML = "<html><body>" + "<p>Résumé — ünïcode text 📈</p>" * 5000 + "</body></html>"
+
+
+def test_raw_and_text_round_trip():
+    assert filing_store.get_raw("0000320193-24-000123") is None
+    filing_store.put_raw("0000320193-24-000123", HTML)
+    filing_store.put_text("0000320193-24-000123", "extracted", version=2)
+    assert filing_store.get_raw("0000320193-24-000123") == HTML
+    assert filing_store.get_text("0000320193-24-000123", version=2) == "extracted"
+    assert filing_store.get_text("0000320193-24-000123", version=3) is None
+
+
+def test_stored_files_are_compressed(store_dir):
+    filing_store.put_raw("acc-1", HTML)
+    (path,) = store_dir.iterdir()
+    assert path.stat().st_size < len(HTML.encode("utf-8")) / 10
+
+
+def test_streaming_write_and_read(monkeypatch):
+    monkeypatch.setattr(filing_store, "STREAM_CHUNK", 1000)   # split multi-byte chars
+    chunks = [HTML[i:i + 777] for i in range(0, len(HTML), 777)]
+    passed = list(filing_store.stream_raw("acc-2", iter(chunks)))
+    assert passed == chunks
+    assert "".join(filing_store.iter_raw("acc-2")) == HTML
+    assert filing_store.get_raw("acc-2") == HTML
+    assert filing_store.iter_raw("missing") is None
+
+
+def test_abandoned_stream_leaves_nothing(store_dir):
+    stream = filing_store.stream_raw("acc-3", iter(["<html>", "partial"]))
+    next(stream)
+    stream.close()
+    assert filing_store.get_raw("acc-3") is None
+    assert not [p for p in store_dir.iterdir() if p.name.endswith(".tmp")]
+
+
+def test_budget_evicts_least_recently_used(store_dir):
+    for i, t in enumerate((100, 200, 300)):
+        filing_store.put_raw(f"acc-{i}", HTML + str(i))
+        for path in store_dir.iterdir():
+            if path.name.startswith(f"acc-{i}."):
+                os.utime(path, (t, t))
+    os.utime(next(store_dir.glob("acc-0.*")), (400, 400))       # recently read
+    size = next(store_dir.glob("acc-1.*")).stat().st_size
+    filing_store.enforce_budget(max_bytes=2 * size + size // 2)
+    assert filing_store.get_raw("acc-1") is None
+    assert filing_store.get_raw("acc-0") is not None
+    assert filing_store.get_raw("acc-2") is not None
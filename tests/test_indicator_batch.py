@@ -0,0 +1,96 @@
+"""
+tests/test_indicator_batch.py — calculate_indicators_batch vs the per-ticker path
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools.technical_indicators import (
+    SIGNAL_NAMES, align_last_bars, calculate_indicators,
+    calculate_indicators_batch, stack_price_histories,
+)
+
+
+def _history(days: int, seed: int, end: str = "2025-06-30") -> pd.DataFrame:
+    rng   = np.random.default_rng(seed)
+    close = 50 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, days)))
+    return pd.DataFrame({
+        "Open":   close,
+        "High":   close * (1 + rng.uniform(0, 0.02, days)),
+        "Low":    close * (1 - rng.uniform(0, 0.02, days)),
+        "Close":  close,
+        "Volume": rng.integers(100_000, 900_000, days).astype(np.float64),
+    }, index=pd.bdate_range(end=end, periods=days))
+
+
+# batch field → path into the calculate_indicators() result
+_FIELDS = {
+    "rsi":           ("rsi",),
+    "macd":          ("macd", "macd"),
+    "macd_signal":   ("macd", "signal"),
+    "macd_hist":     ("macd", "histogram"),
+    "bb_upper":      ("bollinger_bands", "upper"),
+    "bb_middle":     ("bollinger_bands", "middle"),
+    "bb_lower":      ("bollinger_bands", "lower"),
+    "bb_position":   ("bollinger_bands", "position_pct"),
+    "sma_20":        ("moving_averages", "sma_20"),
+    "sma_50":        ("moving_averages", "sma_50"),
+    "sma_200":       ("moving_averages", "sma_200"),
+    "ema_20":        ("moving_averages", "ema_20"),
+    "volume_ratio":  ("volume", "ratio"),
+    "high_52":       ("support_resistance", "52w_high"),
+    "low_52":        ("support_resistance", "52w_low"),
+}
+
+
+def _assert_row_matches(row, single: dict):
+    assert single["status"] == "success"
+    for field, path in _FIELDS.items():
+        expected = single
+        for key in path:
+            expected = expected[key]
+        assert float(row[field]) == pytest.approx(expected, rel=1e-6, abs=1e-4), field
+    assert int(row["volume"]) == single["volume"]["current"]
+    signals = {s["indicator"]: s["signal"] for s in single["signals"]}
+    for rule, signal in signals.items():
+        assert SIGNAL_NAMES[int(row[f"sig_{rule.lower()}"])] == signal, rule
+    assert int(row["bullish_count"]) == single["bullish_count"]
+    assert int(row["bearish_count"]) == single["bearish_count"]
+    assert SIGNAL_NAMES[int(row["overall"])] == single["overall_signal"]
+
+
+def _batch(histories):
+    tickers, _, close, high, low, volume = stack_price_histories(histories)
+    return calculate_indicators_batch(close, high, low, volume, tickers)
+
+
+def test_batch_matches_per_ticker():
+    histories = {f"T{i}": _history(400, seed=i) for i in range(6)}
+    batch = _batch(histories)
+    assert list(batch["ticker"]) == list(histories)
+    for row, history in zip(batch, histories.values()):
+        _assert_row_matches(row, calculate_indicators(history))
+
+
+def test_ragged_ends_use_each_tickers_last_bar():
+    histories = {
+        "FULL":   _history(400, seed=10),
+        "HALTED": _history(380, seed=11, end="2025-06-20"),
+        "SHORT":  _history(300, seed=12, end="2025-06-27"),
+    }
+    batch = _batch(histories)
+    for row, history in zip(batch, histories.values()):
+        assert np.isfinite(row["rsi"])
+        _assert_row_matches(row, calculate_indicators(history))
+
+
+def test_align_last_bars_right_aligns_columns():
+    close = np.array([[1.0, 10.0],
+                      [2.0, 20.0],
+                      [3.0, np.nan]])
+    volume = close * 100
+    aligned_close, aligned_volume = align_last_bars(close, volume)
+    np.testing.assert_array_equal(aligned_close[:, 0], [1.0, 2.0, 3.0])
+    np.testing.assert_array_equal(aligned_close[:, 1], [np.nan, 10.0, 20.0])
+    np.testing.assert_array_equal(aligned_volume[:, 1], [np.nan, 1000.0, 2000.0])
@@ -0,0 +1,117 @@
+"""
+tests/test_indicator_engine.py — NumPy engine vs the pandas formulas it replaced
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import config
+from tools.indicator_engine import EWM_BLOCK, compute_indicators, evaluate, ewm_mean
+
+
+def _prices(days: int, seed: int = 0) -> pd.DataFrame:
+    rng   = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, days)))
+    return pd.DataFrame({
+        "Close":  close,
+        "High":   close * (1 + rng.uniform(0, 0.02, days)),
+        "Low":    close * (1 - rng.uniform(0, 0.02, days)),
+        "Volume": rng.integers(1_000_000, 5_000_000, days).astype(np.float64),
+    })
+
+
+def _pandas_reference(df: pd.DataFrame) -> dict:
+    """The pre-engine calculate_indicators() formulas, unrounded, full series."""
+    close, high, low, volume = df["Close"], df["High"], df["Low"], df["Volume"]
+
+    delta = close.diff()
+    gain  = delta.where(delta > 0, 0).rolling(config.RSI_PERIOD).mean()
+    loss  = -delta.where(delta < 0, 0).rolling(config.RSI_PERIOD).mean()
+    rsi   = 100 - 100 / (1 + gain / loss)
+
+    macd   = close.ewm(span=config.MACD_FAST).mean() - close.ewm(span=config.MACD_SLOW).mean()
+    signal = macd.ewm(span=config.MACD_SIGNAL).mean()
+
+    bb_mid   = close.rolling(config.BBANDS_PERIOD).mean()
+    bb_std   = close.rolling(config.BBANDS_PERIOD).std()
+    bb_upper = bb_mid + 2 * bb_std
+    bb_lower = bb_mid - 2 * bb_std
+
+    volume_avg = volume.rolling(20).mean()
+    return {
+        "close":         close,
+        "rsi":           rsi,
+        "macd":          macd,
+        "macd_signal":   signal,
+        "macd_hist":     macd - signal,
+        "bb_upper":      bb_upper,
+        "bb_middle":     bb_mid,
+        "bb_lower":      bb_lower,
+        "bb_position":   (close - bb_lower) / (bb_upper - bb_lower) * 100,
+        "sma_20":        close.rolling(20).mean(),
+        "sma_50":        close.rolling(50).mean(),
+        "sma_200":       close.rolling(200).mean(),
+        "ema_20":        close.ewm(span=20).mean(),
+        "volume":        volume,
+        "volume_avg_20": volume_avg,
+        "volume_ratio":  volume / volume_avg,
+        "high_52":       high.rolling(52).max(),
+        "low_52":        low.rolling(52).min(),
+    }
+
+
+def _engine(df: pd.DataFrame, last_only: bool) -> dict:
+    return compute_indicators(*(df[c].to_numpy() for c in ("Close", "High", "Low", "Volume")),
+                              last_only=last_only)
+
+
+@pytest.mark.parametrize("days", [60, 252, 504, 3 * EWM_BLOCK + 7])
+def test_last_values_match_pandas(days):
+    df       = _prices(days, seed=days)
+    expected = _pandas_reference(df)
+    got      = _engine(df, last_only=True)
+    assert set(got) == set(expected)
+    for key, series in expected.items():
+        np.testing.assert_allclose(got[key], series.iloc[-1], rtol=1e-9, atol=1e-9,
+                                   equal_nan=True, err_msg=key)
+
+
+def test_full_series_match_pandas():
+    df       = _prices(3 * EWM_BLOCK + 7, seed=1)
+    expected = _pandas_reference(df)
+    got      = _engine(df, last_only=False)
+    for key, series in expected.items():
+        np.testing.assert_allclose(got[key], series.to_numpy(), rtol=1e-9, atol=1e-9,
+                                   equal_nan=True, err_msg=key)
+
+
+def test_columns_match_single_series():
+    frames = [_prices(300, seed=s) for s in range(4)]
+    matrix = {c: np.column_stack([f[c].to_numpy() for f in frames])
+              for c in ("Close", "High", "Low", "Volume")}
+    got = compute_indicators(matrix["Close"], matrix["High"], matrix["Low"], matrix["Volume"])
+    for j, frame in enumerate(frames):
+        single = _engine(frame, last_only=True)
+        for key, value in single.items():
+            np.testing.assert_allclose(got[key][j], value, rtol=1e-12, equal_nan=True, err_msg=key)
+
+
+def test_ewm_mean_skips_nan_like_pandas():
+    x = _prices(2 * EWM_BLOCK + 3, seed=2)["Close"].to_numpy().copy()
+    x[:5] = np.nan
+    x[150:160] = np.nan
+    expected = pd.Series(x).ewm(span=12).mean().to_numpy()
+    np.testing.assert_allclose(ewm_mean(x, 12), expected, rtol=1e-9, equal_nan=True)
+
+
+def test_evaluate_computes_only_requested():
+    close = _prices(100)["Close"].to_numpy()
+    got   = evaluate({"close": close}, {"sma_10": ("sma", {"window": 10})})
+    assert list(got) == ["sma_10"]
+    assert got["sma_10"] == pytest.approx(close[-10:].mean())
+
+
+def test_evaluate_rejects_unknown_indicator():
+    with pytest.raises(ValueError):
+        evaluate({"close": np.ones(10)}, ["no_such_indicator"])
@@ -0,0 +1,75 @@
+"""
+tests/test_indicator_registry.py — declarative registry and lazy evaluation
+"""
+
+import numpy as np
+import pytest
+
+import config
+from tools import indicator_engine
+from tools.indicator_engine import INDICATORS, evaluate, indicator, required_inputs
+
+
+@pytest.fixture
+def close():
+    return 100 + np.cumsum(np.random.default_rng(0).normal(size=300))
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    # Register test indicators into a copy so the module registry stays clean
+    monkeypatch.setattr(indicator_engine, "INDICATORS", dict(INDICATORS))
+    return indicator_engine.INDICATORS
+
+
+def test_parameters_override_defaults(close):
+    got = evaluate({"close": close}, {"fast": ("sma", {"window": 5}),
+                                      "slow": ("sma", {"window": 30})})
+    assert got["fast"] == pytest.approx(close[-5:].mean())
+    assert got["slow"] == pytest.approx(close[-30:].mean())
+
+
+def test_config_defaults_are_read_at_evaluation_time(close, monkeypatch):
+    before = evaluate({"close": close}, ["rsi"])["rsi"]
+    monkeypatch.setattr(config, "RSI_PERIOD", config.RSI_PERIOD + 7)
+    assert evaluate({"close": close}, ["rsi"])["rsi"] != before
+
+
+def test_only_the_dependency_closure_is_computed(close, registry):
+    calls = []
+
+    @indicator("probe")
+    def _probe(ws):
+        calls.append("probe")
+        return ws.get("sma", window=10)
+
+    evaluate({"close": close}, ["rsi"])
+    assert calls == []
+    got = evaluate({"close": close}, {"a": "probe", "b": ("sma", {"window": 10})})
+    assert calls == ["probe"]
+    assert got["a"] == got["b"]
+
+
+def test_shared_intermediates_are_memoised(close, monkeypatch):
+    counted = []
+    real = indicator_engine.tail
+
+    def counting_tail(x, w):
+        counted.append(w)
+        return real(x, w)
+
+    monkeypatch.setattr(indicator_engine, "tail", counting_tail)
+    evaluate({"close": close}, ["bb_middle", "bb_upper", "bb_lower", "bb_position"])
+    assert counted == [config.BBANDS_PERIOD]          # one 20-day window for all four
+
+
+def test_required_inputs():
+    assert required_inputs(["rsi", "macd"]) == {"close"}
+    assert required_inputs({"hi": ("rolling_high", {"window": 10})}) == {"high"}
+
+
+def test_bad_requests_are_rejected(close):
+    with pytest.raises(ValueError, match="unknown parameter"):
+        evaluate({"close": close}, {"x": ("sma", {"span": 3})})
+    with pytest.raises(ValueError, match="Missing input"):
+        evaluate({"close": close}, ["volume_ratio"])
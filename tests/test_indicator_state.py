@@ -0,0 +1,72 @@
+"""
+tests/test_indicator_state.py — incremental IndicatorState vs a full recompute
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+import config
+from tools.indicator_engine import compute_indicators
+from tools.indicator_state import RESYNC_EVERY, IndicatorState
+
+
+def _bars(days: int, seed: int = 0):
+    rng    = np.random.default_rng(seed)
+    close  = 80 * np.exp(np.cumsum(rng.normal(0, 0.015, days)))
+    high   = close * (1 + rng.uniform(0, 0.02, days))
+    low    = close * (1 - rng.uniform(0, 0.02, days))
+    volume = rng.integers(500_000, 3_000_000, days).astype(np.float64)
+    dates  = [f"d{i:05d}" for i in range(days)]
+    return dates, high, low, close, volume
+
+
+def _assert_matches_full(values: dict, high, low, close, volume):
+    expected = compute_indicators(close, high, low, volume, last_only=True)
+    assert set(values) == set(expected)
+    for key, value in expected.items():
+        np.testing.assert_allclose(values[key], value, rtol=1e-8, atol=1e-8,
+                                   equal_nan=True, err_msg=key)
+
+
+@pytest.mark.parametrize("days", [30, 260, 2 * RESYNC_EVERY + 50])
+def test_state_matches_full_recompute(days):
+    dates, high, low, close, volume = _bars(days, seed=days)
+    state = IndicatorState.from_history(dates, high, low, close, volume)
+    _assert_matches_full(state.values(), high, low, close, volume)
+
+
+def test_peek_matches_full_recompute_and_leaves_state_alone():
+    dates, high, low, close, volume = _bars(300, seed=3)
+    state  = IndicatorState.from_history(dates[:-1], high[:-1], low[:-1], close[:-1], volume[:-1])
+    before = state.to_dict()
+
+    peeked = state.peek(dates[-1], high[-1], low[-1], close[-1], volume[-1])
+    _assert_matches_full(peeked, high, low, close, volume)
+    assert state.to_dict() == before
+
+
+def test_advancing_bar_by_bar_tracks_full_recompute():
+    dates, high, low, close, volume = _bars(320, seed=4)
+    state = IndicatorState.from_history(dates[:250], high[:250], low[:250], close[:250], volume[:250])
+    for i in range(250, 320):
+        state.advance(dates[i], high[i], low[i], close[i], volume[i])
+        _assert_matches_full(state.values(), high[:i + 1], low[:i + 1], close[:i + 1], volume[:i + 1])
+    assert state.last_date == dates[-1]
+    assert state.bars == 320
+
+
+def test_snapshot_round_trips_through_json():
+    dates, high, low, close, volume = _bars(280, seed=5)
+    state    = IndicatorState.from_history(dates[:-1], high[:-1], low[:-1], close[:-1], volume[:-1])
+    restored = IndicatorState.from_dict(json.loads(json.dumps(state.to_dict())))
+    restored.advance(dates[-1], high[-1], low[-1], close[-1], volume[-1])
+    _assert_matches_full(restored.values(), high, low, close, volume)
+
+
+def test_snapshot_from_other_settings_is_rejected(monkeypatch):
+    dates, high, low, close, volume = _bars(50)
+    snapshot = IndicatorState.from_history(dates, high, low, close, volume).to_dict()
+    monkeypatch.setattr(config, "RSI_PERIOD", config.RSI_PERIOD + 1)
+    assert IndicatorState.from_dict(snapshot) is None
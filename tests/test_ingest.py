@@ -0,0 +1,67 @@
+"""
+tests/test_ingest.py — bulk ingestion pipeline bookkeeping
+"""
+
+import numpy as np
+import pytest
+
+import config
+
+pytest.importorskip("chromadb")
+pytest.importorskip("sentence_transformers")
+from tools import embedding_cache, ingest, vector_store   # noqa: E402
+
+CHUNKS = ["risk factors text", "md&a text"]
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    """Ingestion against in-memory collections, with every chunk already embedded."""
+    monkeypatch.setattr(config, "INGEST_DIR", str(tmp_path / "ingest"))
+    monkeypatch.setattr(config, "EMBEDDING_CACHE_DIR", str(tmp_path / "embeddings"))
+    monkeypatch.setattr(embedding_cache, "_caches", {})
+    embedding_cache.get_cache(ingest.model_id()).put(CHUNKS, np.ones((2, 4), dtype=np.float32))
+
+    written = {}
+
+    def fetch(ticker):
+        if ticker == "BAD":
+            return {"status": "failed", "error": "no filings"}, 0.0
+        return {"status": "success", "cik": "1",
+                "filings": [{"accession_number": f"{ticker}-1", "text": "..."}]}, 0.0
+
+    monkeypatch.setattr(ingest, "_fetch", fetch)
+    monkeypatch.setattr(vector_store, "open_collection", lambda ticker: ticker)
+    monkeypatch.setattr(vector_store, "diff_filings",
+                        lambda collection, filings, ticker, listed=None: (filings, []))
+    monkeypatch.setattr(vector_store, "chunk_filings", lambda filings, ticker, cik: (
+        list(CHUNKS), [f"{ticker}_{i}" for i in range(2)], [{}, {}]))
+    monkeypatch.setattr(vector_store, "update_collection",
+                        lambda collection, chunks, ids, metadatas, embeddings, stale, ticker:
+                        written.setdefault(ticker, []).append(embeddings))
+    monkeypatch.setattr(vector_store, "chunk_count", lambda collection, ticker: 2)
+    return written
+
+
+def test_cached_chunks_are_written_without_encoding(pipeline):
+    report = ingest.run_ingest(["aapl", "MSFT", "BAD", "AAPL"], workers=1)
+    assert (report["tickers"], report["failed"], report["encoded"]) == (2, 1, 0)
+    assert sorted(pipeline) == ["AAPL", "MSFT"]
+    assert pipeline["AAPL"][0] == [[1.0] * 4, [1.0] * 4]
+
+    checkpoint = ingest.load_checkpoint()
+    assert checkpoint["done"]["AAPL"]["accessions"] == ["AAPL-1"]
+    assert checkpoint["failed"]["BAD"]["error"] == "no filings"
+
+
+def test_rerun_resumes_from_the_checkpoint(pipeline):
+    ingest.run_ingest(["AAPL", "BAD"], workers=1)
+    report = ingest.run_ingest(["AAPL", "BAD", "MSFT"], workers=1)
+    assert report["skipped"] == 1                 # AAPL is fresh; BAD is retried
+    assert (report["tickers"], report["failed"]) == (1, 1)
+    assert ingest.run_ingest(["AAPL"], workers=1, force=True)["tickers"] == 1
+
+
+def test_missing_checkpoint_starts_empty(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "INGEST_DIR", str(tmp_path / "nowhere"))
+    assert ingest.load_checkpoint() == {"done": {}, "failed": {}}
@@ -0,0 +1,29 @@
+"""
+tests/test_peer_groups.py — vectorized peer percentile ranks
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("yfinance")             # tools.peer_groups → tools.price_store
+from tools.peer_groups import percentile_ranks   # noqa: E402
+
+
+def test_matches_pandas_average_rank():
+    rng = np.random.default_rng(0)
+    matrix = rng.integers(0, 8, size=(40, 5)).astype(float)     # plenty of ties
+    matrix[rng.random(matrix.shape) < 0.2] = np.nan
+    frame    = pd.DataFrame(matrix)
+    expected = (frame.rank(method="average") - 1) / (frame.count() - 1) * 100
+    np.testing.assert_allclose(percentile_ranks(matrix), expected.to_numpy(), equal_nan=True)
+
+
+def test_edge_cases():
+    matrix = np.array([[1.0, np.nan, 5.0],
+                       [2.0, 3.0,    5.0],
+                       [3.0, np.nan, 5.0]])
+    ranks = percentile_ranks(matrix)
+    np.testing.assert_array_equal(ranks[:, 0], [0.0, 50.0, 100.0])
+    assert np.isnan(ranks[:, 1]).all()               # one valid value — no peers to rank against
+    np.testing.assert_array_equal(ranks[:, 2], [50.0, 50.0, 50.0])
@@ -0,0 +1,48 @@
+"""
+tests/test_portfolio.py — watchlist analytics vs per-pair / per-series references
+"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("yfinance")             # tools.portfolio → tools.price_store
+from tools.portfolio import compute_analytics   # noqa: E402
+
+
+def _returns(days: int = 250, seed: int = 0) -> np.ndarray:
+    rng   = np.random.default_rng(seed)
+    bench = rng.normal(0.0004, 0.01, days)
+    a = 1.2 * bench + rng.normal(0, 0.008, days)
+    b = 0.5 * bench + rng.normal(0, 0.012, days)
+    c = a + rng.normal(0, 0.002, days)                  # nearly a copy of a
+    return np.column_stack([a, b, c, bench])
+
+
+def test_matches_references():
+    r = _returns()
+    tickers = ["A", "B", "C"]
+    result  = compute_analytics(r, tickers)
+
+    corr = np.corrcoef(r[:, :3], rowvar=False)
+    np.testing.assert_allclose(result["correlation"]["matrix"], np.round(corr, 3), atol=1e-3)
+    assert result["most_correlated_pair"]["tickers"] == ["A", "C"]
+
+    port = r[:, :3].mean(axis=1)
+    port_vol = port.std(ddof=1) * np.sqrt(252) * 100
+    assert result["portfolio"]["volatility_annualized_pct"] == pytest.approx(port_vol, abs=0.01)
+    beta = np.cov(port, r[:, 3])[0, 1] / r[:, 3].var(ddof=1)
+    assert result["portfolio"]["beta"] == pytest.approx(beta, abs=0.01)
+
+    for i, holding in enumerate(result["holdings"]):
+        equity = np.concatenate([[1.0], np.cumprod(1 + r[:, i])])
+        drawdown = (equity / np.maximum.accumulate(equity) - 1).min() * 100
+        assert holding["max_drawdown_pct"] == pytest.approx(drawdown, abs=0.01)
+        assert holding["return_pct"] == pytest.approx((equity[-1] - 1) * 100, abs=0.01)
+
+
+def test_single_holding_has_no_pairs():
+    r = _returns()[:, [0, 3]]
+    result = compute_analytics(r, ["A"])
+    assert result["correlation"]["matrix"] == [[1.0]]
+    assert result["portfolio"]["avg_pairwise_correlation"] is None
+    assert "most_correlated_pair" not in result
@@ -0,0 +1,73 @@
+"""
+tests/test_risk_metrics.py — column-wise risk statistics vs straightforward references
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools.risk_metrics import TRADING_DAYS, compute_risk, max_drawdown, risk_matrix
+
+
+def _returns(days: int = 300, tickers: int = 3, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(0.0005, 0.015, (days, tickers))
+
+
+def test_max_drawdown():
+    prices = np.array([[100, 10], [120, 9], [90, 8], [130, 12], [117, 11]], dtype=float)
+    np.testing.assert_allclose(max_drawdown(prices), [90 / 120 - 1, 8 / 10 - 1])
+
+
+def test_columns_match_single_series_references():
+    r = _returns()
+    m = risk_matrix(r, risk_free=0.04, confidence=0.95, window=21)
+    for j in range(r.shape[1]):
+        s      = pd.Series(r[:, j])
+        equity = np.concatenate([[1.0], np.cumprod(1 + r[:, j])])
+        vol    = s.std() * np.sqrt(TRADING_DAYS)
+        excess = s.mean() * TRADING_DAYS - 0.04
+        tail   = np.quantile(r[:, j], 0.05)
+        rolling_vol = s.rolling(21).std().dropna() * np.sqrt(TRADING_DAYS)
+        downside = np.sqrt(np.mean(np.minimum(r[:, j] - 0.04 / TRADING_DAYS, 0) ** 2)) * np.sqrt(TRADING_DAYS)
+
+        assert m["volatility"][j] == pytest.approx(vol)
+        assert m["var"][j] == pytest.approx(-tail)
+        assert m["cvar"][j] == pytest.approx(-r[:, j][r[:, j] <= tail].mean())
+        assert m["max_drawdown"][j] == pytest.approx((equity / np.maximum.accumulate(equity) - 1).min())
+        assert m["current_drawdown"][j] == pytest.approx(equity[-1] / equity.max() - 1)
+        assert m["sharpe"][j] == pytest.approx(excess / vol)
+        assert m["sortino"][j] == pytest.approx(excess / downside)
+        assert m["volatility_rolling"][j] == pytest.approx(rolling_vol.iloc[-1])
+        assert m["volatility_median"][j] == pytest.approx(rolling_vol.median())
+
+
+def test_beta_and_correlation_match_numpy():
+    r     = _returns(tickers=2, seed=1)
+    bench = _returns(tickers=1, seed=2)[:, 0]
+    r[:, 1] = 1.5 * bench + 0.001 * r[:, 1]
+    m = risk_matrix(r, bench)
+    for j in range(2):
+        cov = np.cov(r[:, j], bench)
+        assert m["beta"][j] == pytest.approx(cov[0, 1] / cov[1, 1])
+        assert m["correlation"][j] == pytest.approx(np.corrcoef(r[:, j], bench)[0, 1])
+    assert m["beta"][1] == pytest.approx(1.5, abs=0.01)
+
+
+def test_short_history_has_no_rolling_volatility():
+    m = risk_matrix(_returns(days=10), window=21)
+    assert np.isnan(m["volatility_rolling"]).all()
+
+
+def test_compute_risk_aligns_benchmark_dates():
+    dates = pd.bdate_range("2024-01-01", periods=300)
+    close = pd.Series(100 * np.cumprod(1 + _returns(tickers=1)[:, 0]), index=dates)
+    bench = (close * 4).drop(dates[100:130])                 # benchmark has a gap
+    risk  = compute_risk(close, bench, lookback=1000)
+    assert risk["status"] == "success"
+    assert risk["lookback_days"] == 300 - 30 - 1             # gap days + the first day (no return)
+    assert risk["beta"] == pytest.approx(1.0, abs=0.05)
+
+
+def test_compute_risk_needs_history():
+    close = pd.Series([100.0, 101.0], index=pd.bdate_range("2024-01-01", periods=2))
+    assert compute_risk(close)["status"] == "failed"
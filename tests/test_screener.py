@@ -0,0 +1,42 @@
+"""
+tests/test_screener.py — screener query parsing and matrix helpers
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import config
+
+pytest.importorskip("yfinance")             # tools.screener → tools.price_store
+from tools.screener import _ffill, parse_screen_query   # noqa: E402
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("top 5 stocks for me", {"n": 5}),
+    ("give me three safe dividend stocks", {"n": 3, "risk_tolerance": "low", "goal": "income"}),
+    ("I have $300 a month, show me 4 aggressive growth companies",
+     {"n": 4, "monthly_investable": "200_500", "risk_tolerance": "high", "goal": "grow_savings"}),
+    ("$1.2k per month to retire on", {"monthly_investable": "500_plus", "goal": "grow_savings"}),
+    ("$40 per week, first stock", {"monthly_investable": "under_200", "goal": "learn"}),
+    ("$1,200 a year", {"monthly_investable": "under_200"}),
+    ("what should I buy?", {}),
+    ("", {}),
+])
+def test_parse_screen_query(query, expected):
+    assert parse_screen_query(query) == expected
+
+
+def test_parse_screen_query_caps_n():
+    assert parse_screen_query("top 500 stocks")["n"] == config.SCREENER_MAX_N
+    assert parse_screen_query("top 0 stocks")["n"] == 1
+
+
+def test_ffill_matches_pandas():
+    rng = np.random.default_rng(0)
+    matrix = rng.normal(size=(50, 6))
+    matrix[rng.random(matrix.shape) < 0.3] = np.nan
+    matrix[:4, 2] = np.nan                  # leading gap stays NaN
+    matrix[:, 5] = np.nan                   # never traded
+    expected = pd.DataFrame(matrix).ffill().to_numpy()
+    np.testing.assert_array_equal(_ffill(matrix), expected)
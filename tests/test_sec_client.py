@@ -0,0 +1,46 @@
+"""
+tests/test_sec_client.py — SEC rate limiting
+"""
+
+import threading
+import time
+
+from tools.sec_client import TokenBucket
+
+
+def test_requests_are_spaced_from_the_first_one():
+    bucket = TokenBucket(rate=50)
+    start  = time.monotonic()
+    for _ in range(11):
+        bucket.acquire()
+    # one token up front, then 10 more at 1/50s each — no initial burst
+    assert 0.19 <= time.monotonic() - start < 1.0
+
+
+def test_rate_holds_across_threads():
+    bucket = TokenBucket(rate=100)
+    stamps = []
+    lock   = threading.Lock()
+
+    def worker():
+        for _ in range(10):
+            bucket.acquire()
+            with lock:
+                stamps.append(time.monotonic())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    start = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(stamps) == 40
+    assert max(stamps) - start >= 39 / 100 - 0.01
+
+
+def test_capacity_allows_a_burst():
+    bucket = TokenBucket(rate=1, capacity=5)
+    start  = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    assert time.monotonic() - start < 0.1
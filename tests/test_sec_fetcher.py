@@ -0,0 +1,125 @@
+"""
+tests/test_sec_fetcher.py — cached, revalidated SEC lookups
+"""
+
+import pytest
+
+import config
+from tools import sec_fetcher
+
+
+class _Response:
+    def __init__(self, status_code=200, payload=None, headers=None):
+        self.status_code = status_code
+        self.payload     = payload
+        self.headers     = headers or {}
+
+    def json(self):
+        return self.payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class _SEC:
+    """Scripted sec_get: answers with queued responses and records request headers."""
+
+    def __init__(self, monkeypatch):
+        self.responses = []
+        self.requests  = []
+        monkeypatch.setattr(sec_fetcher, "sec_get", self)
+
+    def __call__(self, url, headers=None, **kwargs):
+        self.requests.append((url, dict(headers or {})))
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture
+def sec(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "SEC_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(sec_fetcher, "_tickers", {})
+    monkeypatch.setattr(sec_fetcher, "_cik_by_ticker", {})
+    monkeypatch.setattr(sec_fetcher, "_submissions", {})
+    return _SEC(monkeypatch)
+
+
+# ── Company tickers / CIK lookup ──────────────────────────────────────────────
+
+TICKERS = {
+    "fields": ["cik", "name", "ticker", "exchange"],
+    "data": [[320193, "Apple Inc.", "AAPL", "Nasdaq"],
+             [1067983, "Berkshire Hathaway Inc", "BRK-B", "NYSE"],
+             [1234567, "No Exchange Co", "NOEX", None]],
+}
+
+
+def test_cik_lookup_is_served_from_one_download(sec):
+    sec.responses = [_Response(payload=TICKERS, headers={"ETag": '"v1"'})]
+    assert sec_fetcher.get_cik_from_ticker("aapl") == "0000320193"
+    assert sec_fetcher.get_cik_from_ticker("BRK-B") == "0001067983"
+    assert sec_fetcher.get_cik_from_ticker("ZZZZ") is None
+    assert len(sec.requests) == 1
+    assert sec_fetcher.fetch_company_tickers()["2"]["exchange"] == ""
+
+
+def test_tickers_survive_a_restart_and_revalidate_conditionally(sec, monkeypatch):
+    sec.responses = [_Response(payload=TICKERS, headers={"ETag": '"v1"'})]
+    sec_fetcher.fetch_company_tickers()
+
+    monkeypatch.setattr(sec_fetcher, "_tickers", {})          # new process: disk copy only
+    monkeypatch.setattr(config, "SEC_TICKERS_TTL", 0)
+    sec.responses = [_Response(status_code=304)]
+    assert sec_fetcher.get_cik_from_ticker("AAPL") == "0000320193"
+    assert sec.requests[-1][1] == {"If-None-Match": '"v1"'}
+
+
+def test_failed_revalidation_keeps_the_cached_copy(sec, monkeypatch):
+    sec.responses = [_Response(payload=TICKERS)]
+    sec_fetcher.fetch_company_tickers()
+    monkeypatch.setattr(config, "SEC_TICKERS_TTL", 0)
+    sec.responses = [ConnectionError("offline")]
+    assert sec_fetcher.get_cik_from_ticker("AAPL") == "0000320193"
+
+
+# ── Submissions ───────────────────────────────────────────────────────────────
+
+SUBMISSIONS = {"filings": {"recent": {
+    "form":            ["10-Q", "8-K", "10-K", "10-Q", "10-Q", "10-K"],
+    "accessionNumber": ["a6", "a5", "a4", "a3", "a2", "a1"],
+    "filingDate":      ["2024-08-01", "2024-07-15", "2024-02-01", "2023-11-01",
+                        "2023-08-01", "2023-02-01"],
+    "primaryDocument": ["q3.htm", "8k.htm", "k24.htm", "q2.htm", "q1.htm", "k23.htm"],
+    "reportDate":      ["2024-06-30"] * 6,
+}}}
+
+
+def test_one_submissions_fetch_serves_every_form(sec):
+    sec.responses = [_Response(payload=SUBMISSIONS, headers={"Last-Modified": "Thu, 01 Aug 2024"})]
+    by_type = sec_fetcher.get_recent_filings_by_type("0000320193", ["10-K", "10-Q"], count=2)
+    assert [f["accession_number"] for f in by_type["10-K"]] == ["a4", "a1"]
+    assert [f["accession_number"] for f in by_type["10-Q"]] == ["a6", "a3"]
+    assert by_type["10-Q"][0] == {"type": "10-Q", "accession_number": "a6", "date": "2024-08-01",
+                                  "primary_document": "q3.htm", "cik": "0000320193"}
+    assert sec_fetcher.get_recent_filings("0000320193", "10-K", count=1)[0]["accession_number"] == "a4"
+    assert len(sec.requests) == 1
+
+
+def test_submissions_cache_keeps_only_used_fields_and_revalidates(sec, monkeypatch):
+    sec.responses = [_Response(payload=SUBMISSIONS, headers={"ETag": '"s1"'})]
+    recent = sec_fetcher.get_submissions("0000320193")
+    assert set(recent) == set(sec_fetcher.SUBMISSION_FIELDS)
+
+    monkeypatch.setattr(sec_fetcher, "_submissions", {})      # new process: disk copy only
+    monkeypatch.setattr(config, "SEC_SUBMISSIONS_TTL", 0)
+    sec.responses = [_Response(status_code=304)]
+    assert sec_fetcher.get_submissions("0000320193") == recent
+    assert sec.requests[-1][1] == {"If-None-Match": '"s1"'}
+
+
+def test_filing_lookup_failure_returns_empty_lists(sec):
+    sec.responses = [_Response(status_code=503)]
+    assert sec_fetcher.get_recent_filings_by_type("0000000001", ["10-K"]) == {"10-K": []}
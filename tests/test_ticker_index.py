@@ -0,0 +1,55 @@
+"""
+tests/test_ticker_index.py — in-process symbol search
+"""
+
+import pytest
+
+from tools import ticker_index
+from tools.ticker_index import MAX_NODE_ENTRIES, TickerIndex
+
+
+def _sec_companies(extra=()):
+    # Enough registrants starting with "SP" and "QQ" to fill the capped trie nodes
+    rows = [(f"SP{i:02d}", f"Filler {i} Corp") for i in range(2 * MAX_NODE_ENTRIES)]
+    rows += [(f"QQ{i:02d}", f"Quux {i} Inc") for i in range(2 * MAX_NODE_ENTRIES)]
+    rows += list(extra)
+    return {str(i): {"cik_str": i, "ticker": t, "title": name, "exchange": "NYSE"}
+            for i, (t, name) in enumerate(rows)}
+
+
+@pytest.fixture
+def index(monkeypatch):
+    companies = _sec_companies([("MSFT", "Microsoft Corp"), ("BRK-B", "Berkshire Hathaway Inc")])
+    monkeypatch.setattr(ticker_index, "fetch_company_tickers", lambda: companies)
+    return TickerIndex(ticker_index._load_entries())
+
+
+def _tickers(results):
+    return [r["ticker"] for r in results]
+
+
+def test_short_prefixes_reach_etfs(index):
+    assert _tickers(index.search("SP", 3))[0] == "SPY"
+    assert _tickers(index.search("QQ", 3))[0] == "QQQ"
+
+
+def test_exact_symbol_ranks_first(index):
+    assert _tickers(index.search("msft", 5))[0] == "MSFT"
+    assert _tickers(index.search("brk.b", 5))[0] == "BRK-B"
+
+
+def test_name_words_match_by_prefix(index):
+    assert _tickers(index.search("micro", 5)) == ["MSFT"]
+    assert _tickers(index.search("berkshire hath", 5)) == ["BRK-B"]
+
+
+@pytest.mark.parametrize("typo", ["microsfot", "mircosoft", "micrsoft", "microosoft"])
+def test_one_edit_typos_still_match(index, typo):
+    assert "MSFT" in _tickers(index.search(typo, 5))
+
+
+def test_results_carry_exchange(index):
+    spy = index.search("SPY", 1)[0]
+    assert (spy["exchange"], spy["type"]) == ("NYSE Arca", "ETF")
+    assert index.search("QQQ", 1)[0]["exchange"] == "Nasdaq"
+    assert index.search("MSFT", 1)[0]["exchange"] == "NYSE"
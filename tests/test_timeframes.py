@@ -0,0 +1,69 @@
+"""
+tests/test_timeframes.py — weekly / monthly bars and their indicators
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import config
+from tools.technical_indicators import calculate_timeframes, resample_bars
+
+
+def _history(days: int = 700, seed: int = 0) -> pd.DataFrame:
+    rng   = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, days)))
+    return pd.DataFrame({
+        "Close":  close,
+        "High":   close * (1 + rng.uniform(0, 0.02, days)),
+        "Low":    close * (1 - rng.uniform(0, 0.02, days)),
+        "Volume": rng.integers(100_000, 900_000, days).astype(np.float64),
+    }, index=pd.bdate_range("2023-01-02", periods=days))
+
+
+def _pandas_bars(df: pd.DataFrame, rule: str) -> pd.DataFrame:
+    return df.resample(rule).agg({"Close": "last", "High": "max",
+                                  "Low": "min", "Volume": "sum"}).dropna()
+
+
+@pytest.mark.parametrize("freq, rule", [("W-FRI", "W-FRI"), ("M", "ME")])
+def test_resample_matches_pandas(freq, rule):
+    df = _history()
+    df = df.drop(df.index[50:60])           # a gap in the middle (holiday, halt)
+    got = resample_bars(df.index, *(df[c].to_numpy() for c in ("Close", "High", "Low", "Volume")), freq)
+    expected = _pandas_bars(df, rule)
+    for values, column in zip(got, ("Close", "High", "Low", "Volume")):
+        np.testing.assert_allclose(values, expected[column].to_numpy(), err_msg=column)
+
+
+def test_weekly_indicators_match_pandas():
+    df     = _history()
+    weekly = _pandas_bars(df, "W-FRI")
+    close  = weekly["Close"]
+
+    delta = close.diff()
+    gain  = delta.where(delta > 0, 0).rolling(config.RSI_PERIOD).mean()
+    loss  = -delta.where(delta < 0, 0).rolling(config.RSI_PERIOD).mean()
+    macd  = close.ewm(span=config.MACD_FAST).mean() - close.ewm(span=config.MACD_SLOW).mean()
+    mid   = close.rolling(config.BBANDS_PERIOD).mean()
+    std   = close.rolling(config.BBANDS_PERIOD).std()
+
+    got = calculate_timeframes(df)["weekly"]
+    assert got["bars"] == len(weekly)
+    assert got["rsi"] == pytest.approx(round(float(100 - 100 / (1 + gain.iloc[-1] / loss.iloc[-1])), 2))
+    assert got["macd"]["macd"] == pytest.approx(round(float(macd.iloc[-1]), 4))
+    assert got["macd"]["signal"] == pytest.approx(
+        round(float(macd.ewm(span=config.MACD_SIGNAL).mean().iloc[-1]), 4))
+    bb_position = (close.iloc[-1] - (mid - 2 * std).iloc[-1]) / (4 * std.iloc[-1]) * 100
+    assert got["bb_position_pct"] == pytest.approx(round(float(bb_position), 2))
+    assert got["sma_20"] == pytest.approx(round(float(close.rolling(20).mean().iloc[-1]), 2))
+
+
+def test_short_history_gives_none_not_nan():
+    monthly = calculate_timeframes(_history(days=60))["monthly"]
+    assert monthly["rsi"] is None
+    assert monthly["sma_20"] is None and monthly["trend"] is None
+
+
+def test_needs_a_date_index():
+    assert calculate_timeframes(_history().reset_index(drop=True)) == {}
@@ -0,0 +1,156 @@
+"""
+tests/test_vector_store.py — incremental index updates
+"""
+
+import json
+import os
+import threading
+import time
+
+import pytest
+
+import config
+
+pytest.importorskip("chromadb")
+pytest.importorskip("sentence_transformers")
+from tools import vector_store                 # noqa: E402
+from tools.vector_store import diff_filings   # noqa: E402
+
+
+class _Collection:
+    """Just enough of chromadb.Collection for diff_filings."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks        # [(id, metadata)]
+
+    def get(self, where=None, include=None):
+        rows = [(i, m) for i, m in self.chunks
+                if not where or all((m or {}).get(k) == v for k, v in where.items())]
+        return {"ids": [i for i, _ in rows], "metadatas": [m for _, m in rows]}
+
+
+def _chunks(accession, n=2, ticker="AAPL"):
+    return [(f"{accession}_{i}", {"accession_number": accession, "ticker": ticker})
+            for i in range(n)]
+
+
+def _filing(accession):
+    return {"accession_number": accession, "text": "..."}
+
+
+@pytest.fixture(autouse=True)
+def per_ticker_index(monkeypatch):
+    monkeypatch.setattr(config, "SEC_GLOBAL_INDEX", False)
+
+
+def test_only_new_filings_are_embedded_and_dropped_ones_deleted():
+    collection = _Collection(_chunks("A") + _chunks("B"))
+    new, stale = diff_filings(collection, [_filing("B"), _filing("C")], "AAPL")
+    assert [f["accession_number"] for f in new] == ["C"]
+    assert stale == ["A_0", "A_1"]
+
+
+def test_failed_fetch_keeps_listed_filing():
+    collection = _Collection(_chunks("A") + _chunks("B"))
+    new, stale = diff_filings(collection, [_filing("B")], "AAPL", listed=["A", "B"])
+    assert new == []
+    assert stale == []
+
+
+def test_chunks_without_accession_are_replaced():
+    collection = _Collection([("legacy_0", {"ticker": "AAPL"}), ("legacy_1", None)])
+    new, stale = diff_filings(collection, [_filing("A")], "AAPL")
+    assert [f["accession_number"] for f in new] == ["A"]
+    assert stale == ["legacy_0", "legacy_1"]
+
+
+def test_global_index_only_diffs_the_ticker(monkeypatch):
+    monkeypatch.setattr(config, "SEC_GLOBAL_INDEX", True)
+    collection = _Collection(_chunks("A") + _chunks("M", ticker="MSFT"))
+    new, stale = diff_filings(collection, [_filing("B")], "aapl")
+    assert [f["accession_number"] for f in new] == ["B"]
+    assert stale == ["A_0", "A_1"]
+
+
+# ── Global index refresh stamps ───────────────────────────────────────────────
+
+@pytest.fixture
+def stamps_file(tmp_path, monkeypatch):
+    path = tmp_path / "refreshed.json"
+    monkeypatch.setattr(vector_store, "_refreshed_path", str(path))
+    monkeypatch.setattr(vector_store, "_refreshed", {"mtime": None, "stamps": {}})
+    return path
+
+
+def test_stamps_round_trip(stamps_file):
+    assert vector_store._refresh_entry("aapl") == {}
+    vector_store._stamp_refreshed("aapl", 120)
+    vector_store._stamp_refreshed("MSFT", 80)
+    assert vector_store._refresh_entry("AAPL")["chunks"] == 120
+    assert json.loads(stamps_file.read_text())["MSFT"]["chunks"] == 80
+    assert not list(stamps_file.parent.glob("*.tmp"))
+
+
+def test_stamps_written_by_another_process_are_picked_up(stamps_file):
+    vector_store._stamp_refreshed("AAPL", 1)
+    stamps_file.write_text(json.dumps({"AAPL": 1700000000.0, "NVDA": {"at": 1.0, "chunks": 5}}))
+    os.utime(stamps_file, (time.time() + 5, time.time() + 5))
+    assert vector_store._refresh_entry("AAPL") == {"at": 1700000000.0}    # older file format
+    assert vector_store._refresh_entry("NVDA")["chunks"] == 5
+
+
+def test_concurrent_stamps_are_not_lost(stamps_file):
+    tickers = [f"T{i}" for i in range(20)]
+    threads = [threading.Thread(target=vector_store._stamp_refreshed, args=(t, i))
+               for i, t in enumerate(tickers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert set(json.loads(stamps_file.read_text())) == set(tickers)
+
+
+# ── Batched topic retrieval ───────────────────────────────────────────────────
+
+class _QueryCollection:
+    """Scores chunk j for topic t as distances[t][j]; records query calls."""
+
+    def __init__(self, distances):
+        self.distances = distances
+        self.calls     = []
+
+    def count(self):
+        return len(self.distances[0])
+
+    def query(self, query_embeddings, n_results, where=None):
+        self.calls.append(len(query_embeddings))
+        out = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for row in self.distances:
+            order = sorted(range(len(row)), key=row.__getitem__)[:n_results]
+            out["ids"].append([f"c{j}" for j in order])
+            out["documents"].append([f"chunk {j}" for j in order])
+            out["metadatas"].append([{"chunk": j} for j in order])
+            out["distances"].append([row[j] for j in order])
+        return out
+
+
+def test_topics_share_one_query_and_never_repeat_a_chunk(monkeypatch):
+    monkeypatch.setattr(config, "SEC_GLOBAL_INDEX", False)
+    monkeypatch.setattr(vector_store, "_topic_embeddings",
+                        lambda: (["risks", "growth"], [[0.0], [1.0]]))
+    collection = _QueryCollection([
+        [0.1, 0.2, 0.9, 0.3, 0.8],          # risks
+        [0.5, 0.05, 0.1, 0.7, 0.2],         # growth: c1 is closer here than to risks
+    ])
+    picked = vector_store.query_topics(collection, "AAPL", per_topic=2)
+    assert collection.calls == [2]
+    assert [c["text"] for c in picked["risks"]] == ["chunk 0", "chunk 3"]
+    assert [c["text"] for c in picked["growth"]] == ["chunk 1", "chunk 2"]
+
+
+def test_empty_collection_has_no_topics(monkeypatch):
+    monkeypatch.setattr(config, "SEC_GLOBAL_INDEX", False)
+    monkeypatch.setattr(vector_store, "_topic_embeddings", lambda: (["risks"], [[0.0]]))
+    collection = _QueryCollection([[]])
+    assert vector_store.query_topics(collection, "AAPL") == {}
+    assert collection.calls == []
@@ -0,0 +1,100 @@
+"""
+tests/test_xbrl_facts.py — companyfacts compaction and fiscal-year alignment
+"""
+
+import numpy as np
+import pytest
+
+from tools.xbrl_facts import annual_series, compact_facts, fiscal_year
+
+
+def _point(start, end, val, filed, form="10-K", fp="FY"):
+    point = {"end": end, "val": val, "filed": filed, "form": form, "fp": fp}
+    if start:
+        point["start"] = start
+    return point
+
+
+def _raw(**concepts):
+    return {"facts": {"us-gaap": {
+        name: {"units": {"USD": points}} for name, points in concepts.items()
+    }}}
+
+
+def test_compact_keeps_annual_points_only():
+    raw = _raw(Revenues=[
+        _point("2022-01-01", "2022-12-31", 100, "2023-02-01"),
+        _point("2023-01-01", "2023-03-31", 30, "2023-05-01", form="10-Q", fp="Q1"),
+        _point("2023-01-01", "2023-06-30", 60, "2023-08-01", form="10-K", fp="FY"),   # not ~12 months
+        _point("2023-01-01", "2023-12-31", 120, "2024-02-01"),
+    ])
+    facts = compact_facts(raw)
+    assert facts == {"Revenues": {"end": ["2022-12-31", "2023-12-31"],
+                                  "val": [100, 120],
+                                  "filed": ["2023-02-01", "2024-02-01"]}}
+
+
+def test_compact_latest_filing_wins_and_untracked_concepts_are_dropped():
+    raw = _raw(
+        NetIncomeLoss=[
+            _point("2022-01-01", "2022-12-31", 10, "2023-02-01"),
+            _point("2022-01-01", "2022-12-31", 12, "2024-02-01", form="10-K/A"),   # restated
+        ],
+        CashAndCashEquivalentsAtCarryingValue=[_point(None, "2022-12-31", 5, "2023-02-01")],
+        SomethingElse=[_point("2022-01-01", "2022-12-31", 1, "2023-02-01")],
+    )
+    facts = compact_facts(raw)
+    assert facts["NetIncomeLoss"]["val"] == [12]
+    assert facts["CashAndCashEquivalentsAtCarryingValue"]["val"] == [5]
+    assert "SomethingElse" not in facts
+
+
+@pytest.mark.parametrize("end, year", [
+    ("2023-12-30", 2023),
+    ("2023-01-01", 2022),      # 52/53-week year spilling into January
+    ("2023-01-07", 2022),
+    ("2023-06-30", 2023),
+])
+def test_fiscal_year(end, year):
+    assert fiscal_year(end) == year
+
+
+def test_annual_series_keeps_gap_years_and_growth_is_year_over_year():
+    facts = {
+        "Revenues":     {"end": ["2019-12-31", "2020-12-31", "2022-12-31"],
+                         "val": [100.0, 110.0, 150.0], "filed": ["", "", ""]},
+        "GrossProfit":  {"end": ["2019-12-31", "2020-12-31", "2022-12-31"],
+                         "val": [40.0, 44.0, 75.0], "filed": ["", "", ""]},
+    }
+    series = annual_series(facts, years=10)
+    assert series["year"].tolist() == [2019, 2020, 2021, 2022]
+    np.testing.assert_array_equal(series["revenue"], [100.0, 110.0, np.nan, 150.0])
+    np.testing.assert_allclose(series["revenue_growth"], [np.nan, 0.1, np.nan, np.nan],
+                               equal_nan=True)
+    np.testing.assert_allclose(series["gross_margin"], [0.4, 0.4, np.nan, 0.5], equal_nan=True)
+
+
+def test_annual_series_prefers_earlier_concepts():
+    facts = {
+        "Revenues": {"end": ["2021-12-31"], "val": [200.0], "filed": [""]},
+        "SalesRevenueNet": {"end": ["2020-12-31", "2021-12-31"], "val": [150.0, 999.0],
+                            "filed": ["", ""]},
+    }
+    series = annual_series(facts, years=10)
+    assert series["year"].tolist() == [2020, 2021]
+    assert series["revenue"].tolist() == [150.0, 200.0]
+
+
+def test_annual_series_53_week_years_do_not_collide():
+    facts = {"Revenues": {"end": ["2022-01-02", "2022-12-31"], "val": [90.0, 100.0],
+                          "filed": ["", ""]}}
+    series = annual_series(facts, years=10)
+    assert series["year"].tolist() == [2021, 2022]
+    assert series["revenue_growth"][1] == pytest.approx(100 / 90 - 1)
+
+
+def test_annual_series_trims_to_last_years():
+    facts = {"Revenues": {"end": [f"{y}-12-31" for y in range(2010, 2024)],
+                          "val": [float(y) for y in range(2010, 2024)],
+                          "filed": [""] * 14}}
+    assert annual_series(facts, years=3)["year"].tolist() == [2021, 2022, 2023]
@@ -0,0 +1,239 @@
+"""
+tools/backtest.py — historical check of the technical signal rules
+===================================================================
+How often did RSI / MACD / MA / BBANDS (and the overall vote) call the
+next move correctly? Everything is (days, tickers) array math:
+
+    prepare_backtest()   full-series indicators (NumPy engine) + forward
+                         returns and worst/best excursions per horizon.
+                         The expensive part — done once per universe.
+    run_backtest()       signal_codes() over the whole matrix with the
+                         config.py thresholds (or overrides), then masked
+                         means per rule/direction/horizon. Milliseconds,
+                         so thresholds can be tuned interactively.
+
+    python -m tools.backtest                         # config.SCREENER_UNIVERSE
+    python -m tools.backtest AAPL MSFT --rsi 25 75 --bb 10 90 --onsets
+
+Signals are evaluated on each day's close and judged on returns from that
+close; no costs, no position sizing — this measures the rules, not a strategy.
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Sequence
+
+import numpy as np
+import config
+from tools.indicator_engine import evaluate
+from tools.price_store import get_price_history
+from tools.technical_indicators import (
+    BULLISH, BEARISH, SIGNAL_NAMES, SIGNAL_RULES,
+    signal_codes, signal_thresholds, stack_price_histories,
+)
+
+BACKTEST_SET = {
+    "close":       "close",
+    "rsi":         "rsi",
+    "macd":        "macd",
+    "macd_signal": "macd_signal",
+    "macd_hist":   "macd_hist",
+    "bb_position": "bb_position",
+    "sma_50":      ("sma", {"window": 50}),
+    "sma_200":     ("sma", {"window": 200}),
+}
+# same rounding calculate_indicators() applies before its rules fire
+_ROUNDING = {"rsi": 2, "macd": 4, "macd_signal": 4, "macd_hist": 4,
+             "bb_position": 2, "sma_50": 2, "sma_200": 2}
+
+BACKTEST_RULES = SIGNAL_RULES + ["overall"]
+
+
+# ── Preparation ───────────────────────────────────────────────────────────────
+
+def _shift_back(x: np.ndarray, h: int) -> np.ndarray:
+    """Row t holds x[t + h]; the last h rows are NaN."""
+    if h == 0:
+        return x.copy()      # x[:-0] would be an empty slice
+    out = np.full_like(x, np.nan)
+    out[:-h] = x[h:]
+    return out
+
+
+def prepare_backtest(close: np.ndarray, high: np.ndarray, low: np.ndarray,
+                     volume: np.ndarray, tickers: Sequence[str] = (),
+                     dates=None, horizons: List[int] = None) -> dict:
+    """Indicators and forward outcomes for aligned (days, tickers) matrices."""
+    horizons = horizons or config.BACKTEST_HORIZONS
+    if any(h <= 0 for h in horizons):
+        raise ValueError(f"horizons must be positive day counts, got {horizons}")
+    close = np.asarray(close, dtype=np.float64)
+    if close.ndim == 1:
+        close, high, low, volume = (np.asarray(x, dtype=np.float64)[:, None]
+                                    for x in (close, high, low, volume))
+
+    raw = evaluate({"close": close, "high": high, "low": low, "volume": volume},
+                   BACKTEST_SET, last_only=False)
+    indicators = {k: np.round(v, _ROUNDING[k]) if k in _ROUNDING else v
+                  for k, v in raw.items()}
+
+    forward, worst, best = {}, {}, {}
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for h in horizons:
+            if h >= len(close):
+                continue
+            forward[h] = _shift_back(close, h) / close - 1
+            # path over the next h closes → max adverse move for either side
+            path = np.lib.stride_tricks.sliding_window_view(close[1:], h, axis=0)
+            lo = np.full_like(close, np.nan)
+            hi = np.full_like(close, np.nan)
+            lo[:len(path)] = path.min(axis=-1)
+            hi[:len(path)] = path.max(axis=-1)
+            worst[h] = lo / close - 1
+            best[h]  = hi / close - 1
+
+    return {
+        "tickers":    list(tickers),
+        "dates":      dates,
+        "indicators": indicators,
+        "forward":    forward,
+        "worst":      worst,
+        "best":       best,
+    }
+
+
+def load_universe(tickers: List[str] = None, horizons: List[int] = None) -> dict:
+    """prepare_backtest() over price-store histories (fetched concurrently)."""
+    tickers = [t.upper() for t in (tickers or config.SCREENER_UNIVERSE)]
+
+    def fetch(ticker):
+        try:
+            return get_price_history(ticker)
+        except Exception as e:
+            print(f"  [Backtest] {ticker} skipped: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        histories = dict(zip(tickers, pool.map(fetch, tickers)))
+    histories = {t: h for t, h in histories.items() if h is not None and not h.empty}
+    if not histories:
+        raise RuntimeError("No price history available to backtest")
+
+    names, dates, close, high, low, volume = stack_price_histories(histories)
+    return prepare_backtest(close, high, low, volume, names, dates, horizons)
+
+
+# ── Evaluation ────────────────────────────────────────────────────────────────
+
+def _summary(values: np.ndarray, direction: int, adverse: np.ndarray) -> dict:
+    if values.size == 0:
+        return {"signals": 0, "hit_rate": None, "avg_return_pct": None,
+                "median_return_pct": None, "avg_drawdown_pct": None}
+    return {
+        "signals":           int(values.size),
+        "hit_rate":          round(float(np.mean(values * direction > 0)), 4),
+        "avg_return_pct":    round(float(np.mean(values)) * 100, 3),
+        "median_return_pct": round(float(np.median(values)) * 100, 3),
+        # for a BEARISH call the adverse move is the run-up after it
+        "avg_drawdown_pct":  round(float(np.mean(adverse)) * 100, 3),
+    }
+
+
+def run_backtest(prepared: dict, onsets_only: bool = False, **thresholds) -> dict:
+    """
+    Score every rule against forward returns.
+    onsets_only → count a signal only on the day it switches on, instead of
+    every day it stays on (less overlap between samples).
+    """
+    start = time.time()
+    ind   = prepared["indicators"]
+    codes = signal_codes(ind["rsi"], ind["macd"], ind["macd_signal"], ind["macd_hist"],
+                         ind["close"], ind["sma_50"], ind["sma_200"], ind["bb_position"],
+                         **thresholds)
+
+    baseline = {}
+    for h, fwd in prepared["forward"].items():
+        values = fwd[np.isfinite(fwd)]
+        baseline[f"{h}d"] = {
+            "samples":        int(values.size),
+            "pct_positive":   round(float(np.mean(values > 0)), 4) if values.size else None,
+            "avg_return_pct": round(float(np.mean(values)) * 100, 3) if values.size else None,
+        }
+
+    rules = {}
+    for rule in BACKTEST_RULES:
+        rules[rule] = {}
+        for direction in (BULLISH, BEARISH):
+            active = codes[rule] == direction
+            if onsets_only:
+                active = active & ~np.vstack([np.zeros_like(active[:1]), active[:-1]])
+            result = {"days_active": int(active.sum())}
+            for h, fwd in prepared["forward"].items():
+                mask    = active & np.isfinite(fwd)
+                adverse = prepared["worst" if direction == BULLISH else "best"][h]
+                result[f"{h}d"] = _summary(fwd[mask], direction, adverse[mask])
+            rules[rule][SIGNAL_NAMES[direction]] = result
+
+    dates = prepared.get("dates")
+    return {
+        "tickers":    prepared["indicators"]["close"].shape[1],
+        "period":     [str(dates[0])[:10], str(dates[-1])[:10]] if dates is not None and len(dates) else None,
+        "thresholds": signal_thresholds(**thresholds),
+        "onsets_only": onsets_only,
+        "baseline":   baseline,
+        "rules":      rules,
+        "elapsed_seconds": round(time.time() - start, 3),
+        "status":     "success",
+    }
+
+
+def format_report(result: dict) -> str:
+    """Plain-text table of run_backtest() output."""
+    horizons = list(result["baseline"])
+    lines = [
+        f"Backtest: {result['tickers']} tickers, {result['period'] and ' → '.join(result['period'])}",
+        f"Thresholds: {result['thresholds']}" + ("  (onsets only)" if result["onsets_only"] else ""),
+        "",
+        f"{'rule':<8}{'side':<9}" + "".join(f"{h + '  n / hit / avg / drawdown':>31}" for h in horizons),
+    ]
+    base = "".join(f"{'':>15}{b['pct_positive'] or 0:>6.1%}  {b['avg_return_pct'] or 0:>+6.2f}% "
+                   for b in result["baseline"].values())
+    lines.append(f"{'any day':<17}" + base)
+    for rule, sides in result["rules"].items():
+        for side, stats in sides.items():
+            cells = ""
+            for h in horizons:
+                s = stats[h]
+                cells += (f"{'-':>31}" if not s["signals"] else
+                          f"{s['signals']:>7} {s['hit_rate']:>6.1%}  {s['avg_return_pct']:>+6.2f}% "
+                          f"{s['avg_drawdown_pct']:>+6.2f}%")
+            lines.append(f"{rule:<8}{side:<9}" + cells)
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Backtest the technical signal rules")
+    parser.add_argument("tickers", nargs="*", help="default: config.SCREENER_UNIVERSE")
+    parser.add_argument("--rsi", nargs=2, type=float, metavar=("OVERSOLD", "OVERBOUGHT"))
+    parser.add_argument("--bb",  nargs=2, type=float, metavar=("LOWER", "UPPER"))
+    parser.add_argument("--horizons", nargs="+", type=int)
+    parser.add_argument("--onsets", action="store_true", help="count signal onsets only")
+    args = parser.parse_args(argv)
+
+    start = time.time()
+    prepared = load_universe(args.tickers or None, args.horizons)
+    print(f"[Backtest] Prepared in {time.time() - start:.1f}s")
+
+    thresholds = {}
+    if args.rsi:
+        thresholds.update(rsi_oversold=args.rsi[0], rsi_overbought=args.rsi[1])
+    if args.bb:
+        thresholds.update(bb_lower_pct=args.bb[0], bb_upper_pct=args.bb[1])
+    result = run_backtest(prepared, onsets_only=args.onsets, **thresholds)
+    print(format_report(result))
+    print(f"\n[Backtest] Rules scored in {result['elapsed_seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,67 @@
 import yfinance as yf
 import pandas as pd
 import numpy as np
+import json
+import os
+import time
 from datetime import datetime
 import config
+from tools.price_store import get_price_history
+from tools.risk_metrics import compute_risk
+
+# yfinance `info` fields we actually use — the cached copy keeps only these
+FUNDAMENTAL_FIELDS = [
+    "longName", "shortName", "quoteType", "sector", "industry", "country",
+    "fullTimeEmployees", "longBusinessSummary", "marketCap", "trailingPE",
+    "forwardPE", "trailingEps", "totalRevenue", "revenueGrowth",
+    "earningsGrowth", "grossMargins", "operatingMargins", "profitMargins",
+    "debtToEquity", "returnOnEquity", "freeCashflow", "dividendYield",
+    "fiftyTwoWeekHigh", "fiftyTwoWeekLow", "targetMeanPrice",
+    "recommendationKey", "beta",
+]
+
+
+def get_fundamentals(ticker: str, max_age: float = None) -> dict:
+    """
+    Company info/fundamentals (yfinance `info` subset), cached on disk.
+    yfinance info scraping is the slowest call we make, and the numbers
+    change at most daily — so one fetch per ticker per FUNDAMENTALS_TTL.
+    """
+    ticker = ticker.upper()
+    max_age = config.FUNDAMENTALS_TTL if max_age is None else max_age
+    path = os.path.join(config.FUNDAMENTALS_DIR, f"{ticker}.json")
+    try:
+        with open(path) as f:
+            cached = json.load(f)
+        if time.time() - cached["fetched_at"] < max_age:
+            return cached["info"]
+    except Exception:
+        pass
+
+    raw = yf.Ticker(ticker).info or {}
+    info = {k: raw.get(k) for k in FUNDAMENTAL_FIELDS if raw.get(k) is not None}
+    os.makedirs(config.FUNDAMENTALS_DIR, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"fetched_at": time.time(), "info": info}, f)
+    return info
+
+
+def cached_fundamentals() -> dict:
+    """Every ticker's cached info, regardless of age — {ticker: info}."""
+    out = {}
+    try:
+        names = os.listdir(config.FUNDAMENTALS_DIR)
+    except FileNotFoundError:
+        return out
+    for name in names:
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(config.FUNDAMENTALS_DIR, name)) as f:
+                out[name[:-5]] = json.load(f)["info"]
+        except Exception:
+            continue
+    return out
 
 def get_stock_data(ticker: str) -> dict:
     """
@@ -12,13 +71,8 @@ def get_stock_data(ticker: str) -> dict:
     print(f"  [Financial Agent] Fetching data for {ticker}...")
     
     try:
-        stock = yf.Ticker(ticker)
-        
         # ─── Price History ────────────────────────────────────
-        hist = stock.history(
-            period=config.DEFAULT_PERIOD,
-            interval=config.DEFAULT_INTERVAL
-        )
+        hist = get_price_history(ticker)
         
         if hist.empty:
             return {"error": f"No price data found for {ticker}"}
@@ -44,7 +98,7 @@ def get_stock_data(ticker: str) -> dict:
         volatility_annualized = round(daily_returns.std() * np.sqrt(252) * 100, 2)
         
         # ─── Company Info ─────────────────────────────────────
-        info = stock.info
+        info = get_fundamentals(ticker)
         
         company_data = {
             "name": info.get("longName", ticker),
@@ -78,8 +132,7 @@ def get_stock_data(ticker: str) -> dict:
         }
         
         # ─── Benchmark Comparison ─────────────────────────────
-        benchmark = yf.Ticker(config.BENCHMARK_TICKER)
-        bench_hist = benchmark.history(period=config.DEFAULT_PERIOD)
+        bench_hist = get_price_history(config.BENCHMARK_TICKER)
         
         if not bench_hist.empty:
             bench_year_ago = bench_hist['Close'].iloc[-252] if len(bench_hist) >= 252 else bench_hist['Close'].iloc[0]
@@ -88,6 +141,9 @@ def get_stock_data(ticker: str) -> dict:
         else:
             bench_1yr_return = "N/A"
         
+        # ─── Risk Metrics ─────────────────────────────────────
+        risk = compute_risk(hist['Close'], bench_hist['Close'] if not bench_hist.empty else None)
+        
         return {
             "ticker": ticker,
             "company": company_data,
@@ -95,6 +151,7 @@ def get_stock_data(ticker: str) -> dict:
             "performance": performance,
             "volatility_annualized_pct": volatility_annualized,
             "benchmark_1yr_return": bench_1yr_return,
+            "risk": risk,
             "price_history": hist,  # DataFrame for technical agent
             "status": "success"
         }
@@ -0,0 +1,100 @@
+"""
+tools/dca_simulator.py — Monte Carlo dollar-cost averaging
+===========================================================
+"What could $350/month in this stock look like in 1, 3, 5 years?"
+answered from the stock's own history instead of the LLM's imagination.
+
+Each simulated month draws one random 21-trading-day block of historical
+daily returns (block bootstrap — keeps intra-month streaks and volatility
+clustering). All paths × months are drawn and compounded at once:
+
+    value_t = C · G_t · Σ_{k≤t} 1 / G_{k-1}      G_t = cumulative growth
+
+so DCA_PATHS paths cost one cumsum/cumprod over a (paths, months) matrix —
+a few milliseconds. It is a resampling of the past, not a forecast; the
+result says so and the synthesis prompt is told so.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+import config
+
+BLOCK_DAYS = 21                         # trading days per simulated month
+PERCENTILES = [5, 25, 50, 75, 95]
+
+
+def monthly_block_returns(close) -> np.ndarray:
+    """Log growth of every overlapping 21-day window in the history."""
+    close = np.asarray(close, dtype=np.float64)
+    close = close[np.isfinite(close) & (close > 0)]
+    if len(close) <= BLOCK_DAYS:
+        return np.empty(0)
+    log_close = np.log(close)
+    return log_close[BLOCK_DAYS:] - log_close[:-BLOCK_DAYS]
+
+
+def simulate_paths(blocks: np.ndarray, monthly: float, months: int,
+                   paths: int = None, seed: Optional[int] = None) -> np.ndarray:
+    """(paths, months) portfolio values; contribution at the start of each month."""
+    paths = paths or config.DCA_PATHS
+    rng   = np.random.default_rng(config.DCA_SEED if seed is None else seed)
+    draws = blocks[rng.integers(0, len(blocks), size=(paths, months))]
+    growth = np.exp(np.cumsum(draws, axis=1))                      # G_1 … G_T
+    prior  = np.concatenate([np.ones((paths, 1)), growth[:, :-1]], axis=1)
+    return monthly * growth * np.cumsum(1.0 / prior, axis=1)
+
+
+def simulate_dca(close: pd.Series, monthly_investable: str = "200_500",
+                 monthly: float = None) -> dict:
+    """
+    Percentile outcomes of investing a fixed monthly amount, for each
+    horizon in config.DCA_HORIZONS_MONTHS. `monthly` overrides the
+    amount mapped from the profile's budget bucket.
+    """
+    monthly = monthly or config.DCA_MONTHLY_AMOUNTS.get(monthly_investable, 350)
+    blocks  = monthly_block_returns(close)
+    if len(blocks) < BLOCK_DAYS:
+        return {"error": "Not enough price history to simulate", "status": "failed"}
+
+    horizons = [h for h in config.DCA_HORIZONS_MONTHS if h > 0]
+    values   = simulate_paths(blocks, monthly, max(horizons))
+
+    outcomes = {}
+    for h in horizons:
+        final    = values[:, h - 1]
+        invested = monthly * h
+        pct      = np.percentile(final, PERCENTILES)
+        outcomes[f"{h}m"] = {
+            "months":             h,
+            "invested":           round(invested, 2),
+            "percentiles":        {f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, pct)},
+            "median_return_pct":  round((float(pct[2]) / invested - 1) * 100, 2),
+            "probability_of_loss": round(float(np.mean(final < invested)), 3),
+        }
+    return {
+        "monthly_amount":  monthly,
+        "budget_bucket":   monthly_investable,
+        "paths":           len(values),
+        "history_days":    len(blocks) + BLOCK_DAYS,
+        "method":          f"block bootstrap of {BLOCK_DAYS}-day historical returns",
+        "outcomes":        outcomes,
+        "status":          "success",
+    }
+
+
+def format_dca_summary(dca: Dict) -> str:
+    """One line per horizon for the synthesis prompt."""
+    if not dca or dca.get("status") != "success":
+        return "DCA simulation unavailable"
+    lines = [f"Investing ${dca['monthly_amount']:,.0f}/month "
+             f"({dca['paths']:,} resampled paths from {dca['history_days']} days of history):"]
+    for o in dca["outcomes"].values():
+        p = o["percentiles"]
+        lines.append(
+            f"- {o['months']} months: ${o['invested']:,.0f} invested → median ${p['p50']:,.0f} "
+            f"(5th pct ${p['p5']:,.0f}, 95th pct ${p['p95']:,.0f}), "
+            f"chance of loss {o['probability_of_loss']:.0%}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,156 @@
+"""
+tools/embedding_backend.py — pluggable embedding model backend
+===============================================================
+config.EMBEDDING_BACKEND picks how the embedding model runs on CPU:
+
+    torch       SentenceTransformer on PyTorch (reference)
+    onnx        same weights exported to ONNX Runtime
+    onnx-int8   ONNX with int8 dynamically-quantized weights
+                (config.EMBEDDING_ONNX_INT8_FILE from the model repo)
+
+Everything that loads the model (vector_store, the embedding service,
+ingestion workers) goes through load_model(), so switching backends is a
+config change. Vectors from different backends are close but not equal,
+so the embedding cache is keyed by model_id() — "{model}@{backend}",
+where backend is the one that actually loads: an ONNX backend without its
+dependencies resolves to torch up front, and a failing ONNX load raises
+instead of quietly switching backends.
+
+Before switching, check retrieval agreement against the reference on a
+real collection:
+
+    python -m tools.embedding_backend AAPL --backend onnx-int8
+"""
+
+import argparse
+import functools
+import importlib.util
+import time
+from typing import List
+
+import numpy as np
+import config
+
+BACKENDS  = ("torch", "onnx", "onnx-int8")
+ONNX_DEPS = ("onnxruntime", "optimum.onnxruntime")
+
+
+@functools.lru_cache(maxsize=None)
+def _missing_onnx_deps() -> tuple:
+    missing = []
+    for module in ONNX_DEPS:
+        try:
+            found = importlib.util.find_spec(module) is not None
+        except ImportError:          # parent package (optimum) not installed
+            found = False
+        if not found:
+            missing.append(module)
+    return tuple(missing)
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_backend(backend: str = None) -> str:
+    """
+    The backend that will actually run. An ONNX backend without
+    onnxruntime / optimum installed resolves to torch — decided here, once,
+    so model_id() (the embedding cache key) always names the backend that
+    produced the vectors.
+    """
+    backend = backend or config.EMBEDDING_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown EMBEDDING_BACKEND {backend!r} — expected one of {BACKENDS}")
+    if backend != "torch" and _missing_onnx_deps():
+        print(f"[Embedding] {backend} backend unavailable ({', '.join(_missing_onnx_deps())} "
+              "not installed) — using torch (pip install 'sentence-transformers[onnx]')")
+        return "torch"
+    return backend
+
+
+def model_id(backend: str = None) -> str:
+    return f"{config.EMBEDDING_MODEL}@{resolve_backend(backend)}"
+
+
+def load_model(backend: str = None):
+    """SentenceTransformer for the configured (or given) backend, as resolved by resolve_backend()."""
+    from sentence_transformers import SentenceTransformer
+
+    backend = resolve_backend(backend)
+    if backend == "torch":
+        return SentenceTransformer(config.EMBEDDING_MODEL)
+    kwargs = {"file_name": config.EMBEDDING_ONNX_INT8_FILE} if backend == "onnx-int8" else {}
+    try:
+        return SentenceTransformer(config.EMBEDDING_MODEL, backend="onnx", model_kwargs=kwargs)
+    except Exception as e:
+        # no silent torch fallback: its vectors would land under the ONNX cache key
+        raise RuntimeError(f"Could not load the {backend} embedding backend: {e}") from e
+
+
+# ── Parity check ──────────────────────────────────────────────────────────────
+
+def _unit(vectors) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def parity_check(documents: List[str], queries: List[str], backend: str,
+                 reference: str = "torch", k: int = None) -> dict:
+    """
+    Compare `backend` with `reference` on the same documents and queries:
+    mean / min cosine between paired document vectors, top-k overlap of
+    the retrieved documents per query, and encode time for each backend.
+    Vectors are also round-tripped through config.EMBEDDING_STORE_DTYPE,
+    as the embedding cache stores them.
+    """
+    for name in (reference, backend):
+        if resolve_backend(name) != name:
+            raise RuntimeError(f"{name} backend is not available — install sentence-transformers[onnx]")
+    k = min(k or config.TOP_K_RESULTS, len(documents))
+    store = np.dtype(config.EMBEDDING_STORE_DTYPE)
+    results = {}
+    for name in (reference, backend):
+        model = load_model(name)
+        start = time.time()
+        docs  = _unit(np.asarray(model.encode(documents, batch_size=64)).astype(store))
+        seconds = time.time() - start
+        qs    = _unit(model.encode(queries))
+        top   = np.argsort(-(qs @ docs.T), axis=1)[:, :k]
+        results[name] = {"docs": docs, "top": top, "seconds": seconds}
+
+    ref, cand = results[reference], results[backend]
+    paired  = (ref["docs"] * cand["docs"]).sum(axis=1)
+    overlap = [len(set(a) & set(b)) / k for a, b in zip(ref["top"], cand["top"])]
+    return {
+        "backend":           backend,
+        "reference":         reference,
+        "documents":         len(documents),
+        "queries":           len(queries),
+        "k":                 k,
+        "mean_cosine":       round(float(paired.mean()), 4),
+        "min_cosine":        round(float(paired.min()), 4),
+        "topk_overlap":      round(float(np.mean(overlap)), 3),
+        "reference_seconds": round(ref["seconds"], 2),
+        "backend_seconds":   round(cand["seconds"], 2),
+        "speedup":           round(ref["seconds"] / cand["seconds"], 2) if cand["seconds"] else None,
+    }
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Check an embedding backend against torch")
+    parser.add_argument("ticker", help="ticker with an indexed SEC collection")
+    parser.add_argument("--backend", default="onnx-int8", choices=BACKENDS)
+    parser.add_argument("--reference", default="torch", choices=BACKENDS)
+    parser.add_argument("--limit", type=int, default=2000, help="max documents")
+    args = parser.parse_args(argv)
+
+    from tools import vector_store
+    documents = vector_store.collection_documents(args.ticker, args.limit)
+    if not documents:
+        raise SystemExit(f"No indexed chunks for {args.ticker} — run an analysis or tools.ingest first")
+    report = parity_check(documents, list(vector_store.INSIGHT_QUERIES.values()),
+                          args.backend, args.reference)
+    for key, value in report.items():
+        print(f"  {key:<18} {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+tools/embedding_cache.py — persistent chunk-embedding cache
+============================================================
+10-Qs repeat large parts of the prior 10-K word for word (risk factors,
+accounting policies, boilerplate), so most chunks of a new filing have
+been embedded before. The cache keeps every vector ever computed, per
+embedding model:
+
+    output/embeddings/{model}/meta.json     model name, dimension, dtype
+    output/embeddings/{model}/keys.bin      per row: sha1(normalized text), simhash
+    output/embeddings/{model}/vectors.f16   rows, read through np.memmap
+
+Vectors are stored as config.EMBEDDING_STORE_DTYPE (float16 by default —
+half the disk and page cache of float32, well below the noise between
+embedding backends) and returned as float32. An existing cache keeps the
+dtype recorded in its meta.json.
+
+Rows are append-only and the two files grow in lockstep, so a row number
+is the same in both; keys.bin is authoritative, and an append first trims
+any vector rows a crashed writer left without keys. Appends take an
+exclusive file lock, and readers pick up rows written by other processes
+(uvicorn workers, ingestion) by checking the file length.
+
+Lookup is exact on the hash of whitespace-normalized text. Misses then
+try near-duplicate reuse: a 64-bit simhash over word shingles, matched
+within EMBEDDING_CACHE_NEAR_DUP_BITS bits through four 16-bit band
+tables (any two hashes within 3 bits agree on at least one band).
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import config
+from tools.embedding_backend import model_id
+
+try:
+    import fcntl
+    _have_flock = True
+except ImportError:          # Windows: single-process use only
+    _have_flock = False
+
+KEY_DTYPE          = np.dtype([("digest", "V20"), ("simhash", "<u8")])   # V: "S" drops trailing NULs
+BANDS              = 4
+MIN_NEAR_DUP_WORDS = 20      # simhash of short text is too noisy to trust
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.sha1(text.encode("utf-8")).digest()
+
+
+_BITS = np.uint64(1) << np.arange(64, dtype=np.uint64)
+
+
+def simhash(text: str) -> int:
+    """64-bit simhash over 3-word shingles."""
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < 3:
+        return 0
+    shingles = {" ".join(words[i:i + 3]) for i in range(len(words) - 2)}
+    hashes = np.array([int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "little")
+                       for s in shingles], dtype=np.uint64)
+    votes = ((hashes[:, None] & _BITS) != 0).sum(axis=0) * 2 - len(hashes)
+    return int((_BITS * (votes > 0)).sum())
+
+
+def _bands(h: int) -> List[Tuple[int, int]]:
+    return [(b, (h >> (16 * b)) & 0xFFFF) for b in range(BANDS)]
+
+
+class EmbeddingCache:
+    def __init__(self, model_name: str, directory: str = None):
+        slug = re.sub(r"[^\w.-]+", "_", model_name)
+        self.model_name = model_name
+        self.dir        = os.path.join(directory or config.EMBEDDING_CACHE_DIR, slug)
+        self.keys_path  = os.path.join(self.dir, "keys.bin")
+        self.lock       = threading.Lock()
+        os.makedirs(self.dir, exist_ok=True)
+
+        self.dim   = None
+        self.dtype = np.dtype(config.EMBEDDING_STORE_DTYPE)
+        self._load_meta()
+        self.rows: Dict[bytes, int] = {}
+        self.simhashes: List[int] = []
+        self.band_index: Dict[Tuple[int, int], List[int]] = {}
+        self.vectors = None
+        self._sync()
+
+    # ── Index maintenance ─────────────────────────────────────────────────────
+
+    @property
+    def vecs_path(self) -> str:
+        return os.path.join(self.dir, f"vectors.f{self.dtype.itemsize * 8}")
+
+    def _load_meta(self) -> None:
+        try:
+            with open(os.path.join(self.dir, "meta.json")) as f:
+                meta = json.load(f)
+        except Exception:
+            return
+        self.dim   = meta["dim"]
+        self.dtype = np.dtype(meta.get("dtype", "float32"))
+
+    def _sync(self) -> None:
+        """Load rows appended since the last sync (by this or another process)."""
+        try:
+            size = os.path.getsize(self.keys_path)
+        except FileNotFoundError:
+            return
+        count = size // KEY_DTYPE.itemsize
+        if self.dim is None:
+            self._load_meta()           # created by another process
+            if self.dim is None:
+                return
+        have  = len(self.simhashes)
+        if count > have:
+            keys = np.fromfile(self.keys_path, dtype=KEY_DTYPE, count=count)
+            for row in range(have, count):
+                self._index(keys["digest"][row].tobytes(), int(keys["simhash"][row]), row)
+        if count and self.dim and (self.vectors is None or len(self.vectors) != count):
+            self.vectors = np.memmap(self.vecs_path, dtype=self.dtype, mode="r",
+                                     shape=(count, self.dim))
+
+    def _index(self, digest: bytes, h: int, row: int) -> None:
+        self.rows.setdefault(digest, row)
+        self.simhashes.append(h)
+        if h:
+            for band in _bands(h):
+                self.band_index.setdefault(band, []).append(row)
+
+    def _near_duplicate(self, h: int):
+        max_bits = config.EMBEDDING_CACHE_NEAR_DUP_BITS
+        if not h or max_bits <= 0:
+            return None
+        for band in _bands(h):
+            for row in self.band_index.get(band, ()):
+                if bin(h ^ self.simhashes[row]).count("1") <= max_bits:
+                    return row
+        return None
+
+    # ── Public API ────────────────────────────────────────────────────────────
+
+    def lookup(self, texts: List[str]) -> Tuple[Dict[int, np.ndarray], List[int]]:
+        """({position: vector} for cache hits, positions that still need encoding)."""
+        with self.lock:
+            self._sync()
+            found, missing = {}, []
+            for i, text in enumerate(texts):
+                norm = normalize(text)
+                row  = self.rows.get(_digest(norm))
+                if row is None and len(norm.split()) >= MIN_NEAR_DUP_WORDS:
+                    row = self._near_duplicate(simhash(norm))
+                if row is not None and self.vectors is not None and row < len(self.vectors):
+                    found[i] = np.array(self.vectors[row], dtype=np.float32)
+                else:
+                    missing.append(i)
+            return found, missing
+
+    def put(self, texts: List[str], vectors) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(texts):
+            return
+        with self.lock:
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                with open(os.path.join(self.dir, "meta.json"), "w") as f:
+                    json.dump({"model": self.model_name, "dim": self.dim,
+                               "dtype": self.dtype.name}, f)
+            with open(os.path.join(self.dir, "lock"), "w") as lock_file:
+                if _have_flock:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._sync()                     # rows other processes added meanwhile
+                synced = len(self.simhashes)     # key rows on disk
+                keys, new = [], []
+                for text, vector in zip(texts, vectors):
+                    norm   = normalize(text)
+                    digest = _digest(norm)
+                    if digest in self.rows:
+                        continue
+                    h = simhash(norm) if len(norm.split()) >= MIN_NEAR_DUP_WORDS else 0
+                    self._index(digest, h, len(self.simhashes))
+                    keys.append((digest, h))
+                    new.append(vector)
+                if new:
+                    # vectors first: a key row never points past the vector file.
+                    # A crash between the two writes leaves vector rows with no
+                    # key; cut them off so the next rows line up again.
+                    with open(self.vecs_path, "ab") as f:
+                        f.truncate(synced * self.dim * self.dtype.itemsize)
+                        f.write(np.stack(new).astype(self.dtype).tobytes())
+                    with open(self.keys_path, "ab") as f:
+                        f.write(np.array(keys, dtype=KEY_DTYPE).tobytes())
+                    self._sync()
+
+    def stats(self) -> dict:
+        return {"model": self.model_name, "rows": len(self.simhashes), "dim": self.dim,
+                "dtype": self.dtype.name,
+                "bytes": sum(os.path.getsize(p) for p in (self.keys_path, self.vecs_path)
+                             if os.path.exists(p))}
+
+
+_caches: Dict[str, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(model_name: str = None) -> EmbeddingCache:
+    model_name = model_name or model_id()
+    with _caches_lock:
+        if model_name not in _caches:
+            _caches[model_name] = EmbeddingCache(model_name)
+        return _caches[model_name]
+
+
+def encode_cached(texts: List[str], encode: Callable[[List[str]], np.ndarray],
+                  model_name: str = None) -> np.ndarray:
+    """Embed `texts`, calling `encode` only for texts the cache has never seen."""
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    cache = get_cache(model_name)
+    found, missing = cache.lookup(texts)
+    if missing:
+        fresh = np.asarray(encode([texts[i] for i in missing]), dtype=np.float32)
+        cache.put([texts[i] for i in missing], fresh)
+        found.update(zip(missing, fresh))
+    print(f"  [Embedding Cache] {len(texts) - len(missing)}/{len(texts)} chunks reused, "
+          f"{len(missing)} encoded")
+    return np.stack([found[i] for i in range(len(texts))])
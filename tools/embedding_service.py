@@ -0,0 +1,207 @@
+"""
+tools/embedding_service.py — shared local embedding service
+============================================================
+One process holds the SentenceTransformer; every uvicorn worker, thread
+and ingestion run sends its encode requests here over a local socket
+instead of loading its own copy of the model:
+
+    EMBEDDING_SERVICE_AUTHKEY=<secret> python -m tools.embedding_service
+
+Requests arriving together are merged into one model call: the batcher
+takes the first waiting request, then keeps collecting until it has
+EMBEDDING_SERVICE_MAX_BATCH texts or EMBEDDING_SERVICE_MAX_WAIT_MS has
+passed, encodes everything at once and hands each caller its rows. Under
+concurrent load this replaces many small competing encode() calls with a
+few large ones.
+
+Clients (tools.vector_store) use service_encode(); it returns None when
+no service is listening, and the caller encodes in-process instead.
+
+Transport: a Unix socket (EMBEDDING_SERVICE_SOCKET, mode 0600) with the
+multiprocessing.connection HMAC handshake on EMBEDDING_SERVICE_AUTHKEY.
+Nothing is pickled — requests are a JSON list of strings, responses a
+status byte, a (rows, dim) header and raw float32 rows. Without an
+explicit authkey the service refuses to start and clients never connect.
+"""
+
+import json
+import os
+import queue
+import stat
+import struct
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+from typing import List, Optional
+
+import numpy as np
+import config
+
+RETRY_AFTER       = 30            # seconds before retrying an unreachable service
+MAX_REQUEST_BYTES = 64 * 2 ** 20  # largest request the server will read
+_HEADER           = struct.Struct("<BII")   # status, rows, dim
+_OK, _ERROR       = 0, 1
+
+
+def _encode_response(vectors: np.ndarray) -> bytes:
+    vectors = np.ascontiguousarray(vectors, dtype="<f4")
+    rows, dim = vectors.shape if vectors.ndim == 2 else (0, 0)
+    return _HEADER.pack(_OK, rows, dim) + vectors.tobytes()
+
+
+def _decode_response(payload: bytes) -> np.ndarray:
+    status, rows, dim = _HEADER.unpack_from(payload)
+    body = payload[_HEADER.size:]
+    if status != _OK:
+        raise RuntimeError(f"Embedding service error: {body.decode('utf-8', 'replace')}")
+    return np.frombuffer(body, dtype="<f4").reshape(rows, dim).astype(np.float32)
+
+
+# ── Server ────────────────────────────────────────────────────────────────────
+
+class _Request:
+    def __init__(self, texts: List[str]):
+        self.texts  = texts
+        self.result = None
+        self.error  = None
+        self.done   = threading.Event()
+
+
+def _batcher(model, requests: "queue.Queue[_Request]", stats: dict) -> None:
+    max_batch = config.EMBEDDING_SERVICE_MAX_BATCH
+    max_wait  = config.EMBEDDING_SERVICE_MAX_WAIT_MS / 1000
+    while True:
+        batch    = [requests.get()]
+        size     = len(batch[0].texts)
+        deadline = time.monotonic() + max_wait
+        while size < max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                req = requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(req)
+            size += len(req.texts)
+
+        texts = [t for req in batch for t in req.texts]
+        try:
+            vectors = np.asarray(model.encode(texts, batch_size=64), dtype=np.float32)
+            start = 0
+            for req in batch:
+                req.result = vectors[start:start + len(req.texts)]
+                start += len(req.texts)
+        except Exception as e:
+            for req in batch:
+                req.error = str(e)
+        for req in batch:
+            req.done.set()
+        stats["batches"] += 1
+        stats["texts"]   += len(texts)
+
+
+def _error_response(message: str) -> bytes:
+    return _HEADER.pack(_ERROR, 0, 0) + message.encode("utf-8")
+
+
+def _handle(conn, requests: "queue.Queue[_Request]") -> None:
+    try:
+        while True:
+            try:
+                texts = json.loads(conn.recv_bytes(MAX_REQUEST_BYTES))
+            except ValueError as e:
+                conn.send_bytes(_error_response(f"bad request: {e}"))
+                continue
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                conn.send_bytes(_error_response("bad request: expected a JSON list of strings"))
+                continue
+            req = _Request(texts)
+            requests.put(req)
+            req.done.wait()
+            conn.send_bytes(_error_response(req.error) if req.error else _encode_response(req.result))
+    except (EOFError, OSError):
+        pass
+    finally:
+        conn.close()
+
+
+def _bind(path: str) -> Listener:
+    """Listener on a Unix socket only this user can open."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+        os.unlink(path)                         # left over from a previous run
+    umask = os.umask(0o177)                     # socket created as 0600
+    try:
+        return Listener(path, family="AF_UNIX", backlog=128,
+                        authkey=config.EMBEDDING_SERVICE_AUTHKEY)
+    finally:
+        os.umask(umask)
+
+
+def serve(path: str = None) -> None:
+    from tools.embedding_backend import load_model
+
+    if not config.EMBEDDING_SERVICE_AUTHKEY:
+        raise SystemExit("[Embedding Service] Set EMBEDDING_SERVICE_AUTHKEY (a random secret shared "
+                         "with the backend) to run the service")
+    path = path or config.EMBEDDING_SERVICE_SOCKET
+    print(f"[Embedding Service] Loading {config.EMBEDDING_MODEL} ({config.EMBEDDING_BACKEND})...")
+    model    = load_model()
+    requests = queue.Queue()
+    stats    = {"batches": 0, "texts": 0}
+    threading.Thread(target=_batcher, args=(model, requests, stats), daemon=True).start()
+
+    with _bind(path) as listener:
+        print(f"[Embedding Service] Listening on {path}")
+        while True:
+            try:
+                conn = listener.accept()
+            except KeyboardInterrupt:
+                break
+            except Exception as e:
+                print(f"[Embedding Service] Rejected connection: {e}")
+                continue
+            threading.Thread(target=_handle, args=(conn, requests), daemon=True).start()
+    print(f"[Embedding Service] Stopped after {stats['texts']} texts in {stats['batches']} batches")
+
+
+# ── Client ────────────────────────────────────────────────────────────────────
+
+_local      = threading.local()         # one connection per calling thread
+_down_until = 0.0
+
+
+def _connection():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = Client(config.EMBEDDING_SERVICE_SOCKET, family="AF_UNIX",
+                      authkey=config.EMBEDDING_SERVICE_AUTHKEY)
+        _local.conn = conn
+    return conn
+
+
+def service_encode(texts: List[str]) -> Optional[np.ndarray]:
+    """Encode through the shared service; None if it isn't reachable or the encode failed."""
+    global _down_until
+    if not config.EMBEDDING_SERVICE_ENABLED or time.time() < _down_until:
+        return None
+    try:
+        conn = _connection()
+        conn.send_bytes(json.dumps(list(texts)).encode("utf-8"))
+        payload = conn.recv_bytes()
+    except Exception as e:
+        _local.conn = None
+        _down_until = time.time() + RETRY_AFTER
+        print(f"  [Embedding] Service unavailable ({e}) — encoding in-process")
+        return None
+    try:
+        return _decode_response(payload)
+    except Exception as e:
+        # the service answered but failed this batch — the connection is still good
+        print(f"  [Embedding] {e} — encoding in-process")
+        return None
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,164 @@
+"""
+tools/filing_sections.py — section-aware 10-K / 10-Q text extraction
+=====================================================================
+Streams a filing's HTML through an incremental parser and keeps only the
+sections the RAG queries care about (config.SEC_SECTIONS), e.g.
+
+    10-K   Item 1 Business · Item 1A Risk Factors · Item 7 MD&A
+    10-Q   Part I Item 2 MD&A · Part II Item 1A Risk Factors
+
+Text is assembled a line at a time (block-level tags end a line), so an
+"Item 1A." heading is recognised even when it is split across <span>s.
+A heading starts a capture that runs until the next Item heading. The
+table of contents produces the same headings with almost no text after
+them, so for each item the longest capture wins.
+
+Memory is bounded: one line buffer, one capture per configured section
+(capped at SEC_SECTION_MAX_CHARS) and a FALLBACK_CHARS prefix of the
+whole document, used when no section is found (unusual layouts, exhibits).
+"""
+
+import re
+from html.parser import HTMLParser
+from typing import Dict, Iterable, List, Union
+
+import config
+
+FALLBACK_CHARS = 50_000
+FEED_CHUNK     = 1 << 20          # feed HTML to the parser 1MB at a time
+MAX_LINE       = 10_000           # flush very long runs without block tags
+
+SECTION_TITLES = {
+    "1":     "Item 1. Business",
+    "1A":    "Item 1A. Risk Factors",
+    "7":     "Item 7. Management's Discussion and Analysis",
+    "7A":    "Item 7A. Quantitative and Qualitative Disclosures About Market Risk",
+    "I:2":   "Part I, Item 2. Management's Discussion and Analysis",
+    "I:3":   "Part I, Item 3. Quantitative and Qualitative Disclosures About Market Risk",
+    "II:1A": "Part II, Item 1A. Risk Factors",
+}
+
+_BLOCK_TAGS = {"p", "div", "br", "tr", "li", "table", "section", "center",
+               "h1", "h2", "h3", "h4", "h5", "h6", "hr", "body"}
+_SKIP_TAGS  = {"script", "style", "head", "title", "ix:header"}
+
+_ITEM_RE = re.compile(r"^item\s*(\d{1,2}[a-c]?)\b")
+_PART_RE = re.compile(r"^part\s+(iv|iii|ii|i)\b")
+
+
+class SectionExtractor(HTMLParser):
+    def __init__(self, sections: List[str], max_chars: int = None):
+        super().__init__(convert_charrefs=True)
+        self.sections  = list(sections)
+        self.max_chars = max_chars or config.SEC_SECTION_MAX_CHARS
+        self.keyed_by_part = any(":" in s for s in sections)
+
+        self.best: Dict[str, dict] = {}      # key → {"text": [...], "length": n}
+        self.current = None                  # capture in progress
+        self.part    = None
+        self.skip    = 0
+        self.line: List[str] = []
+        self.line_len = 0
+        self.fallback: List[str] = []
+        self.fallback_len = 0
+
+    # ── HTMLParser hooks ──────────────────────────────────────────────────────
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self.skip += 1
+        elif tag in _BLOCK_TAGS:
+            self._flush_line()
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self.skip = max(0, self.skip - 1)
+        elif tag in _BLOCK_TAGS:
+            self._flush_line()
+
+    def handle_data(self, data):
+        if self.skip:
+            return
+        self.line.append(data)
+        self.line_len += len(data)
+        if self.line_len > MAX_LINE:
+            self._flush_line()
+
+    # ── Line routing ──────────────────────────────────────────────────────────
+
+    def _flush_line(self):
+        if not self.line:
+            return
+        line = " ".join("".join(self.line).split())
+        self.line, self.line_len = [], 0
+        if not line:
+            return
+
+        if self.fallback_len < FALLBACK_CHARS:
+            self.fallback.append(line)
+            self.fallback_len += len(line) + 1
+
+        lowered = line.lower()
+        part = _PART_RE.match(lowered)
+        if part and len(line) < 200:
+            self.part = part.group(1).upper()
+        item = _ITEM_RE.match(lowered)
+        if item and len(line) < 300:        # a heading, not a paragraph
+            self._finish_capture()
+            number = item.group(1).upper()
+            key = f"{self.part}:{number}" if self.keyed_by_part and self.part else number
+            if key in self.sections:
+                self.current = {"key": key, "text": [], "length": 0, "kept": 0}
+            return                            # headings are re-added as titles
+
+        if self.current is not None:
+            c = self.current
+            c["length"] += len(line) + 1
+            if c["kept"] < self.max_chars:
+                c["text"].append(line[:self.max_chars - c["kept"]])
+                c["kept"] += len(line) + 1
+
+    def _finish_capture(self):
+        c = self.current
+        if c is not None:
+            best = self.best.get(c["key"])
+            if best is None or c["length"] > best["length"]:
+                self.best[c["key"]] = {"text": c["text"], "length": c["length"]}
+        self.current = None
+
+    # ── Result ────────────────────────────────────────────────────────────────
+
+    def result(self) -> Dict[str, str]:
+        """{section key: text}; empty dict if no configured section was found."""
+        self._flush_line()
+        self._finish_capture()
+        return {key: "\n".join(self.best[key]["text"])
+                for key in self.sections if key in self.best}
+
+    def fallback_text(self) -> str:
+        return " ".join(self.fallback)[:FALLBACK_CHARS]
+
+
+def extract_sections(html: Union[str, Iterable[str]], form: str) -> str:
+    """
+    Configured sections of a filing as plain text, each under its title.
+    `html` may be a string or an iterable of chunks (e.g. a streamed body).
+    Falls back to the first FALLBACK_CHARS of the document text.
+    """
+    sections = config.SEC_SECTIONS.get(form, [])
+    parser   = SectionExtractor(sections)
+    chunks   = ((html[i:i + FEED_CHUNK] for i in range(0, len(html), FEED_CHUNK))
+                if isinstance(html, str) else html)
+    for chunk in chunks:
+        parser.feed(chunk)
+    parser.close()
+
+    found = parser.result()
+    # No usable Item headings — exhibits, 10-K/A amendments, filers that put
+    # headings in images or tables. The start of the document still carries
+    # the cover page and usually the business overview, which beats indexing
+    # nothing; FALLBACK_CHARS keeps such a filing to ~110 chunks.
+    if sum(len(t) for t in found.values()) < config.SEC_SECTION_MIN_CHARS:
+        return parser.fallback_text()
+    return "\n\n".join(f"{SECTION_TITLES.get(key, 'Item ' + key)}\n{text}"
+                       for key, text in found.items())
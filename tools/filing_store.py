@@ -0,0 +1,224 @@
+"""
+tools/filing_store.py — local store for SEC filing documents
+=============================================================
+A filing never changes once it is accepted, so anything we have downloaded
+for an accession number is valid forever. The store keeps, per accession:
+
+    {accession}.html.zst            raw main document (as fetched)
+    {accession}.v{N}.txt.zst        extracted text, extractor version N
+
+Text is keyed by extractor version so a better extractor re-derives text
+from the stored HTML instead of downloading the filing again. Raw HTML can
+be written and read as a stream of chunks (stream_raw / iter_raw), so a
+large filing is never held in memory whole.
+
+Compression is zstd when the `zstandard` package is installed, zlib
+otherwise (files then end in .z); both are readable either way the module
+is configured. The directory is held to FILING_STORE_MAX_BYTES by evicting
+least-recently-used files (reads refresh a file's mtime).
+"""
+
+import codecs
+import os
+import threading
+import time
+import zlib
+from typing import Iterable, Iterator, Optional
+
+import config
+
+try:
+    import zstandard as zstd
+    _zstd_available = True
+except ImportError:
+    _zstd_available = False
+    print("[Filing Store] zstandard not installed — using zlib (pip install zstandard)")
+
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 6
+STREAM_CHUNK = 1 << 20      # bytes per read/decompress step when streaming
+
+_budget_lock = threading.Lock()
+
+
+def _store_dir() -> str:
+    return os.path.join(config.SEC_CACHE_DIR, "filings")
+
+
+def _compress(data: bytes):
+    if _zstd_available:
+        return zstd.ZstdCompressor(level=ZSTD_LEVEL).compress(data), ".zst"
+    return zlib.compress(data, ZLIB_LEVEL), ".z"
+
+
+def _decompress(data: bytes, ext: str) -> bytes:
+    if ext == ".zst":
+        if not _zstd_available:
+            raise RuntimeError("zstandard is required to read .zst store files")
+        return zstd.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def _read(name: str) -> Optional[str]:
+    for ext in (".zst", ".z"):
+        path = os.path.join(_store_dir(), name + ext)
+        try:
+            with open(path, "rb") as f:
+                data = _decompress(f.read(), ext)
+        except FileNotFoundError:
+            continue
+        except Exception as e:
+            print(f"  [Filing Store] Unreadable {name}{ext}: {e}")
+            continue
+        try:
+            os.utime(path)          # LRU: reading counts as use
+        except OSError:
+            pass
+        return data.decode("utf-8")
+    return None
+
+
+def _write(name: str, text: str) -> None:
+    data, ext = _compress(text.encode("utf-8"))
+    os.makedirs(_store_dir(), exist_ok=True)
+    path = os.path.join(_store_dir(), name + ext)
+    tmp  = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    enforce_budget()
+
+
+def _compressobj():
+    if _zstd_available:
+        return zstd.ZstdCompressor(level=ZSTD_LEVEL).compressobj(), ".zst"
+    return zlib.compressobj(ZLIB_LEVEL), ".z"
+
+
+def _stream(name: str, chunks: Iterable[str]) -> Iterator[str]:
+    """Pass `chunks` through, compressing them into the store as they go."""
+    compressor, ext = _compressobj()
+    os.makedirs(_store_dir(), exist_ok=True)
+    path = os.path.join(_store_dir(), name + ext)
+    tmp  = f"{path}.{threading.get_ident()}.tmp"
+    done = False
+    try:
+        with open(tmp, "wb") as f:
+            for chunk in chunks:
+                f.write(compressor.compress(chunk.encode("utf-8")))
+                yield chunk
+            f.write(compressor.flush())
+        os.replace(tmp, path)
+        done = True
+    finally:
+        if not done:                 # fetch failed or the consumer stopped early
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+    enforce_budget()
+
+
+def _iter_read(name: str) -> Optional[Iterator[str]]:
+    for ext in (".zst", ".z"):
+        path = os.path.join(_store_dir(), name + ext)
+        if not os.path.exists(path):
+            continue
+        if ext == ".zst" and not _zstd_available:
+            print(f"  [Filing Store] Unreadable {name}{ext}: zstandard is not installed")
+            continue
+        try:
+            os.utime(path)          # LRU: reading counts as use
+        except OSError:
+            pass
+        return _iter_decompressed(path, ext)
+    return None
+
+
+def _iter_decompressed(path: str, ext: str) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    with open(path, "rb") as f:
+        if ext == ".zst":
+            reader = zstd.ZstdDecompressor().stream_reader(f)
+            blocks = iter(lambda: reader.read(STREAM_CHUNK), b"")
+        else:
+            inflate = zlib.decompressobj()
+            blocks  = (inflate.decompress(b) for b in iter(lambda: f.read(STREAM_CHUNK), b""))
+        for block in blocks:
+            text = decoder.decode(block)
+            if text:
+                yield text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+
+def _key(accession_number: str) -> str:
+    return accession_number.replace("/", "_")
+
+
+# ── Public API ────────────────────────────────────────────────────────────────
+
+def get_raw(accession_number: str) -> Optional[str]:
+    return _read(f"{_key(accession_number)}.html")
+
+
+def put_raw(accession_number: str, html: str) -> None:
+    _write(f"{_key(accession_number)}.html", html)
+
+
+def iter_raw(accession_number: str) -> Optional[Iterator[str]]:
+    """Stored main document as decoded text chunks (None if not stored)."""
+    return _iter_read(f"{_key(accession_number)}.html")
+
+
+def stream_raw(accession_number: str, chunks: Iterable[str]) -> Iterator[str]:
+    """Store a document while it streams: yields `chunks` unchanged; the file
+    is committed only once the last chunk has been consumed."""
+    return _stream(f"{_key(accession_number)}.html", chunks)
+
+
+def get_text(accession_number: str, version: int) -> Optional[str]:
+    return _read(f"{_key(accession_number)}.v{version}.txt")
+
+
+def put_text(accession_number: str, text: str, version: int) -> None:
+    _write(f"{_key(accession_number)}.v{version}.txt", text)
+
+
+def enforce_budget(max_bytes: int = None) -> int:
+    """Evict least-recently-used files until the store fits. Returns bytes freed."""
+    max_bytes = config.FILING_STORE_MAX_BYTES if max_bytes is None else max_bytes
+    with _budget_lock:
+        try:
+            files = [e for e in os.scandir(_store_dir()) if e.is_file() and not e.name.endswith(".tmp")]
+        except FileNotFoundError:
+            return 0
+        stats = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in files]
+        total = sum(size for _, size, _ in stats)
+        freed = 0
+        for _, size, path in sorted(stats):
+            if total - freed <= max_bytes:
+                break
+            try:
+                os.remove(path)
+                freed += size
+            except OSError:
+                pass
+        if freed:
+            print(f"  [Filing Store] Evicted {freed / 1e6:.1f}MB (budget {max_bytes / 1e6:.0f}MB)")
+        return freed
+
+
+def store_stats() -> dict:
+    try:
+        files = [e for e in os.scandir(_store_dir()) if e.is_file()]
+    except FileNotFoundError:
+        files = []
+    return {
+        "files":       len(files),
+        "bytes":       sum(e.stat().st_size for e in files),
+        "budget":      config.FILING_STORE_MAX_BYTES,
+        "compression": "zstd" if _zstd_available else "zlib",
+        "checked_at":  time.time(),
+    }
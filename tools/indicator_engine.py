@@ -0,0 +1,456 @@
+"""
+tools/indicator_engine.py — NumPy indicator engine
+===================================================
+Array-level implementation behind calculate_indicators().
+
+Inputs are contiguous float64 arrays with time on axis 0, either (days,)
+or (days, tickers). Every primitive reproduces the pandas call it replaces:
+
+    rolling(w).mean() / .std() / .max() / .min()   min_periods = w
+    ewm(span=s).mean()                             adjust=True, ignore_na=False
+
+Intermediates are computed once and shared through a Workspace memo — the
+20-day rolling sum feeds SMA 20, the Bollinger middle band *and* the
+Bollinger variance; the fast/slow EMAs feed both the MACD line and signal.
+
+Indicators are declared in a registry (@indicator) with their input series
+and parameters; evaluate() computes only the requested ones and their
+dependencies, so the technical agent, chart overlays and the screener each
+ask for exactly what they use:
+
+    evaluate({"close": c}, ["rsi", "macd"])
+    evaluate({"close": c}, {"sma_100": ("sma", {"window": 100})}, last_only=False)
+
+Two modes:
+    last_only=True   only the final value of each indicator (what the agent
+                     reads). Rolling windows touch just the last w rows and
+                     EMAs that nothing else depends on are a single dot product.
+    last_only=False  full series for charts, backtests and batch refreshes.
+"""
+
+from functools import lru_cache
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+import config
+
+EWM_BLOCK = 128   # rows per block in the blocked EMA recurrence
+
+
+# ── Rolling primitives ────────────────────────────────────────────────────────
+
+def _as_array(x) -> np.ndarray:
+    return np.ascontiguousarray(x, dtype=np.float64)
+
+
+def _col_shape(x: np.ndarray, rows: int = 1) -> Tuple[int, ...]:
+    return (rows,) + x.shape[1:]
+
+
+def rolling_sums(x: np.ndarray, w: int) -> Tuple[np.ndarray, ...]:
+    """
+    Rolling count / sum / sum-of-squares over w rows, from a single cumsum.
+    Values are centred on the first observation first so the variance
+    (sumsq - sum²/w) doesn't lose precision on large prices.
+    Returns (valid, s1, s2, shift) where valid marks full windows.
+    """
+    finite = np.isfinite(x)
+    first  = np.expand_dims(np.argmax(finite, axis=0), 0)
+    shift  = np.take_along_axis(x, first, axis=0)[0] if x.shape[0] else np.zeros(x.shape[1:])
+    shift  = np.where(np.isfinite(shift), shift, 0.0)
+    xc     = np.where(finite, x - shift, 0.0)
+
+    zeros = np.zeros(_col_shape(x))
+    c0 = np.concatenate([zeros, np.cumsum(finite, axis=0, dtype=np.float64)])
+    c1 = np.concatenate([zeros, np.cumsum(xc, axis=0)])
+    c2 = np.concatenate([zeros, np.cumsum(xc * xc, axis=0)])
+
+    n   = np.full(x.shape, np.nan)
+    s1  = np.full(x.shape, np.nan)
+    s2  = np.full(x.shape, np.nan)
+    if x.shape[0] >= w:
+        n[w - 1:]  = c0[w:] - c0[:-w]
+        s1[w - 1:] = c1[w:] - c1[:-w]
+        s2[w - 1:] = c2[w:] - c2[:-w]
+    valid = n == w
+    return valid, np.where(valid, s1, np.nan), np.where(valid, s2, np.nan), shift
+
+
+def rolling_max(x: np.ndarray, w: int) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    if x.shape[0] >= w:
+        out[w - 1:] = np.lib.stride_tricks.sliding_window_view(x, w, axis=0).max(axis=-1)
+    return out
+
+
+def rolling_min(x: np.ndarray, w: int) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    if x.shape[0] >= w:
+        out[w - 1:] = np.lib.stride_tricks.sliding_window_view(x, w, axis=0).min(axis=-1)
+    return out
+
+
+def tail(x: np.ndarray, w: int) -> np.ndarray:
+    """Last w rows, or an all-NaN window if the series is too short."""
+    if x.shape[0] < w:
+        return np.full(_col_shape(x, w), np.nan)
+    return x[-w:]
+
+
+# ── EMA primitives ────────────────────────────────────────────────────────────
+
+@lru_cache(maxsize=None)
+def _ewm_kernel(span: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Lower-triangular decay matrix W[i, j] = r^(i-j) and carry decay r^(i+1)."""
+    r   = 1.0 - 2.0 / (span + 1.0)
+    lag = np.arange(EWM_BLOCK)[:, None] - np.arange(EWM_BLOCK)[None, :]
+    W   = np.where(lag >= 0, r ** np.maximum(lag, 0), 0.0)
+    return W, r ** np.arange(1, EWM_BLOCK + 1)
+
+
+def ewm_mean(x: np.ndarray, span: int) -> np.ndarray:
+    """
+    Full-series ewm(span).mean(): numerator and denominator are each a
+    decayed running sum, evaluated block by block as a matrix product
+    with the carry from the previous block.
+    """
+    W, decay = _ewm_kernel(span)
+    valid = np.isfinite(x)
+    xf    = np.where(valid, x, 0.0)
+    vf    = valid.astype(np.float64)
+    num   = np.empty(x.shape)
+    den   = np.empty(x.shape)
+    carry_num = np.zeros(x.shape[1:])
+    carry_den = np.zeros(x.shape[1:])
+
+    for start in range(0, x.shape[0], EWM_BLOCK):
+        stop = min(start + EWM_BLOCK, x.shape[0])
+        m    = stop - start
+        d    = decay[:m].reshape((m,) + (1,) * (x.ndim - 1))
+        num[start:stop] = W[:m, :m] @ xf[start:stop] + d * carry_num
+        den[start:stop] = W[:m, :m] @ vf[start:stop] + d * carry_den
+        carry_num, carry_den = num[stop - 1], den[stop - 1]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(den > 0, num / np.where(den > 0, den, 1.0), np.nan)
+
+
+def ewm_last(x: np.ndarray, span: int) -> np.ndarray:
+    """Final value of ewm(span).mean() as one weighted dot product."""
+    r     = 1.0 - 2.0 / (span + 1.0)
+    w     = r ** np.arange(x.shape[0] - 1, -1, -1, dtype=np.float64)
+    valid = np.isfinite(x)
+    num   = np.tensordot(w, np.where(valid, x, 0.0), axes=(0, 0))
+    den   = np.tensordot(w, valid.astype(np.float64), axes=(0, 0))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(den > 0, num / np.where(den > 0, den, 1.0), np.nan)
+
+
+# ── Workspace ─────────────────────────────────────────────────────────────────
+
+class Workspace:
+    """
+    Holds the input series plus a memo of every intermediate, so indicators
+    that share a window or an EMA compute it once. In last_only mode
+    rolling results are the final row only; EMAs stay full-series when a
+    later stage (the MACD signal) needs their history.
+    """
+
+    def __init__(self, series: Dict[str, np.ndarray], last_only: bool = True):
+        self.series    = {k: _as_array(v) for k, v in series.items()}
+        self.last_only = last_only
+        self._memo     = {}
+
+    def _cached(self, key, fn):
+        if key not in self._memo:
+            self._memo[key] = fn()
+        return self._memo[key]
+
+    def last(self, name: str) -> np.ndarray:
+        x = self.series[name]
+        return x[-1] if self.last_only else x
+
+    # rolling mean & std share one set of sums per (series, window)
+    def _sums(self, name: str, w: int):
+        def compute():
+            x = self.series[name]
+            if self.last_only:
+                t      = tail(x, w)
+                valid  = np.isfinite(t).all(axis=0)
+                return valid, t
+            return rolling_sums(x, w)
+        return self._cached(("sums", name, w), compute)
+
+    def rolling_mean(self, name: str, w: int) -> np.ndarray:
+        def compute():
+            if self.last_only:
+                valid, t = self._sums(name, w)
+                return np.where(valid, t.sum(axis=0) / w, np.nan)
+            valid, s1, _, shift = self._sums(name, w)
+            return s1 / w + shift
+        return self._cached(("mean", name, w), compute)
+
+    def rolling_std(self, name: str, w: int) -> np.ndarray:
+        def compute():
+            if self.last_only:
+                valid, t = self._sums(name, w)
+                return np.where(valid, t.std(axis=0, ddof=1), np.nan)
+            valid, s1, s2, _ = self._sums(name, w)
+            var = (s2 - s1 * s1 / w) / (w - 1)
+            return np.sqrt(np.maximum(var, 0.0))
+        return self._cached(("std", name, w), compute)
+
+    def rolling_max(self, name: str, w: int) -> np.ndarray:
+        def compute():
+            x = self.series[name]
+            return tail(x, w).max(axis=0) if self.last_only else rolling_max(x, w)
+        return self._cached(("max", name, w), compute)
+
+    def rolling_min(self, name: str, w: int) -> np.ndarray:
+        def compute():
+            x = self.series[name]
+            return tail(x, w).min(axis=0) if self.last_only else rolling_min(x, w)
+        return self._cached(("min", name, w), compute)
+
+    def ewm(self, name: str, span: int, full: bool = False) -> np.ndarray:
+        """EMA of a series; full=True forces the whole series even in last_only."""
+        if self.last_only and not full:
+            if ("ewm", name, span) in self._memo:
+                return self._memo[("ewm", name, span)][-1]
+            return self._cached(("ewm_last", name, span),
+                                lambda: ewm_last(self.series[name], span))
+        return self._cached(("ewm", name, span),
+                            lambda: ewm_mean(self.series[name], span))
+
+    def get(self, name: str, **params) -> np.ndarray:
+        """A registered indicator (see INDICATORS below), memoised by parameters."""
+        spec     = INDICATORS[name]
+        resolved = spec.resolve(params)
+        key      = ("indicator", name, tuple(sorted(resolved.items())))
+        return self._cached(key, lambda: spec.fn(self, **resolved))
+
+    def derive(self, name: str, fn) -> np.ndarray:
+        """Register a full-series derived input (e.g. gains) under a name."""
+        if name not in self.series:
+            self.series[name] = _as_array(fn())
+        return self.series[name]
+
+
+# ── Registry ──────────────────────────────────────────────────────────────────
+# Each indicator declares the raw series it reads and its parameters
+# (defaults may be callables so config values are read at evaluation time).
+# Indicator functions pull what they need through the Workspace — from
+# ws.get() for other indicators, from the rolling/EWM memo for intermediates —
+# so evaluating a request computes exactly its dependency closure, once.
+
+class IndicatorSpec:
+    def __init__(self, name: str, fn: Callable, inputs: Tuple[str, ...], params: dict):
+        self.name   = name
+        self.fn     = fn
+        self.inputs = inputs
+        self.params = params
+
+    def resolve(self, overrides: dict) -> dict:
+        unknown = set(overrides) - set(self.params)
+        if unknown:
+            raise ValueError(f"{self.name}: unknown parameter(s) {sorted(unknown)}")
+        params = {k: (v() if callable(v) else v) for k, v in self.params.items()}
+        params.update(overrides)
+        return params
+
+
+INDICATORS: Dict[str, IndicatorSpec] = {}
+
+
+def indicator(name: str, inputs: Tuple[str, ...] = ("close",), **params):
+    """Decorator: register fn(ws, **params) as indicator `name`."""
+    def register(fn):
+        INDICATORS[name] = IndicatorSpec(name, fn, tuple(inputs), params)
+        return fn
+    return register
+
+
+def _normalise_requests(requests) -> Dict[str, Tuple[str, dict]]:
+    """Accept {"key": name | (name, params)} or an iterable of names."""
+    if not isinstance(requests, dict):
+        requests = {name: name for name in requests}
+    return {
+        key: (req, {}) if isinstance(req, str) else (req[0], dict(req[1]))
+        for key, req in requests.items()
+    }
+
+
+def required_inputs(requests) -> set:
+    """Raw series (close/high/low/volume) a request set needs."""
+    return {i for name, _ in _normalise_requests(requests).values()
+            for i in INDICATORS[name].inputs}
+
+
+def evaluate(series: Dict[str, np.ndarray], requests, last_only: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Compute only the requested indicators (and what they depend on).
+
+        evaluate({"close": c}, ["rsi", "macd"])
+        evaluate({"close": c}, {"sma_100": ("sma", {"window": 100})}, last_only=False)
+    """
+    requests = _normalise_requests(requests)
+    for key, (name, _) in requests.items():
+        if name not in INDICATORS:
+            raise ValueError(f"Unknown indicator '{name}' (requested as '{key}')")
+    missing = required_inputs(requests) - set(series)
+    if missing:
+        raise ValueError(f"Missing input series: {sorted(missing)}")
+
+    ws = Workspace(series, last_only=last_only)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return {key: ws.get(name, **params) for key, (name, params) in requests.items()}
+
+
+# ── Indicators ────────────────────────────────────────────────────────────────
+
+@indicator("close")
+def _close(ws):
+    return ws.last("close")
+
+
+@indicator("volume", inputs=("volume",))
+def _volume(ws):
+    return ws.last("volume")
+
+
+@indicator("sma", window=20)
+def _sma(ws, window):
+    return ws.rolling_mean("close", window)
+
+
+@indicator("ema", span=20)
+def _ema(ws, span):
+    return ws.ewm("close", span)
+
+
+@indicator("rsi", period=lambda: config.RSI_PERIOD)
+def _rsi(ws, period):
+    # simple rolling mean of gains/losses (pandas .where semantics:
+    # the leading NaN diff counts as a zero move)
+    def deltas():
+        x = ws.series["close"]
+        return np.concatenate([np.full(_col_shape(x), np.nan), np.diff(x, axis=0)])
+    delta = ws._cached(("delta", "close"), deltas)
+    ws.derive("gain", lambda: np.where(delta > 0, delta, 0.0))
+    ws.derive("loss", lambda: -np.where(delta < 0, delta, 0.0))
+    rs = ws.rolling_mean("gain", period) / ws.rolling_mean("loss", period)
+    return 100 - (100 / (1 + rs))
+
+
+def _macd_line(ws, fast, slow) -> str:
+    """Full-series MACD line — the signal EMA needs its whole history."""
+    name = f"macd_line_{fast}_{slow}"
+    ws.derive(name, lambda: ws.ewm("close", fast, full=True) - ws.ewm("close", slow, full=True))
+    return name
+
+
+@indicator("macd", fast=lambda: config.MACD_FAST, slow=lambda: config.MACD_SLOW)
+def _macd(ws, fast, slow):
+    return ws.last(_macd_line(ws, fast, slow))
+
+
+@indicator("macd_signal", fast=lambda: config.MACD_FAST, slow=lambda: config.MACD_SLOW,
+           signal=lambda: config.MACD_SIGNAL)
+def _macd_signal(ws, fast, slow, signal):
+    return ws.ewm(_macd_line(ws, fast, slow), signal)
+
+
+@indicator("macd_hist", fast=lambda: config.MACD_FAST, slow=lambda: config.MACD_SLOW,
+           signal=lambda: config.MACD_SIGNAL)
+def _macd_hist(ws, fast, slow, signal):
+    return (ws.get("macd", fast=fast, slow=slow)
+            - ws.get("macd_signal", fast=fast, slow=slow, signal=signal))
+
+
+# Bollinger middle band *is* the SMA — both resolve to the same rolling-mean memo
+@indicator("bb_middle", period=lambda: config.BBANDS_PERIOD)
+def _bb_middle(ws, period):
+    return ws.rolling_mean("close", period)
+
+
+@indicator("bb_upper", period=lambda: config.BBANDS_PERIOD, width=2.0)
+def _bb_upper(ws, period, width):
+    return ws.get("bb_middle", period=period) + width * ws.rolling_std("close", period)
+
+
+@indicator("bb_lower", period=lambda: config.BBANDS_PERIOD, width=2.0)
+def _bb_lower(ws, period, width):
+    return ws.get("bb_middle", period=period) - width * ws.rolling_std("close", period)
+
+
+@indicator("bb_position", period=lambda: config.BBANDS_PERIOD, width=2.0)
+def _bb_position(ws, period, width):
+    upper = ws.get("bb_upper", period=period, width=width)
+    lower = ws.get("bb_lower", period=period, width=width)
+    return (ws.last("close") - lower) / (upper - lower) * 100
+
+
+@indicator("volume_avg", inputs=("volume",), window=20)
+def _volume_avg(ws, window):
+    return ws.rolling_mean("volume", window)
+
+
+@indicator("volume_ratio", inputs=("volume",), window=20)
+def _volume_ratio(ws, window):
+    return ws.last("volume") / ws.get("volume_avg", window=window)
+
+
+@indicator("rolling_high", inputs=("high",), window=52)
+def _rolling_high(ws, window):
+    return ws.rolling_max("high", window)
+
+
+@indicator("rolling_low", inputs=("low",), window=52)
+def _rolling_low(ws, window):
+    return ws.rolling_min("low", window)
+
+
+# ── Standard set ──────────────────────────────────────────────────────────────
+
+# Everything calculate_indicators() reports, under its historical keys
+STANDARD_SET = {
+    "close":         "close",
+    "rsi":           "rsi",
+    "macd":          "macd",
+    "macd_signal":   "macd_signal",
+    "macd_hist":     "macd_hist",
+    "bb_upper":      "bb_upper",
+    "bb_middle":     "bb_middle",
+    "bb_lower":      "bb_lower",
+    "bb_position":   "bb_position",
+    "sma_20":        ("sma", {"window": 20}),
+    "sma_50":        ("sma", {"window": 50}),
+    "sma_200":       ("sma", {"window": 200}),
+    "ema_20":        ("ema", {"span": 20}),
+    "volume":        "volume",
+    "volume_avg_20": ("volume_avg", {"window": 20}),
+    "volume_ratio":  ("volume_ratio", {"window": 20}),
+    "high_52":       ("rolling_high", {"window": 52}),
+    "low_52":        ("rolling_low", {"window": 52}),
+}
+
+# Price-scale series the chart can draw over candles
+CHART_OVERLAYS = {
+    "sma_20":   ("sma", {"window": 20}),
+    "sma_50":   ("sma", {"window": 50}),
+    "sma_200":  ("sma", {"window": 200}),
+    "ema_20":   ("ema", {"span": 20}),
+    "bb_upper": "bb_upper",
+    "bb_middle": "bb_middle",
+    "bb_lower": "bb_lower",
+}
+
+
+def compute_indicators(close, high, low, volume, last_only: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Raw (unrounded) values of every indicator calculate_indicators() reports.
+    With last_only=True each value is the final row — a scalar for 1-D input,
+    one value per column for 2-D input; otherwise full series.
+    """
+    return evaluate({"close": close, "high": high, "low": low, "volume": volume},
+                    STANDARD_SET, last_only=last_only)
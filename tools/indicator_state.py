@@ -0,0 +1,276 @@
+"""
+tools/indicator_state.py — incremental indicator state
+=======================================================
+Everything calculate_indicators() needs, kept as running accumulators so
+a new daily bar costs O(1) instead of a pass over two years of history:
+
+    EMAs (12, 26, 20, MACD signal)   numerator / denominator of the
+                                     adjust=True weighted mean
+    SMAs, Bollinger, volume avg      ring buffers with running sums
+    RSI                              ring buffers of gains / losses
+    52-bar high / low                ring buffers (max/min over 52 values)
+
+The state covers every bar *except* the latest one. The latest bar may
+still be moving (intraday refresh), so its indicator values come from
+peek(), which applies the bar to a copy of the state and leaves the state
+itself untouched. values() returns the same keys as
+indicator_engine.compute_indicators(last_only=True).
+
+Snapshots are plain JSON (to_dict / from_dict). tools/price_store.py saves
+them next to the price history.
+"""
+
+import copy
+import math
+from typing import Dict, List, Optional
+
+import config
+
+RESYNC_EVERY = 256   # re-sum ring buffers exactly every N pushes (float drift)
+
+
+def _params() -> Dict[str, int]:
+    # A snapshot built under different settings must be rebuilt, not reused
+    return {
+        "rsi":         config.RSI_PERIOD,
+        "macd_fast":   config.MACD_FAST,
+        "macd_slow":   config.MACD_SLOW,
+        "macd_signal": config.MACD_SIGNAL,
+        "bbands":      config.BBANDS_PERIOD,
+    }
+
+
+class _Window:
+    """Fixed-size ring buffer with a running sum."""
+
+    def __init__(self, size: int):
+        self.size   = size
+        self.buf    = [0.0] * size
+        self.pos    = 0
+        self.count  = 0
+        self.total  = 0.0
+        self.pushes = 0
+
+    def push(self, x: float) -> None:
+        if self.count == self.size:
+            self.total -= self.buf[self.pos]
+        else:
+            self.count += 1
+        self.buf[self.pos] = x
+        self.total += x
+        self.pos = (self.pos + 1) % self.size
+        self.pushes += 1
+        if self.pushes % RESYNC_EVERY == 0:
+            self.total = math.fsum(self.buf[:self.count])
+
+    @property
+    def full(self) -> bool:
+        return self.count == self.size
+
+    def mean(self) -> float:
+        return self.total / self.size if self.full else math.nan
+
+    def std(self) -> float:
+        # two-pass over the (small, fixed) window — exact, no cancellation
+        if not self.full:
+            return math.nan
+        mean = self.total / self.size
+        return math.sqrt(sum((v - mean) ** 2 for v in self.buf) / (self.size - 1))
+
+    def max(self) -> float:
+        return max(self.buf) if self.full else math.nan
+
+    def min(self) -> float:
+        return min(self.buf) if self.full else math.nan
+
+    def ordered(self) -> List[float]:
+        if not self.full:
+            return self.buf[:self.count]
+        return self.buf[self.pos:] + self.buf[:self.pos]
+
+    @classmethod
+    def restore(cls, size: int, values: List[float]) -> "_Window":
+        window = cls(size)
+        for v in values[-size:]:
+            window.push(v)
+        window.total = math.fsum(window.buf[:window.count])
+        return window
+
+
+class _Ewm:
+    """ewm(span).mean() with adjust=True, one observation at a time."""
+
+    def __init__(self, span: int, num: float = 0.0, den: float = 0.0):
+        self.span  = span
+        self.decay = 1.0 - 2.0 / (span + 1.0)
+        self.num   = num
+        self.den   = den
+
+    def push(self, x: float) -> None:
+        self.num = self.decay * self.num + x
+        self.den = self.decay * self.den + 1.0
+
+    def value(self) -> float:
+        return self.num / self.den if self.den > 0 else math.nan
+
+
+class IndicatorState:
+    def __init__(self):
+        p = _params()
+        self.params     = p
+        self.last_date: Optional[str] = None
+        self.bars       = 0
+        self.prev_close = math.nan
+        self.prev_volume = math.nan
+
+        self.close = {w: _Window(w) for w in sorted({20, 50, 200, p["bbands"]})}
+        self.volume = _Window(20)
+        self.high   = _Window(52)
+        self.low    = _Window(52)
+        self.gain   = _Window(p["rsi"])
+        self.loss   = _Window(p["rsi"])
+
+        self.ema_fast    = _Ewm(p["macd_fast"])
+        self.ema_slow    = _Ewm(p["macd_slow"])
+        self.ema_20      = _Ewm(20)
+        self.macd_signal = _Ewm(p["macd_signal"])
+
+    # ── Updates ───────────────────────────────────────────────────────────────
+
+    def advance(self, date: str, high: float, low: float,
+                close: float, volume: float) -> None:
+        """Fold one closed bar into the state. O(1) except the 52-bar max/min."""
+        if not math.isfinite(close):
+            return
+        # pandas .where semantics: the first diff is NaN and counts as no move
+        delta = close - self.prev_close if math.isfinite(self.prev_close) else 0.0
+        self.gain.push(delta if delta > 0 else 0.0)
+        self.loss.push(-delta if delta < 0 else 0.0)
+
+        for window in self.close.values():
+            window.push(close)
+        self.volume.push(volume)
+        self.high.push(high)
+        self.low.push(low)
+
+        self.ema_fast.push(close)
+        self.ema_slow.push(close)
+        self.ema_20.push(close)
+        self.macd_signal.push(self.ema_fast.value() - self.ema_slow.value())
+
+        self.prev_close  = close
+        self.prev_volume = volume
+        self.last_date   = date
+        self.bars       += 1
+
+    def peek(self, date: str, high: float, low: float,
+             close: float, volume: float) -> Dict[str, float]:
+        """Indicator values as if this (possibly still-forming) bar were applied."""
+        trial = copy.deepcopy(self)
+        trial.advance(date, high, low, close, volume)
+        return trial.values()
+
+    # ── Read-out ──────────────────────────────────────────────────────────────
+
+    def values(self) -> Dict[str, float]:
+        p     = self.params
+        price = self.prev_close
+
+        gain, loss = self.gain.mean(), self.loss.mean()
+        if loss > 0:
+            rsi = 100 - 100 / (1 + gain / loss)
+        elif gain > 0:
+            rsi = 100.0
+        else:
+            rsi = math.nan
+
+        macd        = self.ema_fast.value() - self.ema_slow.value()
+        macd_signal = self.macd_signal.value()
+
+        bb       = self.close[p["bbands"]]
+        bb_mid   = bb.mean()
+        bb_std   = bb.std()
+        bb_upper = bb_mid + 2 * bb_std
+        bb_lower = bb_mid - 2 * bb_std
+        width    = bb_upper - bb_lower
+        bb_position = (price - bb_lower) / width * 100 if width else math.nan
+
+        volume_avg = self.volume.mean()
+        return {
+            "close":         price,
+            "rsi":           rsi,
+            "macd":          macd,
+            "macd_signal":   macd_signal,
+            "macd_hist":     macd - macd_signal,
+            "bb_upper":      bb_upper,
+            "bb_middle":     bb_mid,
+            "bb_lower":      bb_lower,
+            "bb_position":   bb_position,
+            "sma_20":        self.close[20].mean(),
+            "sma_50":        self.close[50].mean(),
+            "sma_200":       self.close[200].mean(),
+            "ema_20":        self.ema_20.value(),
+            "volume":        self.prev_volume,
+            "volume_avg_20": volume_avg,
+            "volume_ratio":  self.prev_volume / volume_avg if volume_avg else math.nan,
+            "high_52":       self.high.max(),
+            "low_52":        self.low.min(),
+        }
+
+    # ── Snapshot ──────────────────────────────────────────────────────────────
+
+    def to_dict(self) -> dict:
+        return {
+            "params":      self.params,
+            "last_date":   self.last_date,
+            "bars":        self.bars,
+            "prev_close":  self.prev_close,
+            "prev_volume": self.prev_volume,
+            "windows": {
+                **{f"close_{w}": win.ordered() for w, win in self.close.items()},
+                "volume": self.volume.ordered(),
+                "high":   self.high.ordered(),
+                "low":    self.low.ordered(),
+                "gain":   self.gain.ordered(),
+                "loss":   self.loss.ordered(),
+            },
+            "ewm": {
+                name: [acc.num, acc.den]
+                for name, acc in (("fast", self.ema_fast), ("slow", self.ema_slow),
+                                  ("ema_20", self.ema_20), ("signal", self.macd_signal))
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> Optional["IndicatorState"]:
+        """Restore a snapshot; None if it was built with different settings."""
+        state = cls()
+        if d.get("params") != state.params:
+            return None
+        state.last_date   = d["last_date"]
+        state.bars        = d["bars"]
+        state.prev_close  = d["prev_close"]
+        state.prev_volume = d["prev_volume"]
+
+        w = d["windows"]
+        state.close  = {size: _Window.restore(size, w[f"close_{size}"]) for size in state.close}
+        state.volume = _Window.restore(20, w["volume"])
+        state.high   = _Window.restore(52, w["high"])
+        state.low    = _Window.restore(52, w["low"])
+        state.gain   = _Window.restore(state.params["rsi"], w["gain"])
+        state.loss   = _Window.restore(state.params["rsi"], w["loss"])
+
+        e = d["ewm"]
+        state.ema_fast    = _Ewm(state.params["macd_fast"],   *e["fast"])
+        state.ema_slow    = _Ewm(state.params["macd_slow"],   *e["slow"])
+        state.ema_20      = _Ewm(20,                          *e["ema_20"])
+        state.macd_signal = _Ewm(state.params["macd_signal"], *e["signal"])
+        return state
+
+    @classmethod
+    def from_history(cls, dates, high, low, close, volume) -> "IndicatorState":
+        """Seed a state by replaying bars (oldest first)."""
+        state = cls()
+        for row in zip(dates, high, low, close, volume):
+            state.advance(*row)
+        return state
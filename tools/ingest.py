@@ -0,0 +1,244 @@
+"""
+tools/ingest.py — offline bulk SEC filing ingestion
+====================================================
+Pre-builds the per-ticker vector stores so the RAG agent never pays the
+fetch + embed cost on a user request:
+
+    python -m tools.ingest                      # config.SCREENER_UNIVERSE
+    python -m tools.ingest AAPL MSFT NVDA
+    python -m tools.ingest --file sp500.txt --workers 4
+
+Stages run as a pipeline, so SEC I/O overlaps with embedding:
+
+    fetch + extract   thread pool (SEC_MAX_WORKERS) — network bound, the shared
+                      client's token bucket keeps the aggregate rate legal
+    chunk             main process, cheap
+    embed             process pool, one model per worker, torch threads split
+                      between workers so they don't oversubscribe the cores
+    write             main process (Chroma's client is not multi-process safe)
+
+Only filings not already in a ticker's collection are chunked and embedded
+(see vector_store.diff_filings), so re-running over a covered universe
+costs embeddings only for newly filed 10-Ks / 10-Qs — and only for the
+chunks of those the embedding cache has not seen (tools/embedding_cache.py).
+
+Each finished ticker is recorded in a checkpoint file, so an interrupted
+run resumes where it stopped. A throughput report is printed at the end.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+from typing import Dict, List
+
+import config
+from tools.embedding_backend import model_id
+from tools.embedding_cache import get_cache
+
+_model = None     # per embed worker
+
+
+# ── Embed workers (kept import-light: workers are spawned) ────────────────────
+
+def _init_worker(threads: int) -> None:
+    global _model
+    import torch
+    from tools.embedding_backend import load_model
+    torch.set_num_threads(threads)
+    _model = load_model()
+
+
+def _embed(chunks: List[str]):
+    start = time.time()
+    vectors = _model.encode(chunks, batch_size=config.INGEST_EMBED_BATCH)
+    return vectors, time.time() - start
+
+
+# ── Checkpoint ────────────────────────────────────────────────────────────────
+
+def _checkpoint_path() -> str:
+    return os.path.join(config.INGEST_DIR, "checkpoint.json")
+
+
+def load_checkpoint() -> Dict:
+    try:
+        with open(_checkpoint_path()) as f:
+            return json.load(f)
+    except Exception:
+        return {"done": {}, "failed": {}}
+
+
+def _save_checkpoint(checkpoint: Dict) -> None:
+    os.makedirs(config.INGEST_DIR, exist_ok=True)
+    tmp = _checkpoint_path() + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(checkpoint, f, indent=1)
+    os.replace(tmp, _checkpoint_path())
+
+
+# ── Pipeline ──────────────────────────────────────────────────────────────────
+
+def _fetch(ticker: str):
+    from tools.sec_fetcher import get_sec_filings_text
+    start = time.time()
+    return get_sec_filings_text(ticker), time.time() - start
+
+
+def run_ingest(tickers: List[str], workers: int = None, force: bool = False) -> Dict:
+    """Ingest filings for every ticker; returns the throughput report."""
+    from tools import vector_store
+
+    workers    = workers or config.INGEST_EMBED_WORKERS
+    checkpoint = load_checkpoint()
+    max_age    = vector_store.COLLECTION_TTL_SECONDS
+
+    queue, skipped = [], 0
+    for t in dict.fromkeys(t.upper() for t in tickers):
+        done = checkpoint["done"].get(t)
+        if not force and done and time.time() - done["at"] < max_age:
+            skipped += 1
+        else:
+            queue.append(t)
+    total = len(queue)
+    print(f"[Ingest] {total} tickers to ingest, {skipped} already fresh (checkpoint)")
+
+    stats = {"tickers": 0, "failed": 0, "filings": 0, "chunks": 0, "encoded": 0,
+             "fetch_s": 0.0, "chunk_s": 0.0, "embed_s": 0.0, "write_s": 0.0}
+    threads  = max(1, (os.cpu_count() or 1) // workers)
+    in_fetch = {}          # future → ticker
+    in_embed = {}          # future → (job, cached vectors by position, positions encoded)
+    cache    = get_cache(model_id())
+    started  = time.time()
+
+    fetch_pool = ThreadPoolExecutor(max_workers=config.SEC_MAX_WORKERS)
+    embed_pool = ProcessPoolExecutor(max_workers=workers,
+                                     mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_init_worker, initargs=(threads,))
+
+    def fail(ticker, error):
+        stats["failed"] += 1
+        checkpoint["failed"][ticker] = {"error": str(error), "at": time.time()}
+        _save_checkpoint(checkpoint)
+        print(f"  [Ingest] {ticker}: failed — {error}")
+
+    def write(job, vectors):
+        ticker, collection, chunks, ids, metadatas, stale_ids, accessions = job
+        embeddings = [vectors[i].tolist() for i in range(len(chunks))]
+        start = time.time()
+        vector_store.update_collection(collection, chunks, ids, metadatas, embeddings,
+                                       stale_ids, ticker)
+        stats["write_s"] += time.time() - start
+
+        stats["tickers"] += 1
+        stats["filings"] += len(accessions)
+        stats["chunks"]  += len(chunks)
+        checkpoint["done"][ticker] = {"at": time.time(),
+                                      "chunks": vector_store.chunk_count(collection, ticker),
+                                      "accessions": accessions}
+        checkpoint["failed"].pop(ticker, None)
+        _save_checkpoint(checkpoint)
+        print(f"  [Ingest] {ticker}: {len(accessions)} filings, {len(chunks)} new chunks, "
+              f"{len(stale_ids)} removed ({stats['tickers'] + stats['failed']}/{total})")
+
+    def refill():
+        # bound fetched-but-not-embedded work so memory stays flat on big lists
+        while queue and len(in_fetch) + len(in_embed) < workers * 2 + config.SEC_MAX_WORKERS:
+            t = queue.pop(0)
+            in_fetch[fetch_pool.submit(_fetch, t)] = t
+
+    try:
+        refill()
+        while in_fetch or in_embed:
+            done, _ = wait(list(in_fetch) + list(in_embed), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in in_fetch:
+                    ticker = in_fetch.pop(future)
+                    try:
+                        data, seconds = future.result()
+                    except Exception as e:
+                        fail(ticker, e)
+                        continue
+                    stats["fetch_s"] += seconds
+                    if data.get("status") != "success":
+                        fail(ticker, data.get("error", "no filings"))
+                        continue
+                    start = time.time()
+                    collection = vector_store.open_collection(ticker)
+                    new_filings, stale_ids = vector_store.diff_filings(
+                        collection, data["filings"], ticker, data.get("listed_accessions"))
+                    chunks, ids, metadatas = vector_store.chunk_filings(new_filings, ticker, data.get("cik"))
+                    stats["chunk_s"] += time.time() - start
+                    accessions = [f["accession_number"] for f in data["filings"]]
+                    job = (ticker, collection, chunks, ids, metadatas, stale_ids, accessions)
+                    # chunks embedded before (this or any ticker) come from the cache
+                    found, missing = cache.lookup(chunks)
+                    stats["encoded"] += len(missing)
+                    if missing:
+                        embed = embed_pool.submit(_embed, [chunks[i] for i in missing])
+                        in_embed[embed] = (job, found, missing)
+                    else:
+                        write(job, found)          # nothing new to encode
+                else:
+                    job, found, missing = in_embed.pop(future)
+                    try:
+                        vectors, seconds = future.result()
+                    except Exception as e:
+                        fail(job[0], e)
+                        continue
+                    stats["embed_s"] += seconds
+                    cache.put([job[2][i] for i in missing], vectors)
+                    found.update(zip(missing, vectors))
+                    write(job, found)
+            refill()
+    except KeyboardInterrupt:
+        print("\n[Ingest] Interrupted — progress saved to checkpoint")
+    finally:
+        fetch_pool.shutdown(wait=False, cancel_futures=True)
+        embed_pool.shutdown(wait=False, cancel_futures=True)
+
+    elapsed = time.time() - started
+    return {
+        **{k: round(v, 1) if isinstance(v, float) else v for k, v in stats.items()},
+        "skipped":         skipped,
+        "elapsed_s":       round(elapsed, 1),
+        "tickers_per_min": round(stats["tickers"] / elapsed * 60, 1) if elapsed else 0.0,
+        "chunks_per_s":    round(stats["chunks"] / elapsed, 1) if elapsed else 0.0,
+        "embed_workers":   workers,
+    }
+
+
+def format_report(report: Dict) -> str:
+    return "\n".join([
+        "INGESTION REPORT",
+        f"  tickers      {report['tickers']} ingested · {report['failed']} failed · {report['skipped']} skipped",
+        f"  filings      {report['filings']}   new chunks {report['chunks']} "
+        f"({report['encoded']} encoded, rest from the embedding cache)",
+        f"  wall time    {report['elapsed_s']}s",
+        f"  throughput   {report['tickers_per_min']} tickers/min · {report['chunks_per_s']} chunks/s",
+        f"  stage time   fetch {report['fetch_s']}s · chunk {report['chunk_s']}s · "
+        f"embed {report['embed_s']}s ({report['embed_workers']} workers) · write {report['write_s']}s",
+    ])
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Pre-ingest SEC filings into the vector store")
+    parser.add_argument("tickers", nargs="*", help="default: config.SCREENER_UNIVERSE")
+    parser.add_argument("--file", help="file with one ticker per line (# comments allowed)")
+    parser.add_argument("--workers", type=int, help="embedding processes")
+    parser.add_argument("--force", action="store_true", help="ignore the checkpoint")
+    args = parser.parse_args(argv)
+
+    tickers = list(args.tickers)
+    if args.file:
+        with open(args.file) as f:
+            tickers += [line.split("#")[0].strip() for line in f if line.split("#")[0].strip()]
+    report = run_ingest(tickers or config.SCREENER_UNIVERSE, workers=args.workers, force=args.force)
+    print(format_report(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+"""
+tools/numeric.py — JSON-safe rounding
+======================================
+Analytics hand back NumPy floats that may be NaN or ±inf (too little
+history, a zero denominator). API responses need plain floats or None.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+
+def finite_round(value, digits: int = 2) -> Optional[float]:
+    """round(value, digits) as a plain float; None if it isn't finite."""
+    value = float(value)
+    return round(value, digits) if np.isfinite(value) else None
+
+
+def finite_pct(value, digits: int = 2) -> Optional[float]:
+    """A fraction as a rounded percentage (0.1234 → 12.34); None if not finite."""
+    value = float(value)
+    return round(value * 100, digits) if np.isfinite(value) else None
@@ -0,0 +1,215 @@
+"""
+tools/peer_groups.py — sector / industry peer comparison
+=========================================================
+Gives the financial agent something to compare against: where does this
+company's P/E, margins, growth and 1-year return sit among its peers?
+
+Peers come from the local fundamentals cache plus the screener universe
+(any universe ticker without cached fundamentals is fetched in bulk, once).
+One table is built per sector — a (peers, metrics) float matrix — and kept
+in memory for PEER_CACHE_TTL, so every ticker analysed in that sector
+reuses it. Percentile ranks for the whole table are one vectorized pass.
+
+    peer_comparison("AAPL")
+    → {"group": "industry", "peer_count": 9, "metrics": {"pe": {"value": 31.2,
+       "peer_median": 27.9, "percentile": 64.0}, ...}}
+"""
+
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+import numpy as np
+import config
+from tools.data_fetcher import get_fundamentals, cached_fundamentals
+from tools.price_store import get_price_history
+from tools.numeric import finite_round
+
+# metric → yfinance info field (None = derived from prices)
+PEER_METRICS = {
+    "pe":             "trailingPE",
+    "forward_pe":     "forwardPE",
+    "gross_margins":  "grossMargins",
+    "profit_margins": "profitMargins",
+    "revenue_growth": "revenueGrowth",
+    "roe":            "returnOnEquity",
+    "return_1y":      None,
+}
+PEER_LABELS = {
+    "pe":             "P/E",
+    "forward_pe":     "Forward P/E",
+    "gross_margins":  "Gross margin",
+    "profit_margins": "Profit margin",
+    "revenue_growth": "Revenue growth",
+    "roe":            "Return on equity",
+    "return_1y":      "1-year return",
+}
+
+_sectors: Dict[str, dict] = {}
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _sector_lock(sector: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(sector, threading.Lock())
+
+
+def _return_1y(ticker: str) -> float:
+    try:
+        close = get_price_history(ticker)["Close"]
+    except Exception:
+        return np.nan
+    if len(close) < 2:
+        return np.nan
+    base = close.iloc[-252] if len(close) >= 252 else close.iloc[0]
+    return float(close.iloc[-1] / base - 1)
+
+
+def _metric_value(info: dict, field: str) -> float:
+    value = info.get(field)
+    return float(value) if isinstance(value, (int, float)) else np.nan
+
+
+# ── Sector tables ─────────────────────────────────────────────────────────────
+
+def _universe_fundamentals() -> Dict[str, dict]:
+    """Cached fundamentals, topped up in bulk with any missing universe tickers."""
+    cached  = cached_fundamentals()
+    missing = [t for t in config.SCREENER_UNIVERSE if t not in cached]
+    if missing:
+        def fetch(ticker):
+            try:
+                return get_fundamentals(ticker)
+            except Exception as e:
+                print(f"  [Peers] {ticker} skipped: {e}")
+                return None
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for ticker, info in zip(missing, pool.map(fetch, missing)):
+                if info:
+                    cached[ticker] = info
+        print(f"  [Peers] Fetched fundamentals for {len(missing)} universe tickers")
+    return cached
+
+
+def sector_table(sector: str) -> dict:
+    """
+    Peer table for a sector: tickers (largest first), industries and the
+    (peers, metrics) matrix. Built once per PEER_CACHE_TTL per sector.
+    """
+    entry = _sectors.get(sector)
+    if entry and time.time() - entry["built_at"] < config.PEER_CACHE_TTL:
+        return entry
+
+    with _sector_lock(sector):
+        entry = _sectors.get(sector)       # another thread may have built it
+        if entry and time.time() - entry["built_at"] < config.PEER_CACHE_TTL:
+            return entry
+
+        infos = {t: i for t, i in _universe_fundamentals().items()
+                 if i.get("sector") == sector and i.get("quoteType", "EQUITY") == "EQUITY"}
+        # largest first, so PEER_MAX_PEERS keeps the most relevant names
+        tickers = sorted(infos, key=lambda t: -np.nan_to_num(_metric_value(infos[t], "marketCap")))
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            returns = list(pool.map(_return_1y, tickers))
+
+        matrix = np.full((len(tickers), len(PEER_METRICS)), np.nan)
+        for row, ticker in enumerate(tickers):
+            for col, (metric, field) in enumerate(PEER_METRICS.items()):
+                matrix[row, col] = returns[row] if field is None else _metric_value(infos[ticker], field)
+
+        entry = {
+            "built_at":   time.time(),
+            "tickers":    tickers,
+            "industries": np.array([infos[t].get("industry", "") for t in tickers], dtype=object),
+            "matrix":     matrix,
+        }
+        _sectors[sector] = entry
+        print(f"  [Peers] {sector}: {len(tickers)} companies")
+        return entry
+
+
+def percentile_ranks(matrix: np.ndarray) -> np.ndarray:
+    """
+    Column-wise percentile rank (0–100) of every row; NaN stays NaN.
+    Ties share the average rank. One broadcast compare over the whole table.
+    """
+    x     = np.asarray(matrix, dtype=np.float64)
+    valid = np.isfinite(x)
+    below = (x[None, :, :] < x[:, None, :]) & valid[None, :, :]
+    equal = (x[None, :, :] == x[:, None, :]) & valid[None, :, :]
+    count = valid.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ranks = (below.sum(axis=1) + 0.5 * (equal.sum(axis=1) - 1)) / (count - 1) * 100
+    ranks[~valid] = np.nan
+    ranks[:, count < 2] = np.nan
+    return ranks
+
+
+# ── Public API ────────────────────────────────────────────────────────────────
+
+def peer_comparison(ticker: str, info: dict = None, return_1y: float = None) -> dict:
+    """Percentile ranks of `ticker` against its industry (or sector) peers."""
+    ticker = ticker.upper()
+    info   = info if info is not None else get_fundamentals(ticker)
+    sector, industry = info.get("sector"), info.get("industry")
+    if not sector:
+        return {"error": f"No sector for {ticker}", "status": "failed"}
+
+    table   = sector_table(sector)
+    tickers = table["tickers"]
+    in_industry = table["industries"] == industry
+    group = "industry" if in_industry.sum() - (ticker in tickers) >= config.PEER_MIN_INDUSTRY else "sector"
+    rows  = np.flatnonzero(in_industry) if group == "industry" else np.arange(len(tickers))
+    rows  = [r for r in rows if tickers[r] != ticker][:config.PEER_MAX_PEERS]
+    if not rows:
+        return {"error": f"No peers found for {ticker}", "status": "failed"}
+
+    # the company itself, from fresh values, goes last
+    own = np.array([
+        (return_1y if return_1y is not None else _return_1y(ticker)) if field is None
+        else _metric_value(info, field)
+        for field in PEER_METRICS.values()
+    ])
+    matrix = np.vstack([table["matrix"][rows], own])
+    ranks  = percentile_ranks(matrix)[-1]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)    # all-NaN metric column
+        medians = np.nanmedian(matrix[:-1], axis=0)
+
+    metrics = {}
+    for col, metric in enumerate(PEER_METRICS):
+        metrics[metric] = {
+            "value":       finite_round(own[col], 4),
+            "peer_median": finite_round(medians[col], 4),
+            "percentile":  finite_round(ranks[col], 1),
+        }
+    return {
+        "ticker":     ticker,
+        "sector":     sector,
+        "industry":   industry,
+        "group":      group,
+        "peer_count": len(rows),
+        "peers":      [tickers[r] for r in rows],
+        "metrics":    metrics,
+        "status":     "success",
+    }
+
+
+def format_peer_summary(peers: dict) -> str:
+    """Prompt block: one line per metric with value, peer median and percentile."""
+    if not peers or peers.get("status") != "success":
+        return "Peer comparison unavailable"
+    lines = [f"vs {peers['peer_count']} {peers['group']} peers "
+             f"({', '.join(peers['peers'][:8])}{'…' if peers['peer_count'] > 8 else ''}):"]
+    for metric, m in peers["metrics"].items():
+        if m["value"] is None or m["percentile"] is None:
+            continue
+        ratio = metric in ("pe", "forward_pe")
+        fmt = (lambda v: f"{v:.1f}") if ratio else (lambda v: f"{v * 100:.1f}%")
+        lines.append(f"- {PEER_LABELS[metric]}: {fmt(m['value'])} vs median {fmt(m['peer_median'])} "
+                     f"— {m['percentile']:.0f}th percentile")
+    return "\n".join(lines)
@@ -0,0 +1,161 @@
+"""
+tools/portfolio.py — watchlist-as-portfolio analytics
+======================================================
+Treats a watchlist as an equal-weight portfolio and answers the questions
+per-stock analysis can't: how correlated are these holdings, how volatile
+is the mix, how much does it move with the market, how deep did it fall.
+
+Histories come from the local price store (no extra downloads when fresh),
+are aligned into one (days, tickers + benchmark) return matrix, and every
+number below is derived from that matrix in a single NumPy pass:
+
+    correlation matrix        from the covariance matrix Σ
+    portfolio volatility      sqrt(wᵀ Σ w · 252)
+    beta to benchmark         cov(r, r_b) / var(r_b), holdings + portfolio
+    max drawdown              running peak of the cumulative return curves
+
+Results are cached in memory per (sorted tickers, benchmark) hash.
+"""
+
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import numpy as np
+import config
+from tools.price_store import get_price_history
+from tools.risk_metrics import max_drawdown
+from tools.technical_indicators import stack_price_histories
+from tools.numeric import finite_round, finite_pct
+
+_cache: Dict[str, dict] = {}
+
+
+def _cache_key(tickers: List[str], benchmark: str) -> str:
+    return hashlib.sha1(f"{','.join(sorted(tickers))}|{benchmark}".encode()).hexdigest()
+
+
+def compute_analytics(returns: np.ndarray, tickers: List[str],
+                      weights: np.ndarray = None) -> dict:
+    """
+    Portfolio statistics from aligned daily returns.
+    `returns` is (days, holdings + 1); the last column is the benchmark.
+    """
+    n = len(tickers)
+    weights = np.full(n, 1.0 / n) if weights is None else np.asarray(weights, dtype=np.float64)
+
+    cov       = np.atleast_2d(np.cov(returns, rowvar=False))
+    holdings  = returns[:, :n]
+    port      = holdings @ weights
+    bench_var = cov[n, n]
+
+    vols      = np.sqrt(np.diag(cov)[:n] * 252)
+    port_vol  = np.sqrt(weights @ cov[:n, :n] @ weights * 252)
+    betas     = cov[:n, n] / bench_var
+    port_beta = weights @ betas
+
+    std  = np.sqrt(np.diag(cov)[:n])
+    corr = cov[:n, :n] / np.outer(std, std)
+    np.fill_diagonal(corr, 1.0)
+
+    # growth of $1: holdings, portfolio (daily rebalanced), benchmark
+    curves = np.cumprod(1 + np.column_stack([holdings, port, returns[:, n]]), axis=0)
+    drawdowns = max_drawdown(np.vstack([np.ones(curves.shape[1]), curves]))
+    total     = curves[-1] - 1
+
+    upper = corr[np.triu_indices(n, k=1)]
+    result = {
+        "correlation": {
+            "tickers": tickers,
+            "matrix":  [[finite_round(v, 3) for v in row] for row in corr],
+        },
+        "portfolio": {
+            "weighting":                 "equal",
+            "volatility_annualized_pct": finite_pct(port_vol),
+            "beta":                      finite_round(port_beta),
+            "max_drawdown_pct":          finite_pct(drawdowns[n]),
+            "return_pct":                finite_pct(total[n]),
+            "avg_pairwise_correlation":  finite_round(upper.mean(), 3) if upper.size else None,
+            # > 1 means holdings offset each other; 1 = no diversification
+            "diversification_ratio":     finite_round(weights @ vols / port_vol),
+        },
+        "benchmark_stats": {
+            "volatility_annualized_pct": finite_pct(np.sqrt(bench_var * 252)),
+            "max_drawdown_pct":          finite_pct(drawdowns[n + 1]),
+            "return_pct":                finite_pct(total[n + 1]),
+        },
+        "holdings": [
+            {
+                "ticker":                    t,
+                "weight":                    finite_round(weights[i], 4),
+                "volatility_annualized_pct": finite_pct(vols[i]),
+                "beta":                      finite_round(betas[i]),
+                "max_drawdown_pct":          finite_pct(drawdowns[i]),
+                "return_pct":                finite_pct(total[i]),
+            }
+            for i, t in enumerate(tickers)
+        ],
+    }
+    if upper.size:
+        i, j = np.triu_indices(n, k=1)
+        k = int(np.argmax(upper))
+        result["most_correlated_pair"] = {
+            "tickers": [tickers[i[k]], tickers[j[k]]], "correlation": finite_round(upper[k], 3),
+        }
+    return result
+
+
+def watchlist_analytics(tickers: List[str], benchmark: str = None) -> dict:
+    """Equal-weight portfolio analytics for a watchlist, cached per ticker set."""
+    benchmark = (benchmark or config.BENCHMARK_TICKER).upper()
+    tickers   = sorted({t.upper().strip() for t in tickers if t and t.strip()})
+    if not tickers:
+        return {"error": "Watchlist is empty", "status": "failed"}
+
+    key   = _cache_key(tickers, benchmark)
+    entry = _cache.get(key)
+    if entry and time.time() < entry["expires"]:
+        return {**entry["data"], "from_cache": True}
+
+    start   = time.time()
+    symbols = tickers + ([benchmark] if benchmark not in tickers else [])
+
+    def fetch(ticker):
+        try:
+            return get_price_history(ticker)
+        except Exception as e:
+            print(f"  [Portfolio] {ticker}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        histories = dict(zip(symbols, pool.map(fetch, symbols)))
+    histories = {t: h for t, h in histories.items() if h is not None and len(h) > 1}
+    missing   = [t for t in tickers if t not in histories]
+    held      = [t for t in tickers if t in histories]
+    if not held or benchmark not in histories:
+        return {"error": "No price history available", "missing": missing, "status": "failed"}
+
+    # benchmark last, once — even if it's also a holding
+    histories = {**{t: histories[t] for t in held}, f"{benchmark}__benchmark": histories[benchmark]}
+    _, dates, close, _, _, _ = stack_price_histories(histories)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = close[1:] / close[:-1] - 1
+    aligned = np.isfinite(returns).all(axis=1)
+    returns = returns[aligned]
+    if len(returns) < 2:
+        return {"error": "Not enough overlapping history", "missing": missing, "status": "failed"}
+
+    data = {
+        "tickers":      held,
+        "missing":      missing,
+        "benchmark":    benchmark,
+        "period":       [str(dates[1:][aligned][0])[:10], str(dates[-1])[:10]],
+        "observations": int(len(returns)),
+        **compute_analytics(returns, held),
+        "status":       "success",
+    }
+    _cache[key] = {"data": data, "expires": time.time() + config.PORTFOLIO_CACHE_TTL}
+    print(f"  [Portfolio] {len(held)} tickers analysed in {time.time() - start:.2f}s")
+    return {**data, "from_cache": False}
@@ -0,0 +1,169 @@
+"""
+tools/price_store.py — local daily price history
+=================================================
+Keeps each ticker's daily OHLCV on disk so repeat analyses (and the SPY
+benchmark every analysis needs) don't re-download two years of bars.
+
+    output/prices/{TICKER}.pkl          {"history": DataFrame, "fetched_at": ts}
+    output/prices/{TICKER}.state.json   IndicatorState snapshot
+
+Refresh policy:
+  - fresh (< PRICE_STORE_TTL old)  → served from disk, no network
+  - stale                          → fetch only bars since the last stored
+                                     date and append them
+  - dividend or split in new bars  → yfinance back-adjusts history, so the
+                                     stored bars are stale: full re-download
+
+The indicator state is advanced over the appended bars only (O(1) per bar),
+and rebuilt from history whenever the history itself was replaced.
+"""
+
+import json
+import os
+import time
+from typing import Dict, Optional
+
+import pandas as pd
+import yfinance as yf
+import config
+from tools.indicator_state import IndicatorState
+
+
+def _history_path(ticker: str) -> str:
+    return os.path.join(config.PRICE_STORE_DIR, f"{ticker}.pkl")
+
+
+def _state_path(ticker: str) -> str:
+    return os.path.join(config.PRICE_STORE_DIR, f"{ticker}.state.json")
+
+
+def _load(ticker: str) -> Optional[dict]:
+    try:
+        return pd.read_pickle(_history_path(ticker))
+    except Exception:
+        return None
+
+
+def _save(ticker: str, history: pd.DataFrame) -> None:
+    os.makedirs(config.PRICE_STORE_DIR, exist_ok=True)
+    tmp = _history_path(ticker) + ".tmp"
+    pd.to_pickle({"history": history, "fetched_at": time.time()}, tmp)
+    os.replace(tmp, _history_path(ticker))
+
+
+def _trim(history: pd.DataFrame) -> pd.DataFrame:
+    """Keep the configured look-back window (DEFAULT_PERIOD, e.g. "2y")."""
+    period = config.DEFAULT_PERIOD
+    if not period.endswith("y") or history.empty:
+        return history
+    cutoff = history.index[-1] - pd.DateOffset(years=int(period[:-1]))
+    return history[history.index > cutoff]
+
+
+def _has_corporate_action(bars: pd.DataFrame) -> bool:
+    for col in ("Dividends", "Stock Splits"):
+        if col in bars and (bars[col].fillna(0) != 0).any():
+            return True
+    return False
+
+
+# ── Indicator state ───────────────────────────────────────────────────────────
+
+def load_indicator_state(ticker: str) -> Optional[IndicatorState]:
+    try:
+        with open(_state_path(ticker.upper())) as f:
+            return IndicatorState.from_dict(json.load(f))
+    except Exception:
+        return None
+
+
+def _save_indicator_state(ticker: str, state: IndicatorState) -> None:
+    tmp = _state_path(ticker) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state.to_dict(), f)
+    os.replace(tmp, _state_path(ticker))
+
+
+def _bar_args(history: pd.DataFrame, i: int):
+    row = history.iloc[i]
+    return (str(history.index[i]), float(row["High"]), float(row["Low"]),
+            float(row["Close"]), float(row["Volume"]))
+
+
+def _sync_indicator_state(ticker: str, history: pd.DataFrame, rebuilt: bool) -> None:
+    """
+    Bring the snapshot up to the second-to-last bar (the last one may still
+    be forming). Appends advance the saved state; anything else reseeds it.
+    """
+    if len(history) < 2:
+        return
+    state = None if rebuilt else load_indicator_state(ticker)
+    dates = [str(d) for d in history.index]
+    if state is not None and state.last_date in dates:
+        start = dates.index(state.last_date) + 1
+    else:
+        state, start = IndicatorState(), 0
+    for i in range(start, len(history) - 1):
+        state.advance(*_bar_args(history, i))
+    _save_indicator_state(ticker, state)
+
+
+def indicator_values(ticker: str, history: pd.DataFrame) -> Optional[Dict[str, float]]:
+    """
+    Latest indicator values from the snapshot, if it lines up with `history`
+    (state ends on the bar before the last one). None → compute from arrays.
+    """
+    if history is None or len(history) < 2:
+        return None
+    state = load_indicator_state(ticker)
+    if state is None or state.last_date != str(history.index[-2]):
+        return None
+    return state.peek(*_bar_args(history, len(history) - 1))
+
+
+# ── Public API ────────────────────────────────────────────────────────────────
+
+def get_price_history(ticker: str) -> pd.DataFrame:
+    """
+    Daily OHLCV for the configured period, served from the local store and
+    topped up incrementally from yfinance when stale.
+    """
+    ticker = ticker.upper()
+    cached = _load(ticker)
+    if cached is not None and time.time() - cached["fetched_at"] < config.PRICE_STORE_TTL:
+        return cached["history"]
+
+    stock   = yf.Ticker(ticker)
+    rebuilt = True
+    history = None
+
+    if cached is not None and not cached["history"].empty:
+        stored = cached["history"]
+        last   = stored.index[-1]
+        recent = stock.history(start=last.strftime("%Y-%m-%d"),
+                               interval=config.DEFAULT_INTERVAL)
+        new_bars = recent[recent.index > last]
+        if recent.empty:
+            history, rebuilt = stored, False     # nothing new (weekend/holiday)
+        elif not _has_corporate_action(new_bars):
+            # overlapping bar is replaced — it may have been a partial day
+            history = pd.concat([stored[stored.index < recent.index[0]], recent])
+            history = history[~history.index.duplicated(keep="last")]
+            rebuilt = False
+            print(f"  [Price Store] {ticker}: +{len(new_bars)} bars")
+
+    if history is None:
+        history = stock.history(period=config.DEFAULT_PERIOD,
+                                interval=config.DEFAULT_INTERVAL)
+        print(f"  [Price Store] {ticker}: full download ({len(history)} bars)")
+
+    if history.empty:
+        return history
+
+    history = _trim(history)
+    _save(ticker, history)
+    try:
+        _sync_indicator_state(ticker, history, rebuilt)
+    except Exception as e:
+        print(f"  [Price Store] {ticker}: indicator state not updated: {e}")
+    return history
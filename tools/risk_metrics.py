@@ -0,0 +1,152 @@
+"""
+tools/risk_metrics.py — per-ticker risk statistics
+===================================================
+Everything here is derived from the daily close series we already hold,
+so the agents get measured risk numbers instead of guessing from a single
+volatility figure:
+
+    volatility            annualized, plus rolling 21-day (now vs 1y median)
+    downside deviation    annualized, below the daily risk-free rate
+    VaR / CVaR            historical, 1-day, at RISK_VAR_CONFIDENCE
+    drawdown              max over the lookback, and current from peak
+    Sharpe / Sortino      annualized, excess of RISK_FREE_RATE
+    beta / correlation    vs the benchmark, on date-aligned returns
+
+risk_matrix() works column-wise on a (days, tickers) returns matrix so the
+same code serves one ticker or a universe; compute_risk() is the
+single-ticker wrapper used by data_fetcher.get_stock_data().
+"""
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+import config
+from tools.numeric import finite_round, finite_pct
+
+TRADING_DAYS = 252
+
+
+def max_drawdown(prices: np.ndarray) -> np.ndarray:
+    """Largest peak-to-trough fall (fraction, ≤ 0) per column of a price/equity matrix."""
+    prices = np.asarray(prices, dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        peak = np.fmax.accumulate(prices, axis=0)
+        return np.nanmin(prices / peak - 1, axis=0)
+
+
+def risk_matrix(returns: np.ndarray, benchmark: np.ndarray = None,
+                risk_free: float = None, confidence: float = None,
+                window: int = None) -> Dict[str, np.ndarray]:
+    """
+    Risk statistics per column of a (days, tickers) daily-returns matrix
+    (rows must be fully populated — align before calling). Fractions, not %.
+    """
+    risk_free  = config.RISK_FREE_RATE if risk_free is None else risk_free
+    confidence = config.RISK_VAR_CONFIDENCE if confidence is None else confidence
+    window     = window or config.RISK_ROLLING_WINDOW
+
+    r = np.asarray(returns, dtype=np.float64)
+    if r.ndim == 1:
+        r = r[:, None]
+    days = len(r)
+    rf_daily = risk_free / TRADING_DAYS
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = r.mean(axis=0)
+        vol  = r.std(axis=0, ddof=1) * np.sqrt(TRADING_DAYS)
+        downside = np.sqrt(np.mean(np.minimum(r - rf_daily, 0.0) ** 2, axis=0)) * np.sqrt(TRADING_DAYS)
+
+        tail  = np.quantile(r, 1 - confidence, axis=0)
+        var   = -tail
+        cvar  = -np.nanmean(np.where(r <= tail, r, np.nan), axis=0)
+
+        equity  = np.vstack([np.ones(r.shape[1]), np.cumprod(1 + r, axis=0)])
+        max_dd  = max_drawdown(equity)
+        current = equity[-1] / np.max(equity, axis=0) - 1
+
+        excess  = mean * TRADING_DAYS - risk_free
+        sharpe  = excess / vol
+        sortino = excess / downside
+
+        if days >= window:
+            rolling = np.lib.stride_tricks.sliding_window_view(r, window, axis=0)
+            rolling_vol = rolling.std(axis=-1, ddof=1) * np.sqrt(TRADING_DAYS)
+            vol_now, vol_median = rolling_vol[-1], np.median(rolling_vol, axis=0)
+        else:
+            vol_now = vol_median = np.full(r.shape[1], np.nan)
+
+        out = {
+            "volatility":         vol,
+            "volatility_rolling": vol_now,
+            "volatility_median":  vol_median,
+            "downside_deviation": downside,
+            "var":                var,
+            "cvar":               cvar,
+            "max_drawdown":       max_dd,
+            "current_drawdown":   current,
+            "annual_return":      np.prod(1 + r, axis=0) ** (TRADING_DAYS / days) - 1,
+            "sharpe":             sharpe,
+            "sortino":            sortino,
+        }
+        if benchmark is not None:
+            b  = np.asarray(benchmark, dtype=np.float64)
+            bc = b - b.mean()
+            rc = r - mean
+            cov = (rc * bc[:, None]).sum(axis=0) / (days - 1)
+            out["beta"]        = cov / b.var(ddof=1)
+            out["correlation"] = cov / (r.std(axis=0, ddof=1) * b.std(ddof=1))
+    return out
+
+
+def compute_risk(close: pd.Series, benchmark_close: pd.Series = None,
+                 lookback: int = None) -> dict:
+    """Risk metrics for one ticker over the last `lookback` trading days."""
+    lookback = lookback or config.RISK_LOOKBACK_DAYS
+    returns  = close.pct_change()
+    if benchmark_close is not None and not benchmark_close.empty:
+        frame = pd.concat([returns, benchmark_close.pct_change()], axis=1, join="inner")
+    else:
+        frame = returns.to_frame()
+    frame = frame.dropna().iloc[-lookback:]
+    if len(frame) < 2:
+        return {"error": "Not enough price history", "status": "failed"}
+
+    values = frame.to_numpy(dtype=np.float64)
+    m = risk_matrix(values[:, 0], values[:, 1] if values.shape[1] > 1 else None)
+    level = int(round(config.RISK_VAR_CONFIDENCE * 100))
+
+    return {
+        "lookback_days":                 len(frame),
+        "volatility_annualized_pct":     finite_pct(m["volatility"][0]),
+        f"volatility_{config.RISK_ROLLING_WINDOW}d_pct":        finite_pct(m["volatility_rolling"][0]),
+        f"volatility_{config.RISK_ROLLING_WINDOW}d_median_pct": finite_pct(m["volatility_median"][0]),
+        "downside_deviation_pct":        finite_pct(m["downside_deviation"][0]),
+        f"var_{level}_1d_pct":           finite_pct(m["var"][0]),
+        f"cvar_{level}_1d_pct":          finite_pct(m["cvar"][0]),
+        "max_drawdown_pct":              finite_pct(m["max_drawdown"][0]),
+        "current_drawdown_pct":          finite_pct(m["current_drawdown"][0]),
+        "annualized_return_pct":         finite_pct(m["annual_return"][0]),
+        "sharpe_ratio":                  finite_round(m["sharpe"][0]),
+        "sortino_ratio":                 finite_round(m["sortino"][0]),
+        "beta":                          finite_round(m["beta"][0]) if "beta" in m else None,
+        "correlation_to_benchmark":      finite_round(m["correlation"][0]) if "correlation" in m else None,
+        "status":                        "success",
+    }
+
+
+def format_risk_summary(risk: dict) -> str:
+    """Compact multi-line block for agent prompts."""
+    if not risk or risk.get("status") != "success":
+        return "Risk metrics unavailable"
+    w     = config.RISK_ROLLING_WINDOW
+    level = int(round(config.RISK_VAR_CONFIDENCE * 100))
+    return (
+        f"- Volatility: {risk['volatility_annualized_pct']}% annualized "
+        f"({w}-day: {risk[f'volatility_{w}d_pct']}%, 1y median {risk[f'volatility_{w}d_median_pct']}%)\n"
+        f"- Downside deviation: {risk['downside_deviation_pct']}%\n"
+        f"- 1-day VaR {level}%: {risk[f'var_{level}_1d_pct']}% | CVaR: {risk[f'cvar_{level}_1d_pct']}%\n"
+        f"- Max drawdown: {risk['max_drawdown_pct']}% | Now {risk['current_drawdown_pct']}% from peak\n"
+        f"- Sharpe: {risk['sharpe_ratio']} | Sortino: {risk['sortino_ratio']}\n"
+        f"- Beta vs {config.BENCHMARK_TICKER}: {risk['beta']} (correlation {risk['correlation_to_benchmark']})"
+    )
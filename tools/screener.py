@@ -0,0 +1,341 @@
+"""
+tools/screener.py — local universe screener
+============================================
+Answers "top N stocks for me" without running four agents per candidate.
+
+    build_feature_matrix()   prices (price store) + fundamentals (cache) for
+                             config.SCREENER_UNIVERSE → one structured array:
+                             fundamentals, 1m/3m/1y returns, volatility,
+                             drawdown and the batch technical signals.
+                             Saved to output/screener/, rebuilt nightly by
+                             the scheduler — never on the request path.
+    screen(...)              filter + rank that matrix for a risk/goal
+                             profile — z-scores · goal weights, one matmul.
+    parse_screen_query(q)    "top 5 stocks for someone saving $400/month"
+                             → {"n": 5, "monthly_investable": "200_500"}
+
+The orchestrator runs the full agent pipeline on the shortlist only.
+"""
+
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import config
+from tools.data_fetcher import get_fundamentals
+from tools.price_store import get_price_history
+from tools.numeric import finite_round
+from tools.technical_indicators import (
+    calculate_indicators_batch, stack_price_histories, SIGNAL_NAMES,
+)
+
+FEATURE_DTYPE = np.dtype([
+    ("ticker",          "U12"),
+    ("name",            "U64"),
+    ("sector",          "U32"),
+    ("industry",        "U48"),
+    ("quote_type",      "U8"),
+    ("price",           "f4"),
+    ("market_cap",      "f8"),
+    ("pe",              "f4"),
+    ("forward_pe",      "f4"),
+    ("revenue_growth",  "f4"),
+    ("profit_margins",  "f4"),
+    ("roe",             "f4"),
+    ("debt_to_equity",  "f4"),
+    ("dividend_yield",  "f4"),
+    ("beta",            "f4"),
+    ("ret_1m",          "f4"),
+    ("ret_3m",          "f4"),
+    ("ret_1y",          "f4"),
+    ("volatility",      "f4"),
+    ("max_drawdown_1y", "f4"),
+    ("rsi",             "f4"),
+    ("tech_score",      "i1"),   # bullish - bearish rule count
+    ("overall",         "i1"),
+])
+
+_INFO_FIELDS = {
+    "market_cap":     "marketCap",
+    "pe":             "trailingPE",
+    "forward_pe":     "forwardPE",
+    "revenue_growth": "revenueGrowth",
+    "profit_margins": "profitMargins",
+    "roe":            "returnOnEquity",
+    "debt_to_equity": "debtToEquity",
+    "dividend_yield": "dividendYield",
+    "beta":           "beta",
+}
+
+# ── Ranking model ─────────────────────────────────────────────────────────────
+# Score = Σ weight · z-score(feature). Negative weight = lower is better.
+GOAL_WEIGHTS = {
+    "grow_savings": {"ret_1y": 0.25, "revenue_growth": 0.20, "profit_margins": 0.15,
+                     "roe": 0.15, "tech_score": 0.15, "volatility": -0.10},
+    "income":       {"dividend_yield": 0.45, "profit_margins": 0.15, "tech_score": 0.10,
+                     "debt_to_equity": -0.10, "volatility": -0.20},
+    "learn":        {"log_market_cap": 0.35, "profit_margins": 0.20, "tech_score": 0.15,
+                     "volatility": -0.30},
+}
+RISK_VOLATILITY_WEIGHT = {"low": 2.0, "medium": 1.0, "high": 0.3}
+RISK_MAX_VOLATILITY    = {"low": 30.0, "medium": 45.0, "high": np.inf}
+
+FEATURE_LABELS = {
+    "ret_1y":          "strong 1-year performance",
+    "revenue_growth":  "fast revenue growth",
+    "profit_margins":  "high profit margins",
+    "roe":             "high return on equity",
+    "tech_score":      "positive technical signals",
+    "volatility":      "low price swings",
+    "dividend_yield":  "attractive dividend",
+    "debt_to_equity":  "low debt",
+    "log_market_cap":  "large, established company",
+}
+
+_features: Optional[np.ndarray] = None
+_features_built_at = 0.0
+
+
+def _matrix_path() -> str:
+    return os.path.join(config.SCREENER_DIR, "features.npz")
+
+
+def _safe(fn, ticker):
+    try:
+        return fn(ticker)
+    except Exception as e:
+        print(f"  [Screener] {ticker} skipped: {e}")
+        return None
+
+
+# ── Feature matrix ────────────────────────────────────────────────────────────
+
+def _ffill(matrix: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs down each column (leading NaNs stay NaN)."""
+    rows = np.where(np.isnan(matrix), 0, np.arange(len(matrix))[:, None])
+    np.maximum.accumulate(rows, axis=0, out=rows)       # last valid row at or above
+    return matrix[rows, np.arange(matrix.shape[1])]
+
+
+def build_feature_matrix(tickers: List[str] = None) -> np.ndarray:
+    """Fetch/refresh inputs for the universe and compute every feature column-wise."""
+    global _features, _features_built_at
+    tickers = [t.upper() for t in (tickers or config.SCREENER_UNIVERSE)]
+    start = time.time()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        histories = dict(zip(tickers, pool.map(lambda t: _safe(get_price_history, t), tickers)))
+        infos     = dict(zip(tickers, pool.map(lambda t: _safe(get_fundamentals, t), tickers)))
+    histories = {t: h for t, h in histories.items() if h is not None and len(h) > 1}
+    if not histories:
+        raise RuntimeError("No price history available for the screener universe")
+
+    names, _, close, high, low, volume = stack_price_histories(histories)
+    # forward-fill so a missing bar doesn't void every return or indicator
+    filled, high, low, volume = (_ffill(m) for m in (close, high, low, volume))
+    tech = calculate_indicators_batch(filled, high, low, volume, names)
+    last = filled[-1]
+
+    def trailing_return(days: int) -> np.ndarray:
+        base = filled[-days] if len(filled) >= days else filled[0]
+        return (last / base - 1) * 100
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        daily = filled[1:] / filled[:-1] - 1
+        year  = filled[-252:]
+        peak  = np.fmax.accumulate(year, axis=0)
+
+        out = np.zeros(len(names), dtype=FEATURE_DTYPE)
+        out["ticker"]          = names
+        out["price"]           = last
+        out["ret_1m"]          = trailing_return(21)
+        out["ret_3m"]          = trailing_return(63)
+        out["ret_1y"]          = trailing_return(252)
+        out["volatility"]      = np.nanstd(daily, axis=0, ddof=1) * np.sqrt(252) * 100
+        out["max_drawdown_1y"] = np.nanmin(year / peak - 1, axis=0) * 100
+    out["rsi"]        = tech["rsi"]
+    out["tech_score"] = tech["bullish_count"] - tech["bearish_count"]
+    out["overall"]    = tech["overall"]
+
+    for i, ticker in enumerate(names):
+        info = infos.get(ticker) or {}
+        out["name"][i]       = (info.get("longName") or info.get("shortName") or ticker)[:64]
+        out["sector"][i]     = (info.get("sector") or "")[:32]
+        out["industry"][i]   = (info.get("industry") or "")[:48]
+        out["quote_type"][i] = (info.get("quoteType") or "EQUITY")[:8]
+        for field, key in _INFO_FIELDS.items():
+            value = info.get(key)
+            out[field][i] = value if isinstance(value, (int, float)) else np.nan
+
+    os.makedirs(config.SCREENER_DIR, exist_ok=True)
+    np.savez(_matrix_path(), features=out, built_at=np.array(time.time()))
+    _features, _features_built_at = out, time.time()
+    print(f"  [Screener] Feature matrix: {len(out)} tickers in {time.time() - start:.1f}s")
+    return out
+
+
+class FeatureMatrixUnavailable(RuntimeError):
+    """No feature matrix has been built yet (a background build was started)."""
+
+
+_build_lock = threading.Lock()
+
+
+def _build_in_background() -> None:
+    def run():
+        try:
+            build_feature_matrix()
+        except Exception as e:
+            print(f"  [Screener] Background build failed: {e}")
+        finally:
+            _build_lock.release()
+
+    if _build_lock.acquire(blocking=False):          # one build at a time
+        threading.Thread(target=run, daemon=True).start()
+
+
+def load_feature_matrix(max_age: float = None) -> np.ndarray:
+    """
+    In-memory → on-disk matrix, fresh or not: the full-universe build is
+    far too slow for the request path and runs from the scheduler (07:00).
+    A stale matrix is served until then. With no matrix at all, a single
+    background build is started and FeatureMatrixUnavailable raised.
+    """
+    global _features, _features_built_at
+    max_age = config.SCREENER_TTL if max_age is None else max_age
+    if _features is not None and time.time() - _features_built_at < max_age:
+        return _features
+    try:
+        saved = np.load(_matrix_path())
+        if float(saved["built_at"]) > _features_built_at:
+            _features, _features_built_at = saved["features"], float(saved["built_at"])
+    except Exception:
+        pass
+    if _features is not None:
+        if time.time() - _features_built_at >= max_age:
+            print(f"  [Screener] Using feature matrix from "
+                  f"{(time.time() - _features_built_at) / 3600:.0f}h ago (rebuilt by the scheduler)")
+        return _features
+    _build_in_background()
+    raise FeatureMatrixUnavailable("Screener data is still being built — try again in a few minutes")
+
+
+def ensure_feature_matrix() -> None:
+    """Non-blocking: start a build at boot if no matrix exists on disk yet."""
+    if _features is None and not os.path.exists(_matrix_path()):
+        _build_in_background()
+
+
+# ── Ranking ───────────────────────────────────────────────────────────────────
+
+def _zscores(features: np.ndarray, columns: List[str]) -> np.ndarray:
+    """(tickers, columns) z-score matrix; missing values score 0 (average)."""
+    cols = []
+    for c in columns:
+        if c == "log_market_cap":
+            x = np.log10(np.where(features["market_cap"] > 0, features["market_cap"], np.nan))
+        else:
+            x = features[c].astype(np.float64)
+        mean, std = np.nanmean(x), np.nanstd(x)
+        cols.append(np.nan_to_num((x - mean) / std) if std > 0 else np.zeros_like(x))
+    return np.column_stack(cols)
+
+
+def screen(risk_tolerance: str = "medium", goal: str = "grow_savings",
+           n: int = config.SCREENER_DEFAULT_N, features: np.ndarray = None) -> List[Dict]:
+    """Filter and rank the universe for a profile; best n first."""
+    features = load_feature_matrix() if features is None else features
+    weights  = dict(GOAL_WEIGHTS.get(goal, GOAL_WEIGHTS["grow_savings"]))
+    weights["volatility"] = weights.get("volatility", 0.0) * RISK_VOLATILITY_WEIGHT.get(risk_tolerance, 1.0)
+    columns = list(weights)
+
+    with np.errstate(invalid="ignore"):
+        z     = _zscores(features, columns)
+        score = z @ np.array([weights[c] for c in columns])
+
+        is_etf = features["quote_type"] == "ETF"
+        mask   = features["volatility"] <= RISK_MAX_VOLATILITY.get(risk_tolerance, np.inf)
+        if goal == "income":
+            mask &= features["dividend_yield"] > 0
+        if risk_tolerance == "low":
+            mask &= is_etf | (features["profit_margins"] > 0)
+
+    candidates = np.flatnonzero(mask)
+    top = candidates[np.argsort(-score[candidates], kind="stable")][:max(1, n)]
+
+    results = []
+    for i in top:
+        f = features[i]
+        contributions = z[i] * np.array([weights[c] for c in columns])
+        reasons = [FEATURE_LABELS[columns[k]] for k in np.argsort(-contributions)[:2]
+                   if contributions[k] > 0]
+        results.append({
+            "ticker":         str(f["ticker"]),
+            "name":           str(f["name"]),
+            "sector":         str(f["sector"]),
+            "type":           str(f["quote_type"]),
+            "score":          round(float(score[i]), 3),
+            "price":          finite_round(f["price"]),
+            "return_1y_pct":  finite_round(f["ret_1y"]),
+            "volatility_pct": finite_round(f["volatility"]),
+            "dividend_yield": finite_round(f["dividend_yield"], 4),
+            "pe_ratio":       finite_round(f["pe"]),
+            "technical":      SIGNAL_NAMES[int(f["overall"])],
+            "reasons":        reasons,
+        })
+    return results
+
+
+# ── Natural-language query ────────────────────────────────────────────────────
+
+_NUMBER_WORDS = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+                 "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10}
+_COUNT_RE  = re.compile(r"\btop\s+(\d+|" + "|".join(_NUMBER_WORDS) + r")\b"
+                        r"|\b(\d+|" + "|".join(_NUMBER_WORDS) + r")\s+(?:[a-z-]+\s+){0,3}?(?:stocks|companies|picks|ideas|etfs|funds)\b")
+_BUDGET_RE = re.compile(r"\$\s?(\d[\d,]*(?:\.\d+)?)\s*(k)?\s*(?:/|per|a|each|every)?\s*(month|mo|week|wk|year|yr)?")
+
+_RISK_WORDS = [
+    ("low",  ("safe", "low risk", "low-risk", "conservative", "can't lose", "cannot lose", "stable")),
+    ("high", ("aggressive", "high risk", "high-risk", "risky", "moonshot")),
+]
+_GOAL_WORDS = [
+    ("income",       ("dividend", "income", "passive", "yield")),
+    ("learn",        ("learn", "first stock", "beginner", "starter")),
+    ("grow_savings", ("grow", "growth", "saving", "retire", "long term", "long-term")),
+]
+
+
+def parse_screen_query(query: str) -> Dict:
+    """Pull N, budget bucket, risk and goal out of a free-text request."""
+    q = (query or "").lower()
+    parsed = {}
+
+    m = _COUNT_RE.search(q)
+    if m:
+        token = m.group(1) or m.group(2)
+        n = int(token) if token.isdigit() else _NUMBER_WORDS[token]
+        parsed["n"] = max(1, min(n, config.SCREENER_MAX_N))
+
+    m = _BUDGET_RE.search(q)
+    if m:
+        amount = float(m.group(1).replace(",", "")) * (1000 if m.group(2) else 1)
+        unit = m.group(3) or "month"
+        monthly = {"week": amount * 52 / 12, "wk": amount * 52 / 12,
+                   "year": amount / 12, "yr": amount / 12}.get(unit, amount)
+        parsed["monthly_investable"] = (
+            "under_200" if monthly < 200 else "200_500" if monthly <= 500 else "500_plus"
+        )
+
+    for value, words in _RISK_WORDS:
+        if any(w in q for w in words):
+            parsed["risk_tolerance"] = value
+            break
+    for value, words in _GOAL_WORDS:
+        if any(w in q for w in words):
+            parsed["goal"] = value
+            break
+    return parsed
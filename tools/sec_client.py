@@ -0,0 +1,106 @@
+"""
+tools/sec_client.py — shared HTTP client for SEC EDGAR
+=======================================================
+One pooled requests.Session for every SEC call in the process, behind a
+token bucket that enforces SEC's fair-access limit (10 requests/second)
+across all threads. Callers can fan requests out over a thread pool and
+the bucket — not hand-placed sleeps — keeps the aggregate rate legal.
+
+    from tools.sec_client import sec_get
+    response = sec_get("https://data.sec.gov/submissions/CIK0000320193.json")
+
+The bucket holds a single token, so requests are spaced 1/rate apart
+from the first one — no start-up burst. Transient failures (429 / 5xx,
+connection errors) are retried with backoff in SECClient.get(), and every
+retry takes a token like any other request; Retry-After is honoured.
+"""
+
+import threading
+import time
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+import config
+
+RETRY_STATUS  = {429, 500, 502, 503, 504}
+MAX_RETRIES   = 3
+BACKOFF       = 0.5          # seconds, doubled per retry
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens/second, bursts up to `capacity` (default 1)."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate     = float(rate)
+        self.capacity = float(capacity or 1)
+        self.tokens   = self.capacity
+        self.updated  = time.monotonic()
+        self.lock     = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens  = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class SECClient:
+    def __init__(self, rate: float = None, pool_size: int = None):
+        self.bucket  = TokenBucket(rate or config.SEC_RATE_LIMIT)
+        self.session = requests.Session()
+        self.session.headers.update({
+            "User-Agent":      config.SEC_USER_AGENT,   # required by SEC
+            "Accept-Encoding": "gzip, deflate",
+        })
+        size = pool_size or config.SEC_MAX_WORKERS * 2
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=size)
+        self.session.mount("https://", adapter)
+
+    def get(self, url: str, headers: dict = None, timeout: float = 30, **kwargs) -> requests.Response:
+        # Retries live here, not in urllib3, so each one goes through the bucket.
+        for attempt in range(MAX_RETRIES + 1):
+            self.bucket.acquire()
+            try:
+                response = self.session.get(url, headers=headers, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == MAX_RETRIES:
+                    raise
+                time.sleep(BACKOFF * 2 ** attempt)
+                continue
+            if response.status_code not in RETRY_STATUS or attempt == MAX_RETRIES:
+                return response
+            response.close()                 # return a streamed connection to the pool
+            time.sleep(_retry_after(response) or BACKOFF * 2 ** attempt)
+        return response
+
+
+def _retry_after(response: requests.Response) -> Optional[float]:
+    try:
+        return min(float(response.headers["Retry-After"]), 60.0)
+    except (KeyError, ValueError):
+        return None
+
+
+_client: Optional[SECClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> SECClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = SECClient()
+    return _client
+
+
+def sec_get(url: str, headers: dict = None, **kwargs) -> requests.Response:
+    """Rate-limited GET through the shared pooled session."""
+    return get_client().get(url, headers=headers, **kwargs)
@@ -1,111 +1,264 @@
-import requests
 import json
 import time
-import re
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional
 import config
+from tools.sec_client import sec_get
+from tools.filing_store import iter_raw, stream_raw, get_text, put_text
+from tools.filing_sections import FEED_CHUNK, extract_sections
+
+# All SEC traffic goes through tools/sec_client.py: one pooled session with
+# the required User-Agent, rate-limited to SEC's 10 requests/second.
+
+# ── Company tickers (ticker → CIK) ────────────────────────────────────────────
+# company_tickers_exchange.json is >1MB and changes a few times a day at most
+# (same registrants as company_tickers.json, plus the listing exchange). Keep it
+# on disk with its validators, revalidate once per SEC_TICKERS_TTL with a
+# conditional GET (usually a 304), and serve lookups from an in-memory dict.
+
+TICKERS_URL = "https://www.sec.gov/files/company_tickers_exchange.json"
+
+_tickers: dict = {}          # {"data", "etag", "last_modified", "checked_at"}
+_cik_by_ticker: dict = {}
+_tickers_lock = threading.Lock()
+
+
+def _tickers_path() -> str:
+    return os.path.join(config.SEC_CACHE_DIR, "company_tickers_exchange.json")
+
+
+def _save_tickers(entry: dict) -> None:
+    os.makedirs(config.SEC_CACHE_DIR, exist_ok=True)
+    tmp = _tickers_path() + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(entry, f)
+    os.replace(tmp, _tickers_path())
+
+
+def _set_tickers(entry: dict) -> None:
+    global _tickers, _cik_by_ticker
+    _cik_by_ticker = {
+        company["ticker"].upper(): str(company["cik_str"]).zfill(10)
+        for company in entry["data"].values()
+    }
+    _tickers = entry
+
+
+def _rows_to_tickers(payload: dict) -> dict:
+    # {"fields": ["cik", "name", "ticker", "exchange"], "data": [[...], ...]}
+    # → the company_tickers.json shape, keyed "0", "1", ...
+    fields = payload["fields"]
+    out = {}
+    for i, row in enumerate(payload["data"]):
+        company = dict(zip(fields, row))
+        out[str(i)] = {
+            "cik_str":  company["cik"],
+            "ticker":   company["ticker"],
+            "title":    company["name"],
+            "exchange": company.get("exchange") or "",
+        }
+    return out
+
+
+def fetch_company_tickers(force: bool = False) -> dict:
+    """
+    Every registrant ticker with its CIK, name and exchange, keyed "0",
+    "1", ... in SEC's own (roughly size) order.
+    Shared by the CIK lookup and the in-process search index.
+    """
+    with _tickers_lock:
+        if not _tickers:
+            try:
+                with open(_tickers_path()) as f:
+                    _set_tickers(json.load(f))
+            except Exception:
+                pass
+
+        if _tickers and not force and time.time() - _tickers["checked_at"] < config.SEC_TICKERS_TTL:
+            return _tickers["data"]
+
+        headers = {}
+        if _tickers.get("etag"):
+            headers["If-None-Match"] = _tickers["etag"]
+        if _tickers.get("last_modified"):
+            headers["If-Modified-Since"] = _tickers["last_modified"]
+
+        try:
+            response = sec_get(TICKERS_URL, headers=headers)
+            if response.status_code == 304 and _tickers:
+                entry = {**_tickers, "checked_at": time.time()}
+            else:
+                response.raise_for_status()
+                entry = {
+                    "data":          _rows_to_tickers(response.json()),
+                    "etag":          response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "checked_at":    time.time(),
+                }
+                print(f"  [SEC] company_tickers_exchange.json refreshed ({len(entry['data'])} registrants)")
+            _save_tickers(entry)
+            _set_tickers(entry)
+        except Exception as e:
+            if not _tickers:
+                raise
+            print(f"  [SEC] company_tickers_exchange.json revalidation failed, using cached copy: {e}")
+        return _tickers["data"]
 
-# SEC EDGAR requires a user agent header by law
-HEADERS = {
-    "User-Agent": "FinSight Research Tool contact@finsight.com",
-    "Accept-Encoding": "gzip, deflate",
-    "Host": "data.sec.gov"
-}
 
 def get_cik_from_ticker(ticker: str) -> str:
     """Convert stock ticker to SEC CIK number."""
     print(f"  [RAG Agent] Looking up SEC CIK for {ticker}...")
     
     try:
-        url = "https://www.sec.gov/files/company_tickers.json"
-        response = requests.get(url, headers={
-            "User-Agent": "FinSight Research Tool contact@finsight.com"
-        })
-        data = response.json()
-        
-        for key, company in data.items():
-            if company["ticker"].upper() == ticker.upper():
-                cik = str(company["cik_str"]).zfill(10)
-                print(f"  [RAG Agent] Found CIK: {cik}")
-                return cik
-                
-        return None
+        fetch_company_tickers()
+        cik = _cik_by_ticker.get(ticker.upper())
+        if cik:
+            print(f"  [RAG Agent] Found CIK: {cik}")
+        return cik
     except Exception as e:
         print(f"  [RAG Agent] CIK lookup failed: {e}")
         return None
 
 
-def get_recent_filings(cik: str, filing_type: str = "10-K", count: int = 2) -> list:
-    """Get list of recent SEC filings for a company."""
+# ── Submissions (filing lists) ────────────────────────────────────────────────
+# CIK{cik}.json is fetched once per CIK and parsed once for every form type.
+# The compact copy on disk keeps its validators; within SEC_SUBMISSIONS_TTL
+# no request is made at all, after that a conditional GET (mostly 304s).
+
+SUBMISSION_FIELDS = ["form", "accessionNumber", "filingDate", "primaryDocument"]
+
+_submissions: dict = {}      # cik → {"recent", "etag", "last_modified", "checked_at"}
+_submissions_lock = threading.Lock()
+
+
+def _submissions_path(cik: str) -> str:
+    return os.path.join(config.SEC_CACHE_DIR, "submissions", f"CIK{cik}.json")
+
+
+def get_submissions(cik: str) -> dict:
+    """Recent-filings columns ({field: [...]}) for a CIK, cached and revalidated."""
+    with _submissions_lock:
+        entry = _submissions.get(cik)
+    if entry is None:
+        try:
+            with open(_submissions_path(cik)) as f:
+                entry = json.load(f)
+        except Exception:
+            entry = None
+    if entry and time.time() - entry["checked_at"] < config.SEC_SUBMISSIONS_TTL:
+        return entry["recent"]
+
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+
     try:
-        url = f"https://data.sec.gov/submissions/CIK{cik}.json"
-        response = requests.get(url, headers=HEADERS)
-        data = response.json()
-        
-        filings = data.get("filings", {}).get("recent", {})
-        forms = filings.get("form", [])
-        accession_numbers = filings.get("accessionNumber", [])
-        filing_dates = filings.get("filingDate", [])
-        
-        results = []
-        for i, form in enumerate(forms):
-            if form == filing_type and len(results) < count:
-                results.append({
-                    "type": form,
-                    "accession_number": accession_numbers[i],
-                    "date": filing_dates[i],
-                    "cik": cik
-                })
-                
-        return results
+        response = sec_get(f"https://data.sec.gov/submissions/CIK{cik}.json", headers=headers)
+        if response.status_code == 304 and entry:
+            entry = {**entry, "checked_at": time.time()}
+        else:
+            response.raise_for_status()
+            recent = response.json().get("filings", {}).get("recent", {})
+            entry = {
+                "recent":        {k: recent.get(k, []) for k in SUBMISSION_FIELDS},
+                "etag":          response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "checked_at":    time.time(),
+            }
+        os.makedirs(os.path.dirname(_submissions_path(cik)), exist_ok=True)
+        tmp = _submissions_path(cik) + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp, _submissions_path(cik))
+    except Exception as e:
+        if not entry:
+            raise
+        print(f"  [SEC] Submissions revalidation failed for {cik}, using cached copy: {e}")
+
+    with _submissions_lock:
+        _submissions[cik] = entry
+    return entry["recent"]
+
+
+def get_recent_filings_by_type(cik: str, filing_types: list, count: int = 2) -> dict:
+    """{form type: newest `count` filings} from a single submissions lookup."""
+    results = {ft: [] for ft in filing_types}
+    try:
+        recent = get_submissions(cik)
     except Exception as e:
         print(f"  [RAG Agent] Filing lookup failed: {e}")
-        return []
+        return results
+    
+    for form, accession, date, document in zip(recent["form"], recent["accessionNumber"],
+                                               recent["filingDate"], recent["primaryDocument"]):
+        if form in results and len(results[form]) < count:
+            results[form].append({
+                "type": form,
+                "accession_number": accession,
+                "date": date,
+                "primary_document": document,
+                "cik": cik
+            })
+    return results
 
 
-def extract_filing_text(cik: str, accession_number: str) -> str:
-    """Extract text content from an SEC filing."""
+def get_recent_filings(cik: str, filing_type: str = "10-K", count: int = 2) -> list:
+    """Get list of recent SEC filings for a company."""
+    return get_recent_filings_by_type(cik, [filing_type], count)[filing_type]
+
+
+# Bump when the HTML → text step changes: stored text for older versions
+# is ignored and re-derived from the stored HTML (no download).
+EXTRACTOR_VERSION = 2
+
+
+def stream_filing_html(cik: str, accession_number: str,
+                       primary_document: str) -> Optional[Iterator[str]]:
+    """
+    Main document HTML for a filing as text chunks — from the local store,
+    else streamed from EDGAR (and written to the store as it arrives), so
+    the whole document is never held in memory. None if it can't be located.
+    """
+    stored = iter_raw(accession_number)
+    if stored is not None:
+        return stored
+    if not primary_document:
+        return None
+
+    # The submissions list names the main document, so no index page is needed
+    acc_formatted = accession_number.replace("-", "")
+    doc_url = (
+        f"https://www.sec.gov/Archives/edgar/data/"
+        f"{int(cik)}/{acc_formatted}/{primary_document}"
+    )
+    return _download(doc_url, accession_number)
+
+
+def _download(url: str, accession_number: str) -> Iterator[str]:
+    response = sec_get(url, stream=True)
+    with response:
+        response.raise_for_status()
+        response.encoding = response.encoding or "utf-8"
+        chunks = response.iter_content(FEED_CHUNK, decode_unicode=True)
+        yield from stream_raw(accession_number, chunks)
+
+
+def extract_filing_text(cik: str, accession_number: str, form: str = "10-K",
+                        primary_document: str = "") -> str:
+    """Extract the configured sections (config.SEC_SECTIONS) from an SEC filing."""
     try:
-        # Format accession number for URL
-        acc_formatted = accession_number.replace("-", "")
-        
-        # Get filing index
-        index_url = f"https://www.sec.gov/Archives/edgar/full-index/{cik[:4]}"
-        
-        # Direct document fetch
-        doc_url = (
-            f"https://www.sec.gov/Archives/edgar/data/"
-            f"{int(cik)}/{acc_formatted}/{accession_number}-index.htm"
-        )
-        
-        response = requests.get(doc_url, headers={
-            "User-Agent": "FinSight Research Tool contact@finsight.com"
-        })
-        
-        # Extract text links from index
-        text = response.text
-        
-        # Find the main document
-        import re
-        links = re.findall(r'href="(/Archives/edgar/data/[^"]+\.htm)"', text)
-        
-        if not links:
-            return ""
-            
-        # Fetch main document
-        main_url = f"https://www.sec.gov{links[0]}"
-        time.sleep(0.1)  # SEC rate limit courtesy
-        
-        doc_response = requests.get(main_url, headers={
-            "User-Agent": "FinSight Research Tool contact@finsight.com"
-        })
-        
-        # Clean HTML tags
-        clean_text = re.sub(r'<[^>]+>', ' ', doc_response.text)
-        clean_text = re.sub(r'\s+', ' ', clean_text).strip()
-        
-        # Return first 50,000 chars (enough for key sections)
-        return clean_text[:50000]
+        text = get_text(accession_number, EXTRACTOR_VERSION)
+        if text is None:
+            html = stream_filing_html(cik, accession_number, primary_document)
+            if html is None:
+                return ""
+            text = extract_sections(html, form)      # parsed chunk by chunk
+            put_text(accession_number, text, EXTRACTOR_VERSION)
+        return text
         
     except Exception as e:
         print(f"  [RAG Agent] Text extraction failed: {e}")
@@ -123,24 +276,27 @@ def get_sec_filings_text(ticker: str) -> dict:
     if not cik:
         return {"error": f"Could not find SEC CIK for {ticker}", "status": "failed"}
     
-    all_filings = []
+    # One (usually cached) submissions lookup, then the main documents
+    # fetched concurrently — the shared client's token bucket keeps us
+    # within SEC's rate limit.
+    listed  = get_recent_filings_by_type(cik, config.SEC_FILING_TYPES, config.MAX_FILINGS)
+    filings = [f for ft in config.SEC_FILING_TYPES for f in listed[ft]]
     
-    for filing_type in config.SEC_FILING_TYPES:
-        filings = get_recent_filings(cik, filing_type, config.MAX_FILINGS)
-        
+    with ThreadPoolExecutor(max_workers=config.SEC_MAX_WORKERS) as pool:
         for filing in filings:
-            print(f"  [RAG Agent] Extracting {filing_type} from {filing['date']}...")
-            text = extract_filing_text(cik, filing["accession_number"])
-            
-            if text:
-                all_filings.append({
-                    "type": filing_type,
-                    "date": filing["date"],
-                    "text": text,
-                    "accession_number": filing["accession_number"]
-                })
-            
-            time.sleep(0.2)  # Be respectful to SEC servers
+            print(f"  [RAG Agent] Extracting {filing['type']} from {filing['date']}...")
+        texts = pool.map(lambda f: extract_filing_text(cik, f["accession_number"], f["type"],
+                                                       f["primary_document"]), filings)
+        
+        all_filings = [
+            {
+                "type": filing["type"],
+                "date": filing["date"],
+                "text": text,
+                "accession_number": filing["accession_number"]
+            }
+            for filing, text in zip(filings, texts) if text
+        ]
     
     if not all_filings:
         return {
@@ -155,6 +311,7 @@ def get_sec_filings_text(ticker: str) -> dict:
         "ticker": ticker,
         "cik": cik,
         "filings": all_filings,
+        "listed_accessions": [f["accession_number"] for f in filings],   # incl. failed fetches
         "total_filings": len(all_filings),
         "status": "success"
     }
\ No newline at end of file
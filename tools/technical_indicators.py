@@ -1,131 +1,240 @@
 import pandas as pd
 import numpy as np
 import config
+from typing import Dict, List, Sequence
+from tools.indicator_engine import compute_indicators, evaluate
+from tools.numeric import finite_round
 
-def calculate_indicators(price_history: pd.DataFrame) -> dict:
+# ─── Signal Encoding ──────────────────────────────────────────
+# Rules are evaluated as arrays so the single-ticker path, the batch path
+# and anything that works over full history share one definition.
+BULLISH, NEUTRAL, BEARISH = 1, 0, -1
+SIGNAL_NAMES = {BULLISH: "BULLISH", NEUTRAL: "NEUTRAL", BEARISH: "BEARISH"}
+SIGNAL_RULES = ["RSI", "MACD", "MA", "BBANDS"]
+
+SIGNAL_REASONS = {
+    "RSI": {
+        BULLISH: "Oversold at {rsi}",
+        BEARISH: "Overbought at {rsi}",
+        NEUTRAL: "Neutral at {rsi}",
+    },
+    "MACD": {
+        BULLISH: "Positive histogram, MACD above signal",
+        BEARISH: "Negative histogram, MACD below signal",
+        NEUTRAL: "Mixed MACD signals",
+    },
+    "MA": {
+        BULLISH: "Price above 200 SMA, golden cross formation",
+        BEARISH: "Price below 200 SMA, death cross formation",
+        NEUTRAL: "Mixed moving average signals",
+    },
+    "BBANDS": {
+        BULLISH: "Price near lower band ({bb_position}%)",
+        BEARISH: "Price near upper band ({bb_position}%)",
+        NEUTRAL: "Price mid-band ({bb_position}%)",
+    },
+}
+
+
+def _rule(bullish, bearish) -> np.ndarray:
+    return np.where(bullish, BULLISH, np.where(bearish, BEARISH, NEUTRAL)).astype(np.int8)
+
+
+def signal_thresholds(**overrides) -> Dict[str, float]:
+    """Rule thresholds from config.py, optionally overridden (backtest tuning)."""
+    thresholds = {
+        "rsi_oversold":   config.RSI_OVERSOLD,
+        "rsi_overbought": config.RSI_OVERBOUGHT,
+        "bb_lower_pct":   config.BB_LOWER_PCT,
+        "bb_upper_pct":   config.BB_UPPER_PCT,
+    }
+    unknown = set(overrides) - set(thresholds)
+    if unknown:
+        raise ValueError(f"Unknown signal thresholds: {sorted(unknown)}")
+    thresholds.update({k: v for k, v in overrides.items() if v is not None})
+    return thresholds
+
+
+def signal_codes(rsi, macd, macd_signal, macd_hist,
+                 price, sma_50, sma_200, bb_position,
+                 **thresholds) -> Dict[str, np.ndarray]:
+    """
+    BULLISH/NEUTRAL/BEARISH (+1/0/-1) per rule, plus overall score.
+    Inputs may be scalars or arrays of any (matching) shape; NaN inputs
+    fall through to NEUTRAL exactly like the scalar comparisons did.
+    Thresholds default to config.py (see signal_thresholds).
+    """
+    t = signal_thresholds(**thresholds)
+    rsi, macd, macd_signal, macd_hist, price, sma_50, sma_200, bb_position = (
+        np.asarray(v, dtype=np.float64) for v in
+        (rsi, macd, macd_signal, macd_hist, price, sma_50, sma_200, bb_position)
+    )
+    codes = {
+        "RSI":    _rule(rsi < t["rsi_oversold"], rsi > t["rsi_overbought"]),
+        "MACD":   _rule((macd_hist > 0) & (macd > macd_signal),
+                        (macd_hist < 0) & (macd < macd_signal)),
+        "MA":     _rule((price > sma_200) & (sma_50 > sma_200),
+                        (price < sma_200) & (sma_50 < sma_200)),
+        "BBANDS": _rule(bb_position < t["bb_lower_pct"], bb_position > t["bb_upper_pct"]),
+    }
+    stacked = np.stack([codes[r] for r in SIGNAL_RULES])
+    codes["bullish_count"] = (stacked == BULLISH).sum(axis=0).astype(np.int8)
+    codes["bearish_count"] = (stacked == BEARISH).sum(axis=0).astype(np.int8)
+    codes["overall"] = _rule(codes["bullish_count"] >= 3, codes["bearish_count"] >= 3)
+    return codes
+
+
+# ─── Multi-timeframe ──────────────────────────────────────────
+# Weekly/monthly bars are aggregated from the daily history we already
+# have — no extra downloads at other intervals.
+TIMEFRAMES = {"weekly": "W-FRI", "monthly": "M"}
+TIMEFRAME_SET = {
+    "close":       "close",
+    "rsi":         "rsi",
+    "macd":        "macd",
+    "macd_signal": "macd_signal",
+    "macd_hist":   "macd_hist",
+    "bb_position": "bb_position",
+    "sma_20":      ("sma", {"window": 20}),
+}
+TIMEFRAME_RULES = ["RSI", "MACD", "BBANDS"]   # MA rule needs a 200-bar SMA
+
+
+def resample_bars(index: pd.DatetimeIndex, close: np.ndarray, high: np.ndarray,
+                  low: np.ndarray, volume: np.ndarray, freq: str):
+    """
+    Aggregate daily bars into calendar periods (freq is a pandas period
+    alias, e.g. "W-FRI", "M"). The current period is included as a
+    still-forming bar, like today's daily bar.
+    """
+    idx = pd.DatetimeIndex(index)
+    if idx.tz is not None:
+        idx = idx.tz_localize(None)
+    codes  = idx.to_period(freq).asi8
+    starts = np.flatnonzero(np.diff(codes, prepend=codes[0] - 1))
+    ends   = np.append(starts[1:], len(codes)) - 1
+    return (close[ends],
+            np.maximum.reduceat(high, starts),
+            np.minimum.reduceat(low, starts),
+            np.add.reduceat(volume, starts))
+
+
+def calculate_timeframes(price_history: pd.DataFrame) -> dict:
+    """
+    RSI / MACD / Bollinger / SMA20 on weekly and monthly bars.
+    Both timeframes are left-padded into one (bars, 2) matrix and evaluated
+    in a single engine pass (leading NaNs don't affect the last values).
+    """
+    if not isinstance(price_history.index, pd.DatetimeIndex) or price_history.empty:
+        return {}
+    cols = [price_history[c].to_numpy(dtype=np.float64)
+            for c in ("Close", "High", "Low", "Volume")]
+    bars = {name: resample_bars(price_history.index, *cols, freq)
+            for name, freq in TIMEFRAMES.items()}
+
+    length = max(len(b[0]) for b in bars.values())
+    padded = {}
+    for i, key in enumerate(("close", "high", "low", "volume")):
+        matrix = np.full((length, len(bars)), np.nan)
+        for j, b in enumerate(bars.values()):
+            matrix[length - len(b[i]):, j] = b[i]
+        padded[key] = matrix
+    raw = evaluate(padded, TIMEFRAME_SET, last_only=True)
+
+    rounded = {k: np.round(raw[k], 4 if k.startswith("macd") else 2) for k in raw}
+    codes = signal_codes(rounded["rsi"], rounded["macd"], rounded["macd_signal"],
+                         rounded["macd_hist"], raw["close"], np.nan, np.nan,
+                         rounded["bb_position"])
+
+    result = {}
+    for j, name in enumerate(bars):
+        close, sma_20 = raw["close"][j], raw["sma_20"][j]
+        signals = {rule: SIGNAL_NAMES[int(codes[rule][j])] for rule in TIMEFRAME_RULES}
+        result[name] = {
+            "bars": len(bars[name][0]),
+            "rsi": finite_round(raw["rsi"][j], 2),
+            "macd": {"macd": finite_round(raw["macd"][j], 4),
+                     "signal": finite_round(raw["macd_signal"][j], 4),
+                     "histogram": finite_round(raw["macd_hist"][j], 4)},
+            "bb_position_pct": finite_round(raw["bb_position"][j], 2),
+            "sma_20": finite_round(sma_20, 2),
+            "trend": None if not np.isfinite(sma_20) else ("UP" if close > sma_20 else "DOWN"),
+            "signals": signals,
+            "bullish_count": sum(1 for v in signals.values() if v == "BULLISH"),
+            "bearish_count": sum(1 for v in signals.values() if v == "BEARISH"),
+        }
+    return result
+
+
+def calculate_indicators(price_history: pd.DataFrame, raw: dict = None) -> dict:
     """
     Calculate technical indicators from price history.
     Uses same logic as FinRL academic trading framework.
+    Values come from the NumPy engine in last-value mode (tools/indicator_engine.py),
+    unless precomputed `raw` values (e.g. from the incremental state) are passed.
     """
     print(f"  [Technical Agent] Calculating indicators...")
     
     try:
-        df = price_history.copy()
-        close = df['Close']
-        high = df['High']
-        low = df['Low']
-        volume = df['Volume']
+        if raw is None:
+            raw = compute_indicators(
+                price_history['Close'].to_numpy(),
+                price_history['High'].to_numpy(),
+                price_history['Low'].to_numpy(),
+                price_history['Volume'].to_numpy(),
+                last_only=True,
+            )
         
         # ─── RSI ──────────────────────────────────────────────
-        delta = close.diff()
-        gain = delta.where(delta > 0, 0).rolling(config.RSI_PERIOD).mean()
-        loss = -delta.where(delta < 0, 0).rolling(config.RSI_PERIOD).mean()
-        rs = gain / loss
-        rsi = round(float(100 - (100 / (1 + rs.iloc[-1]))), 2)
+        rsi = round(float(raw["rsi"]), 2)
         
         # ─── MACD ─────────────────────────────────────────────
-        ema_fast = close.ewm(span=config.MACD_FAST).mean()
-        ema_slow = close.ewm(span=config.MACD_SLOW).mean()
-        macd_line = ema_fast - ema_slow
-        signal_line = macd_line.ewm(span=config.MACD_SIGNAL).mean()
-        macd_histogram = macd_line - signal_line
-        
-        macd = round(float(macd_line.iloc[-1]), 4)
-        macd_signal = round(float(signal_line.iloc[-1]), 4)
-        macd_hist = round(float(macd_histogram.iloc[-1]), 4)
+        macd = round(float(raw["macd"]), 4)
+        macd_signal = round(float(raw["macd_signal"]), 4)
+        macd_hist = round(float(raw["macd_hist"]), 4)
         
         # ─── Bollinger Bands ──────────────────────────────────
-        bb_mid = close.rolling(config.BBANDS_PERIOD).mean()
-        bb_std = close.rolling(config.BBANDS_PERIOD).std()
-        bb_upper = bb_mid + (2 * bb_std)
-        bb_lower = bb_mid - (2 * bb_std)
-        
-        current_price = close.iloc[-1]
-        bb_position = round(float(
-            (current_price - bb_lower.iloc[-1]) /
-            (bb_upper.iloc[-1] - bb_lower.iloc[-1]) * 100
-        ), 2)
+        current_price = float(raw["close"])
+        bb_position = round(float(raw["bb_position"]), 2)
         
         # ─── Moving Averages ──────────────────────────────────
-        sma_20 = round(float(close.rolling(20).mean().iloc[-1]), 2)
-        sma_50 = round(float(close.rolling(50).mean().iloc[-1]), 2)
-        sma_200 = round(float(close.rolling(200).mean().iloc[-1]), 2)
-        ema_20 = round(float(close.ewm(span=20).mean().iloc[-1]), 2)
+        sma_20 = round(float(raw["sma_20"]), 2)
+        sma_50 = round(float(raw["sma_50"]), 2)
+        sma_200 = round(float(raw["sma_200"]), 2)
+        ema_20 = round(float(raw["ema_20"]), 2)
         
         # ─── Volume Analysis ──────────────────────────────────
-        avg_volume_20 = volume.rolling(20).mean().iloc[-1]
-        current_volume = volume.iloc[-1]
-        volume_ratio = round(float(current_volume / avg_volume_20), 2)
+        avg_volume_20 = raw["volume_avg_20"]
+        current_volume = raw["volume"]
+        volume_ratio = round(float(raw["volume_ratio"]), 2)
         
         # ─── Support & Resistance ─────────────────────────────
-        recent_high = round(float(high.rolling(52).max().iloc[-1]), 2)
-        recent_low = round(float(low.rolling(52).min().iloc[-1]), 2)
+        recent_high = round(float(raw["high_52"]), 2)
+        recent_low = round(float(raw["low_52"]), 2)
         
         # ─── Signal Interpretation ────────────────────────────
-        signals = []
-        
-        # RSI signals
-        if rsi < 30:
-            signals.append({"indicator": "RSI", "signal": "BULLISH", 
-                           "reason": f"Oversold at {rsi}"})
-        elif rsi > 70:
-            signals.append({"indicator": "RSI", "signal": "BEARISH", 
-                           "reason": f"Overbought at {rsi}"})
-        else:
-            signals.append({"indicator": "RSI", "signal": "NEUTRAL", 
-                           "reason": f"Neutral at {rsi}"})
-        
-        # MACD signals
-        if macd_hist > 0 and macd > macd_signal:
-            signals.append({"indicator": "MACD", "signal": "BULLISH",
-                           "reason": "Positive histogram, MACD above signal"})
-        elif macd_hist < 0 and macd < macd_signal:
-            signals.append({"indicator": "MACD", "signal": "BEARISH",
-                           "reason": "Negative histogram, MACD below signal"})
-        else:
-            signals.append({"indicator": "MACD", "signal": "NEUTRAL",
-                           "reason": "Mixed MACD signals"})
-        
-        # Moving average signals
-        if current_price > sma_200 and sma_50 > sma_200:
-            signals.append({"indicator": "MA", "signal": "BULLISH",
-                           "reason": "Price above 200 SMA, golden cross formation"})
-        elif current_price < sma_200 and sma_50 < sma_200:
-            signals.append({"indicator": "MA", "signal": "BEARISH",
-                           "reason": "Price below 200 SMA, death cross formation"})
-        else:
-            signals.append({"indicator": "MA", "signal": "NEUTRAL",
-                           "reason": "Mixed moving average signals"})
-        
-        # Bollinger Band signals
-        if bb_position < 20:
-            signals.append({"indicator": "BBANDS", "signal": "BULLISH",
-                           "reason": f"Price near lower band ({bb_position}%)"})
-        elif bb_position > 80:
-            signals.append({"indicator": "BBANDS", "signal": "BEARISH",
-                           "reason": f"Price near upper band ({bb_position}%)"})
-        else:
-            signals.append({"indicator": "BBANDS", "signal": "NEUTRAL",
-                           "reason": f"Price mid-band ({bb_position}%)"})
+        codes = signal_codes(rsi, macd, macd_signal, macd_hist,
+                             current_price, sma_50, sma_200, bb_position)
+        values = {"rsi": rsi, "bb_position": bb_position}
+        signals = [
+            {"indicator": rule,
+             "signal": SIGNAL_NAMES[int(codes[rule])],
+             "reason": SIGNAL_REASONS[rule][int(codes[rule])].format(**values)}
+            for rule in SIGNAL_RULES
+        ]
         
         # ─── Overall Technical Score ──────────────────────────
-        bullish_count = sum(1 for s in signals if s["signal"] == "BULLISH")
-        bearish_count = sum(1 for s in signals if s["signal"] == "BEARISH")
-        
-        if bullish_count >= 3:
-            overall_signal = "BULLISH"
-        elif bearish_count >= 3:
-            overall_signal = "BEARISH"
-        else:
-            overall_signal = "NEUTRAL"
+        bullish_count = int(codes["bullish_count"])
+        bearish_count = int(codes["bearish_count"])
+        overall_signal = SIGNAL_NAMES[int(codes["overall"])]
         
         return {
             "rsi": rsi,
             "macd": {"macd": macd, "signal": macd_signal, "histogram": macd_hist},
             "bollinger_bands": {
-                "upper": round(float(bb_upper.iloc[-1]), 2),
-                "middle": round(float(bb_mid.iloc[-1]), 2),
-                "lower": round(float(bb_lower.iloc[-1]), 2),
+                "upper": round(float(raw["bb_upper"]), 2),
+                "middle": round(float(raw["bb_middle"]), 2),
+                "lower": round(float(raw["bb_lower"]), 2),
                 "position_pct": bb_position
             },
             "moving_averages": {
@@ -142,6 +251,7 @@ def calculate_indicators(price_history: pd.DataFrame) -> dict:
                 "52w_low": recent_low
             },
             "signals": signals,
+            "timeframes": calculate_timeframes(price_history),
             "overall_signal": overall_signal,
             "bullish_count": bullish_count,
             "bearish_count": bearish_count,
@@ -149,4 +259,128 @@ def calculate_indicators(price_history: pd.DataFrame) -> dict:
         }
         
     except Exception as e:
-        return {"error": str(e), "status": "failed"}
\ No newline at end of file
+        return {"error": str(e), "status": "failed"}
+
+
+# ─── Batch (tickers × days) ───────────────────────────────────
+# One row per ticker: every calculate_indicators value, rounded the same
+# way, plus the rule codes. float32 keeps a 3,000-ticker universe ~400KB.
+BATCH_DTYPE = np.dtype([
+    ("ticker",        "U12"),
+    ("price",         "f4"),
+    ("rsi",           "f4"),
+    ("macd",          "f4"),
+    ("macd_signal",   "f4"),
+    ("macd_hist",     "f4"),
+    ("bb_upper",      "f4"),
+    ("bb_middle",     "f4"),
+    ("bb_lower",      "f4"),
+    ("bb_position",   "f4"),
+    ("sma_20",        "f4"),
+    ("sma_50",        "f4"),
+    ("sma_200",       "f4"),
+    ("ema_20",        "f4"),
+    ("volume",        "f8"),
+    ("volume_avg_20", "f8"),
+    ("volume_ratio",  "f4"),
+    ("high_52",       "f4"),
+    ("low_52",        "f4"),
+    ("sig_rsi",       "i1"),
+    ("sig_macd",      "i1"),
+    ("sig_ma",        "i1"),
+    ("sig_bbands",    "i1"),
+    ("bullish_count", "i1"),
+    ("bearish_count", "i1"),
+    ("overall",       "i1"),
+])
+
+_BATCH_ROUNDING = {
+    "rsi": 2, "macd": 4, "macd_signal": 4, "macd_hist": 4,
+    "bb_upper": 2, "bb_middle": 2, "bb_lower": 2, "bb_position": 2,
+    "sma_20": 2, "sma_50": 2, "sma_200": 2, "ema_20": 2,
+    "volume_ratio": 2, "high_52": 2, "low_52": 2,
+}
+
+
+def stack_price_histories(histories: Dict[str, pd.DataFrame]):
+    """
+    Align per-ticker OHLCV frames on the union of their dates.
+    Returns (tickers, dates, close, high, low, volume); matrices are
+    (days, tickers) with NaN where a ticker has no bar.
+    """
+    tickers = list(histories)
+    frames = {col: pd.concat({t: histories[t][col] for t in tickers}, axis=1).sort_index()
+              for col in ("Close", "High", "Low", "Volume")}
+    dates = frames["Close"].index
+    return (tickers, dates,
+            *(frames[c].reindex(dates).to_numpy(dtype=np.float64)
+              for c in ("Close", "High", "Low", "Volume")))
+
+
+def align_last_bars(close: np.ndarray, *others: np.ndarray):
+    """
+    Shift each column down so its last valid close sits on the bottom row
+    (left-padding with NaN, as calculate_timeframes does). A ticker whose
+    data ends early — halted, delisted, or missing today's bar — is then
+    evaluated on its own last bar instead of a trailing NaN row.
+    """
+    days  = close.shape[0]
+    valid = np.isfinite(close)
+    last  = np.where(valid.any(axis=0), days - 1 - np.argmax(valid[::-1], axis=0), days - 1)
+    shift = days - 1 - last
+    if not shift.any():
+        return (close, *others)
+    rows = np.arange(days)[:, None] - shift[None, :]
+    cols = np.arange(close.shape[1])[None, :]
+    keep = rows >= 0
+    aligned = []
+    for matrix in (close, *others):
+        out = np.full(matrix.shape, np.nan)
+        out[keep] = matrix[np.where(keep, rows, 0), cols][keep]
+        aligned.append(out)
+    return tuple(aligned)
+
+
+def calculate_indicators_batch(close: np.ndarray, high: np.ndarray,
+                               low: np.ndarray, volume: np.ndarray,
+                               tickers: Sequence[str]) -> np.ndarray:
+    """
+    calculate_indicators() for a whole universe at once.
+    Inputs are (days, tickers) matrices on a shared date axis; columns may
+    end on different days (see align_last_bars). Every indicator and every
+    BULLISH/BEARISH rule is evaluated column-wise with no per-ticker loop.
+    Returns a BATCH_DTYPE structured array, one row per ticker.
+    """
+    close, high, low, volume = align_last_bars(close, high, low, volume)
+    raw = compute_indicators(close, high, low, volume, last_only=True)
+    out = np.zeros(len(tickers), dtype=BATCH_DTYPE)
+    out["ticker"] = list(tickers)
+    out["price"]  = raw["close"]
+    for field in ("volume", "volume_avg_20"):
+        out[field] = raw[field]
+    rounded = {k: np.round(raw[k], d) for k, d in _BATCH_ROUNDING.items()}
+    for field, values in rounded.items():
+        out[field] = values
+
+    codes = signal_codes(rounded["rsi"], rounded["macd"], rounded["macd_signal"],
+                         rounded["macd_hist"], raw["close"], rounded["sma_50"],
+                         rounded["sma_200"], rounded["bb_position"])
+    for rule in SIGNAL_RULES:
+        out[f"sig_{rule.lower()}"] = codes[rule]
+    for field in ("bullish_count", "bearish_count", "overall"):
+        out[field] = codes[field]
+    return out
+
+
+def batch_to_records(batch: np.ndarray) -> List[dict]:
+    """Structured batch rows → plain dicts (for JSON responses)."""
+    records = []
+    for row in batch:
+        record = {}
+        for name in batch.dtype.names:
+            value = row[name].item()
+            if batch.dtype[name].kind == "f":
+                value = round(value, _BATCH_ROUNDING.get(name, 2))
+            record[name] = value
+        records.append(record)
+    return records
@@ -0,0 +1,277 @@
+"""
+tools/ticker_index.py — in-process symbol search
+=================================================
+Type-ahead used to hit yf.Search over the network on every keystroke.
+This keeps a local index instead:
+
+    SEC company_tickers_exchange.json + ETF list
+        →  two prefix tries held in memory
+        symbol trie : "NV" → NVDA, NVO, ...
+        name trie   : every word of the company name ("micro" → Microsoft, ...)
+
+Every trie node stores a capped, rank-ordered list of entry ids, so a
+lookup is one walk down the trie — no scan, no sort. If a name word has no
+exact prefix match, the trie is walked again allowing one edit — a wrong,
+missing, extra or transposed character (typo tolerance). The index is
+rebuilt in a background thread once it is older than
+config.SEARCH_INDEX_TTL; queries keep using the previous index meanwhile.
+
+Public API:
+    search_tickers(q, limit)   ← list of {"ticker","name","exchange","type"},
+                                 or None if the index is not built yet
+    ensure_index_fresh()       ← non-blocking; kicks off a rebuild if stale
+    refresh_index()            ← blocking rebuild
+"""
+
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+import config
+from tools.sec_fetcher import fetch_company_tickers
+
+# SEC's list only covers operating companies — add the ETFs people actually search
+ETF_LIST = [
+    ("SPY",  "SPDR S&P 500 ETF Trust"),
+    ("VOO",  "Vanguard S&P 500 ETF"),
+    ("IVV",  "iShares Core S&P 500 ETF"),
+    ("VTI",  "Vanguard Total Stock Market ETF"),
+    ("QQQ",  "Invesco QQQ Trust"),
+    ("DIA",  "SPDR Dow Jones Industrial Average ETF Trust"),
+    ("IWM",  "iShares Russell 2000 ETF"),
+    ("VEA",  "Vanguard FTSE Developed Markets ETF"),
+    ("VWO",  "Vanguard FTSE Emerging Markets ETF"),
+    ("VXUS", "Vanguard Total International Stock ETF"),
+    ("EFA",  "iShares MSCI EAFE ETF"),
+    ("EEM",  "iShares MSCI Emerging Markets ETF"),
+    ("BND",  "Vanguard Total Bond Market ETF"),
+    ("AGG",  "iShares Core US Aggregate Bond ETF"),
+    ("TLT",  "iShares 20+ Year Treasury Bond ETF"),
+    ("SHY",  "iShares 1-3 Year Treasury Bond ETF"),
+    ("LQD",  "iShares iBoxx Investment Grade Corporate Bond ETF"),
+    ("HYG",  "iShares iBoxx High Yield Corporate Bond ETF"),
+    ("TIP",  "iShares TIPS Bond ETF"),
+    ("VIG",  "Vanguard Dividend Appreciation ETF"),
+    ("SCHD", "Schwab US Dividend Equity ETF"),
+    ("VYM",  "Vanguard High Dividend Yield ETF"),
+    ("DVY",  "iShares Select Dividend ETF"),
+    ("VGT",  "Vanguard Information Technology ETF"),
+    ("XLK",  "Technology Select Sector SPDR Fund"),
+    ("XLF",  "Financial Select Sector SPDR Fund"),
+    ("XLE",  "Energy Select Sector SPDR Fund"),
+    ("XLV",  "Health Care Select Sector SPDR Fund"),
+    ("XLY",  "Consumer Discretionary Select Sector SPDR Fund"),
+    ("XLP",  "Consumer Staples Select Sector SPDR Fund"),
+    ("XLI",  "Industrial Select Sector SPDR Fund"),
+    ("XLU",  "Utilities Select Sector SPDR Fund"),
+    ("XLB",  "Materials Select Sector SPDR Fund"),
+    ("XLRE", "Real Estate Select Sector SPDR Fund"),
+    ("XLC",  "Communication Services Select Sector SPDR Fund"),
+    ("VNQ",  "Vanguard Real Estate ETF"),
+    ("SMH",  "VanEck Semiconductor ETF"),
+    ("SOXX", "iShares Semiconductor ETF"),
+    ("ARKK", "ARK Innovation ETF"),
+    ("GLD",  "SPDR Gold Shares"),
+    ("IAU",  "iShares Gold Trust"),
+    ("SLV",  "iShares Silver Trust"),
+    ("USO",  "United States Oil Fund"),
+    ("IBIT", "iShares Bitcoin Trust ETF"),
+    ("RSP",  "Invesco S&P 500 Equal Weight ETF"),
+    ("SPLG", "SPDR Portfolio S&P 500 ETF"),
+    ("VUG",  "Vanguard Growth ETF"),
+    ("VTV",  "Vanguard Value ETF"),
+    ("SCHX", "Schwab US Large-Cap ETF"),
+]
+# everything else in ETF_LIST lists on NYSE Arca
+ETF_NASDAQ = {"QQQ", "VXUS", "BND", "TLT", "SHY", "DVY", "SMH", "SOXX", "IBIT"}
+
+MAX_NODE_ENTRIES = 32     # entry ids kept per trie node (rank ordered)
+FUZZY_MIN_LEN    = 3      # don't typo-correct 1–2 character words
+
+_ENTRIES = ""             # trie key holding a node's entry ids (never a real char)
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+# ── Index ─────────────────────────────────────────────────────────────────────
+
+class TickerIndex:
+    def __init__(self, entries: List[Dict]):
+        # entries arrive best-first; their position is their rank
+        self.entries      = entries
+        self.by_ticker    = {}
+        self.symbol_trie  = {}
+        self.name_trie    = {}
+        self.built_at     = time.time()
+
+        for i, entry in enumerate(entries):
+            ticker = entry["ticker"]
+            if ticker in self.by_ticker:
+                continue
+            self.by_ticker[ticker] = i
+            _trie_insert(self.symbol_trie, ticker, i)
+            for word in set(_WORD_RE.findall(entry["name"].lower())):
+                _trie_insert(self.name_trie, word, i)
+
+    def search(self, q: str, limit: int) -> List[Dict]:
+        hits: List[int] = []
+        seen = set()
+
+        def take(ids):
+            for i in ids:
+                if i not in seen:
+                    seen.add(i)
+                    hits.append(i)
+
+        # 1. Symbol: exact match first, then symbol prefix
+        symbol = q.strip().upper().replace(".", "-")
+        if symbol in self.by_ticker:
+            take([self.by_ticker[symbol]])
+        node = _trie_find(self.symbol_trie, symbol)
+        if node:
+            take(node[_ENTRIES])
+
+        # 2. Name: every query word must prefix-match a word of the name
+        words = _WORD_RE.findall(q.lower())
+        if words and len(hits) < limit:
+            take(self._name_matches(words, fuzzy=False))
+        if words and not hits:
+            take(self._name_matches(words, fuzzy=True))
+
+        return [self.entries[i] for i in hits[:limit]]
+
+    def _name_matches(self, words: List[str], fuzzy: bool) -> List[int]:
+        # Candidates come from the longest (most selective) word;
+        # the remaining words filter them.
+        j    = max(range(len(words)), key=lambda k: len(words[k]))
+        lead = words[j]
+        if fuzzy:
+            if len(lead) < FUZZY_MIN_LEN:
+                return []
+            nodes = []
+            _trie_find_fuzzy(self.name_trie, lead, 0, 1, nodes)
+            candidates = sorted({i for n in nodes for i in n[_ENTRIES]})
+        else:
+            node = _trie_find(self.name_trie, lead)
+            candidates = node[_ENTRIES] if node else []
+
+        rest = words[:j] + words[j + 1:]
+        if not rest:
+            return candidates
+        matched = []
+        for i in candidates:
+            name_words = _WORD_RE.findall(self.entries[i]["name"].lower())
+            if all(any(nw.startswith(w) for nw in name_words) for w in rest):
+                matched.append(i)
+        return matched
+
+
+# ── Trie helpers ──────────────────────────────────────────────────────────────
+# A node is a plain dict: char → child node, plus _ENTRIES → [entry ids].
+
+def _trie_insert(trie: dict, key: str, entry_id: int) -> None:
+    node = trie
+    for ch in key:
+        node = node.setdefault(ch, {_ENTRIES: []})
+        ids = node[_ENTRIES]
+        if len(ids) < MAX_NODE_ENTRIES and (not ids or ids[-1] != entry_id):
+            ids.append(entry_id)
+
+
+def _trie_find(trie: dict, prefix: str) -> Optional[dict]:
+    if not prefix:
+        return None
+    node = trie
+    for ch in prefix:
+        node = node.get(ch)
+        if node is None:
+            return None
+    return node
+
+
+def _trie_find_fuzzy(node: dict, word: str, i: int, edits: int, out: list) -> None:
+    """Collect nodes reachable by consuming `word` with at most `edits` edits."""
+    if i == len(word):
+        if node is not None and _ENTRIES in node:
+            out.append(node)
+        return
+    child = node.get(word[i])
+    if child is not None:
+        _trie_find_fuzzy(child, word, i + 1, edits, out)
+    if not edits:
+        return
+    _trie_find_fuzzy(node, word, i + 1, edits - 1, out)          # extra char typed
+    for ch, child in node.items():
+        if ch == _ENTRIES:
+            continue
+        if ch != word[i]:
+            _trie_find_fuzzy(child, word, i + 1, edits - 1, out)  # wrong char typed
+        _trie_find_fuzzy(child, word, i, edits - 1, out)          # char left out
+    if i + 1 < len(word) and word[i] != word[i + 1]:
+        swapped = node.get(word[i + 1])
+        swapped = swapped.get(word[i]) if swapped else None
+        if swapped is not None:
+            _trie_find_fuzzy(swapped, word, i + 2, edits - 1, out)  # adjacent chars swapped
+
+
+# ── Build / refresh ───────────────────────────────────────────────────────────
+
+_index: Optional[TickerIndex] = None
+_refresh_lock = threading.Lock()
+
+
+def _load_entries() -> List[Dict]:
+    # ETF_LIST holds the most-searched funds, so they rank first: trie nodes
+    # keep only MAX_NODE_ENTRIES ids, and behind ~10k SEC registrants "SP" or
+    # "QQ" would never reach SPY or QQQ.
+    entries = []
+    for ticker, name in ETF_LIST:
+        exchange = "Nasdaq" if ticker in ETF_NASDAQ else "NYSE Arca"
+        entries.append({"ticker": ticker, "name": name, "exchange": exchange, "type": "ETF"})
+    data = fetch_company_tickers()
+    for key in sorted(data, key=int):
+        company = data[key]
+        entries.append({
+            "ticker":   company["ticker"].upper(),
+            "name":     company["title"],
+            "exchange": company.get("exchange", ""),
+            "type":     "EQUITY",
+        })
+    return entries
+
+
+def refresh_index() -> None:
+    """Rebuild the index from SEC data and swap it in atomically."""
+    global _index
+    if not _refresh_lock.acquire(blocking=False):
+        return   # another thread is already rebuilding
+    try:
+        start   = time.time()
+        entries = _load_entries()
+        _index  = TickerIndex(entries)
+        print(f"[Search] Index built: {len(entries)} symbols in {time.time() - start:.1f}s")
+    except Exception as e:
+        print(f"[Search] Index build failed: {e}")
+    finally:
+        _refresh_lock.release()
+
+
+def ensure_index_fresh() -> None:
+    """Start a background rebuild if the index is missing or past its TTL."""
+    if _index and time.time() - _index.built_at < config.SEARCH_INDEX_TTL:
+        return
+    if _refresh_lock.locked():
+        return
+    threading.Thread(target=refresh_index, daemon=True).start()
+
+
+def search_tickers(q: str, limit: int = config.SEARCH_MAX_RESULTS) -> Optional[List[Dict]]:
+    """
+    Autocomplete against the in-memory index.
+    Returns None when no index is available yet (caller should fall back).
+    """
+    ensure_index_fresh()
+    index = _index
+    if index is None:
+        return None
+    return index.search(q, limit)
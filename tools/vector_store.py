@@ -1,14 +1,32 @@
+import json
 import os
+import threading
 import time
+from datetime import date
 import chromadb
-from sentence_transformers import SentenceTransformer
+import numpy as np
 from typing import List, Dict
 import config
+from tools.embedding_backend import load_model, model_id
+from tools.embedding_cache import encode_cached
+from tools.embedding_service import service_encode
 
-# Initialize embedding model once at startup
-print("Loading embedding model...")
-EMBEDDING_MODEL = SentenceTransformer(config.EMBEDDING_MODEL)
-print("Embedding model ready.")
+# Embedding model — loaded on first in-process use only. With the shared
+# embedding service running (python -m tools.embedding_service) this
+# process never loads it.
+_model = None
+_model_lock = threading.Lock()
+
+
+def _get_model():
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                print(f"Loading embedding model ({config.EMBEDDING_BACKEND})...")
+                _model = load_model()
+                print("Embedding model ready.")
+    return _model
 
 # Single persistent ChromaDB client — created once, reused forever
 os.makedirs(config.CHROMA_DB_PATH, exist_ok=True)
@@ -17,6 +35,19 @@ _chroma_client = chromadb.PersistentClient(path=config.CHROMA_DB_PATH)
 # How long before we consider filings stale and re-fetch (7 days)
 COLLECTION_TTL_SECONDS = 7 * 24 * 60 * 60
 
+# One collection for every company when config.SEC_GLOBAL_INDEX is on;
+# otherwise one sec_{ticker} collection per company
+GLOBAL_COLLECTION = "sec_all"
+
+# Topics pulled from every filing for the RAG agent
+INSIGHT_QUERIES = {
+    "risk_factors":   "major risk factors business risks challenges threats",
+    "revenue_growth": "revenue growth sales performance financial results",
+    "guidance":       "forward guidance outlook future expectations forecast",
+    "competition":    "competition competitive landscape market position",
+    "innovation":     "new products innovation research development pipeline",
+}
+
 
 def chunk_text(text: str, chunk_size: int = config.CHUNK_SIZE,
                overlap: int = config.CHUNK_OVERLAP) -> List[str]:
@@ -36,53 +67,101 @@ def chunk_text(text: str, chunk_size: int = config.CHUNK_SIZE,
     return [c for c in chunks if len(c) > 50]
 
 
-def _collection_is_fresh(collection_name: str) -> bool:
+def _collection_name(ticker: str) -> str:
+    return GLOBAL_COLLECTION if config.SEC_GLOBAL_INDEX else f"sec_{ticker.lower()}"
+
+
+def _ticker_where(ticker: str):
+    """Metadata filter selecting one company's chunks in the global index."""
+    return {"ticker": ticker.upper()} if config.SEC_GLOBAL_INDEX else None
+
+
+def chunk_count(collection: chromadb.Collection, ticker: str) -> int:
+    if config.SEC_GLOBAL_INDEX:
+        chunks = _refresh_entry(ticker).get("chunks")
+        if chunks is not None:
+            return chunks
+        return len(collection.get(where=_ticker_where(ticker), include=[])["ids"])
+    return collection.count()
+
+
+# Per-ticker refresh time and chunk count for the global index (a collection
+# has one metadata dict): {TICKER: {"at": epoch, "chunks": n}}. Re-read only
+# when another process has rewritten the file.
+_refreshed_path = os.path.join(config.CHROMA_DB_PATH, f"{GLOBAL_COLLECTION}_refreshed.json")
+_refreshed_lock = threading.RLock()    # guards _refreshed and the side file
+_refreshed     = {"mtime": None, "stamps": {}}
+
+
+def _load_stamps() -> Dict[str, Dict]:
+    with _refreshed_lock:
+        try:
+            mtime = os.path.getmtime(_refreshed_path)
+        except OSError:
+            return {}
+        if mtime != _refreshed["mtime"]:
+            try:
+                with open(_refreshed_path) as f:
+                    stamps = json.load(f)
+            except Exception:
+                return {}
+            # older files stored only the refresh time
+            _refreshed["stamps"] = {t: v if isinstance(v, dict) else {"at": float(v)}
+                                    for t, v in stamps.items()}
+            _refreshed["mtime"]  = mtime
+        return _refreshed["stamps"]
+
+
+def _refresh_entry(ticker: str) -> Dict:
+    return dict(_load_stamps().get(ticker.upper(), {}))
+
+
+def _refreshed_at(ticker: str) -> float:
+    return float(_refresh_entry(ticker).get("at", 0))
+
+
+def _stamp_refreshed(ticker: str, chunks: int) -> None:
+    with _refreshed_lock:
+        stamps = dict(_load_stamps())
+        stamps[ticker.upper()] = {"at": time.time(), "chunks": chunks}
+        tmp = f"{_refreshed_path}.{os.getpid()}.tmp"        # atomic swap, per-process tmp
+        with open(tmp, "w") as f:
+            json.dump(stamps, f)
+        os.replace(tmp, _refreshed_path)
+        _refreshed["stamps"] = stamps
+        _refreshed["mtime"]  = os.path.getmtime(_refreshed_path)
+
+
+def _collection_is_fresh(ticker: str) -> bool:
     """
-    Returns True if the collection exists and was built within COLLECTION_TTL_SECONDS.
-    Checks metadata for a 'built_at' timestamp we store on creation.
+    Returns True if the ticker's chunks exist and were refreshed within COLLECTION_TTL_SECONDS.
+    Per-ticker collections carry a 'built_at' timestamp in their metadata;
+    the global index keeps one per ticker in a side file.
     """
     try:
-        col = _chroma_client.get_collection(collection_name)
-        if col.count() == 0:
+        col   = _chroma_client.get_collection(_collection_name(ticker))
+        count = chunk_count(col, ticker)
+        if count == 0:
             return False
-        built_at = col.metadata.get("built_at", 0)
+        if config.SEC_GLOBAL_INDEX:
+            built_at = _refreshed_at(ticker)
+        else:
+            built_at = col.metadata.get("built_at", 0)
         age = time.time() - float(built_at)
         is_fresh = age < COLLECTION_TTL_SECONDS
         if is_fresh:
-            print(f"  [RAG Agent] Using cached vector store ({int(age/3600)}h old, {col.count()} chunks)")
+            print(f"  [RAG Agent] Using cached vector store ({int(age/3600)}h old, {count} chunks)")
         return is_fresh
     except Exception:
         return False
 
 
-def build_vector_store(ticker: str, filings: List[Dict]) -> chromadb.Collection:
+def chunk_filings(filings: List[Dict], ticker: str = None, cik: str = None):
     """
-    Build ChromaDB vector store from SEC filings.
-    Skips rebuild if a fresh collection already exists on disk.
+    Chunk every filing → (chunks, ids, metadatas), aligned lists.
+    IDs are {TICKER}_{accession}_{i}: share classes (GOOG / GOOGL) file under
+    one CIK, so the accession alone is not unique in the global index.
     """
-    collection_name = f"sec_{ticker.lower()}"
-
-    # ── Cache hit: collection exists and is < 7 days old ──────────────────────
-    if _collection_is_fresh(collection_name):
-        return _chroma_client.get_collection(collection_name)
-
-    # ── Cache miss: build fresh ────────────────────────────────────────────────
-    print(f"  [RAG Agent] Building vector store for {ticker}...")
-
-    # Delete stale collection if it exists
-    try:
-        _chroma_client.delete_collection(collection_name)
-    except Exception:
-        pass
-
-    collection = _chroma_client.create_collection(
-        name=collection_name,
-        metadata={
-            "ticker":   ticker,
-            "built_at": str(time.time()),   # timestamp for freshness check
-        }
-    )
-
     all_chunks    = []
     all_ids       = []
     all_metadata  = []
@@ -92,41 +171,139 @@ def build_vector_store(ticker: str, filings: List[Dict]) -> chromadb.Collection:
         print(f"  [RAG Agent] {filing['type']} ({filing['date']}): {len(chunks)} chunks")
         for i, chunk in enumerate(chunks):
             all_chunks.append(chunk)
-            all_ids.append(f"{filing['type']}_{filing['date']}_{i}")
+            all_ids.append(f"{(ticker or '').upper()}_{filing['accession_number']}_{i}")
             all_metadata.append({
-                "filing_type": filing["type"],
-                "date":        filing["date"],
-                "chunk_index": i,
+                "ticker":           (ticker or "").upper(),
+                "cik":              cik or "",
+                "accession_number": filing["accession_number"],
+                "filing_type":      filing["type"],
+                "date":             filing["date"],
+                "filed":            int(filing["date"].replace("-", "")),   # numeric, for $gte filters
+                "chunk_index":      i,
             })
+    return all_chunks, all_ids, all_metadata
 
-    print(f"  [RAG Agent] Embedding {len(all_chunks)} chunks...")
-    batch_size     = 32
-    all_embeddings = []
-    for i in range(0, len(all_chunks), batch_size):
-        batch      = all_chunks[i:i + batch_size]
-        embeddings = EMBEDDING_MODEL.encode(batch).tolist()
-        all_embeddings.extend(embeddings)
-
-    collection.add(
-        documents  = all_chunks,
-        embeddings = all_embeddings,
-        ids        = all_ids,
-        metadatas  = all_metadata,
+
+def encode_texts(texts: List[str], batch_size: int = 32) -> np.ndarray:
+    """Shared embedding service if it is running, otherwise the in-process model."""
+    vectors = service_encode(texts)
+    if vectors is not None:
+        return vectors
+    return np.asarray(_get_model().encode(texts, batch_size=batch_size), dtype=np.float32)
+
+
+def embed_chunks(chunks: List[str]) -> List[List[float]]:
+    """Embeddings for chunks — only text never embedded before reaches the model."""
+    return encode_cached(chunks, encode_texts, model_id()).tolist()
+
+
+def open_collection(ticker: str) -> chromadb.Collection:
+    if config.SEC_GLOBAL_INDEX:
+        return _chroma_client.get_or_create_collection(name=GLOBAL_COLLECTION)
+    return _chroma_client.get_or_create_collection(
+        name=f"sec_{ticker.lower()}",
+        metadata={"ticker": ticker, "built_at": "0"},
     )
 
-    print(f"  [RAG Agent] Vector store built: {len(all_chunks)} chunks indexed")
+
+def diff_filings(collection: chromadb.Collection, filings: List[Dict], ticker: str,
+                 listed: List[str] = None):
+    """
+    Compare the current filing list with what the collection holds.
+    Returns (filings to embed, chunk ids to delete). `listed` is every
+    accession still in the submissions / retention list, including ones
+    whose text could not be fetched this run (defaults to `filings`).
+    Chunks of accessions that left that list — or written before chunks
+    carried an accession number — are deleted; anything still listed is
+    kept, so a failed fetch never drops an indexed filing.
+    """
+    indexed   = collection.get(where=_ticker_where(ticker), include=["metadatas"])
+    retained  = set(listed or ()) | {f["accession_number"] for f in filings}
+    have      = set()
+    stale_ids = []
+    for chunk_id, meta in zip(indexed["ids"], indexed["metadatas"]):
+        accession = (meta or {}).get("accession_number")
+        if accession in retained:
+            have.add(accession)
+        else:
+            stale_ids.append(chunk_id)
+    return [f for f in filings if f["accession_number"] not in have], stale_ids
+
+
+def update_collection(collection: chromadb.Collection, chunks: List[str], ids: List[str],
+                      metadatas: List[Dict], embeddings, stale_ids: List[str], ticker: str) -> None:
+    """Apply a diff: drop stale chunks, add new ones, stamp the refresh time."""
+    if config.SEC_GLOBAL_INDEX:
+        before = chunk_count(collection, ticker)
+    if stale_ids:
+        collection.delete(ids=stale_ids)
+    if chunks:
+        collection.add(
+            documents  = chunks,
+            embeddings = embeddings,
+            ids        = ids,
+            metadatas  = metadatas,
+        )
+    if config.SEC_GLOBAL_INDEX:
+        _stamp_refreshed(ticker, before - len(stale_ids) + len(chunks))
+    else:
+        collection.modify(metadata={**(collection.metadata or {}),
+                                    "built_at": str(time.time())})   # timestamp for freshness check
+
+
+def build_vector_store(ticker: str, filings: List[Dict], cik: str = None,
+                       listed: List[str] = None) -> chromadb.Collection:
+    """
+    Build or refresh the ChromaDB vector store for a ticker's SEC filings.
+    Skips work if the collection was refreshed recently; otherwise only
+    filings not yet indexed are embedded and dropped filings are deleted.
+    """
+    # ── Cache hit: chunks exist and are < 7 days old ──────────────────────────
+    if _collection_is_fresh(ticker):
+        return _chroma_client.get_collection(_collection_name(ticker))
+
+    # ── Refresh: diff against indexed accessions ──────────────────────────────
+    collection = open_collection(ticker)
+    new_filings, stale_ids = diff_filings(collection, filings, ticker, listed)
+    if not new_filings and not stale_ids:
+        update_collection(collection, [], [], [], [], [], ticker)
+        print(f"  [RAG Agent] Vector store up to date ({chunk_count(collection, ticker)} chunks)")
+        return collection
+
+    print(f"  [RAG Agent] Updating vector store for {ticker}: "
+          f"{len(new_filings)} new filings, {len(stale_ids)} stale chunks")
+
+    all_chunks, all_ids, all_metadata = chunk_filings(new_filings, ticker, cik)
+
+    print(f"  [RAG Agent] Embedding {len(all_chunks)} chunks...")
+    all_embeddings = embed_chunks(all_chunks)
+
+    update_collection(collection, all_chunks, all_ids, all_metadata, all_embeddings, stale_ids, ticker)
+
+    print(f"  [RAG Agent] Vector store updated: {chunk_count(collection, ticker)} chunks indexed")
     return collection
 
 
+def collection_documents(ticker: str, limit: int = None) -> List[str]:
+    """Indexed chunk texts for a ticker (e.g. for backend parity checks)."""
+    try:
+        collection = _chroma_client.get_collection(_collection_name(ticker))
+        return collection.get(where=_ticker_where(ticker), include=["documents"],
+                              limit=limit)["documents"]
+    except Exception:
+        return []
+
+
 def query_vector_store(ticker: str, query: str,
                        top_k: int = config.TOP_K_RESULTS) -> List[Dict]:
     """Retrieve most relevant chunks for a given query."""
     try:
-        collection      = _chroma_client.get_collection(f"sec_{ticker.lower()}")
-        query_embedding = EMBEDDING_MODEL.encode([query]).tolist()
+        collection      = _chroma_client.get_collection(_collection_name(ticker))
+        query_embedding = encode_texts([query]).tolist()
         results         = collection.query(
             query_embeddings = query_embedding,
-            n_results        = min(top_k, collection.count()),
+            n_results        = min(top_k, chunk_count(collection, ticker)),
+            where            = _ticker_where(ticker),
         )
         return [
             {
@@ -141,6 +318,68 @@ def query_vector_store(ticker: str, query: str,
         return []
 
 
+_topic_vectors = {}          # model id → (topics, query embeddings)
+_topic_lock    = threading.Lock()
+
+
+def _topic_embeddings():
+    """INSIGHT_QUERIES embedded once per process (and per backend)."""
+    key = model_id()
+    if key not in _topic_vectors:
+        with _topic_lock:
+            if key not in _topic_vectors:
+                topics = list(INSIGHT_QUERIES)
+                vectors = encode_texts([INSIGHT_QUERIES[t] for t in topics])
+                _topic_vectors[key] = (topics, vectors.tolist())
+    return _topic_vectors[key]
+
+
+def warm_topic_embeddings() -> None:
+    """Load the model and embed INSIGHT_QUERIES at startup, not on the first request."""
+    try:
+        start = time.time()
+        _topic_embeddings()
+        print(f"[RAG] Topic embeddings ready ({time.time() - start:.1f}s)")
+    except Exception as e:
+        print(f"[RAG] Topic embedding warm-up failed: {e}")
+
+
+def query_topics(collection: chromadb.Collection, ticker: str,
+                 per_topic: int = 3) -> Dict[str, List[Dict]]:
+    """
+    All insight topics in one batched collection query. A chunk that
+    matches several topics is kept only for the topic it is closest to,
+    so topics don't repeat the same passage.
+    """
+    topics, vectors = _topic_embeddings()
+    count = chunk_count(collection, ticker)
+    if count == 0:
+        return {}
+    results = collection.query(
+        query_embeddings = vectors,
+        n_results        = min(config.TOP_K_RESULTS * 2, count),
+        where            = _ticker_where(ticker),
+    )
+
+    candidates = sorted(
+        (results["distances"][t][i], t, i)
+        for t in range(len(topics))
+        for i in range(len(results["ids"][t]))
+    )
+    used, picked = set(), {topic: [] for topic in topics}
+    for distance, t, i in candidates:
+        chunk_id = results["ids"][t][i]
+        if chunk_id in used or len(picked[topics[t]]) >= per_topic:
+            continue
+        used.add(chunk_id)
+        picked[topics[t]].append({
+            "text":     results["documents"][t][i],
+            "metadata": results["metadatas"][t][i],
+            "distance": distance,
+        })
+    return {topic: chunks for topic, chunks in picked.items() if chunks}
+
+
 def get_sec_insights(ticker: str, filings_data: Dict) -> Dict:
     """
     Full RAG pipeline: build/load store + query key financial topics.
@@ -150,26 +389,125 @@ def get_sec_insights(ticker: str, filings_data: Dict) -> Dict:
     if filings_data.get("status") != "success":
         return {"error": "No filing data available", "status": "failed"}
 
-    collection = build_vector_store(ticker, filings_data["filings"])
-
-    queries = {
-        "risk_factors":   "major risk factors business risks challenges threats",
-        "revenue_growth": "revenue growth sales performance financial results",
-        "guidance":       "forward guidance outlook future expectations forecast",
-        "competition":    "competition competitive landscape market position",
-        "innovation":     "new products innovation research development pipeline",
-    }
+    collection = build_vector_store(ticker, filings_data["filings"], filings_data.get("cik"),
+                                    filings_data.get("listed_accessions"))
 
     insights = {}
-    for topic, query in queries.items():
-        chunks = query_vector_store(ticker, query)
-        if chunks:
-            context          = " ".join([c["text"] for c in chunks[:3]])
+    try:
+        for topic, chunks in query_topics(collection, ticker).items():
+            context          = " ".join([c["text"] for c in chunks])
             insights[topic]  = context[:1000]
+    except Exception as e:
+        print(f"  [RAG Agent] Query failed: {e}")
 
     return {
         "ticker":               ticker,
         "insights":             insights,
-        "total_chunks_indexed": collection.count(),
+        "total_chunks_indexed": chunk_count(collection, ticker),
         "status":               "success",
-    }
\ No newline at end of file
+    }
+
+
+# ── Cross-company search ──────────────────────────────────────────────────────
+
+def _search_filter(tickers: List[str] = None, forms: List[str] = None, since: str = None):
+    conditions = []
+    if tickers:
+        conditions.append({"ticker": {"$in": [t.upper() for t in tickers]}})
+    if forms:
+        conditions.append({"filing_type": {"$in": list(forms)}})
+    if since:
+        filed = date.fromisoformat(since)            # ValueError unless YYYY-MM-DD
+        conditions.append({"filed": {"$gte": int(filed.strftime("%Y%m%d"))}})
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
+def search_filings(query: str, tickers: List[str] = None, forms: List[str] = None,
+                   since: str = None, limit: int = 10, passages: int = 3) -> Dict:
+    """
+    Semantic search across every indexed company, e.g. "tariff exposure".
+    Returns companies ranked by their closest passage, each with up to
+    `passages` supporting chunks. With the global index this is one
+    filtered ANN query (widened while it spans fewer than `limit`
+    companies); otherwise each sec_{ticker} collection is queried.
+    """
+    if not query.strip():
+        return {"error": "Empty query", "status": "failed"}
+    try:
+        where = _search_filter(tickers, forms, since)
+    except ValueError:
+        return {"error": f"Invalid date {since!r} — expected YYYY-MM-DD", "status": "failed"}
+    vector = encode_texts([query]).tolist()
+    hits   = []
+
+    if config.SEC_GLOBAL_INDEX:
+        try:
+            collection = _chroma_client.get_collection(GLOBAL_COLLECTION)
+        except Exception:
+            return {"error": "Global SEC index is empty", "status": "failed"}
+        total = collection.count()
+        if total == 0:
+            return {"error": "Global SEC index is empty", "status": "failed"}
+        # A few companies can fill the nearest hits; widen the query until it
+        # spans `limit` companies or runs out of matching chunks.
+        n = min(limit * passages * 4, total)
+        while True:
+            results = collection.query(query_embeddings=vector, n_results=n, where=where)
+            hits = list(zip(results["documents"][0], results["metadatas"][0], results["distances"][0]))
+            companies = {meta["ticker"] for _, meta, _ in hits}
+            if len(companies) >= limit or len(hits) < n or n >= total:
+                break
+            n = min(n * 4, total)
+    else:
+        wanted = {t.upper() for t in tickers or []}
+        where  = _search_filter(None, forms, since)
+        for entry in _chroma_client.list_collections():
+            name = entry if isinstance(entry, str) else entry.name
+            if not name.startswith("sec_") or name == GLOBAL_COLLECTION:
+                continue
+            ticker = name[4:].upper()
+            if wanted and ticker not in wanted:
+                continue
+            collection = _chroma_client.get_collection(name)
+            if collection.count() == 0:
+                continue
+            try:
+                results = collection.query(
+                    query_embeddings = vector,
+                    n_results        = min(passages, collection.count()),
+                    where            = where,
+                )
+            except Exception as e:
+                print(f"  [RAG Agent] Search skipped {ticker}: {e}")
+                continue
+            for doc, meta, distance in zip(results["documents"][0], results["metadatas"][0],
+                                           results["distances"][0]):
+                hits.append((doc, {**meta, "ticker": meta.get("ticker") or ticker}, distance))
+
+    companies: Dict[str, Dict] = {}
+    for doc, meta, distance in sorted(hits, key=lambda h: h[2]):
+        company = companies.setdefault(meta["ticker"], {
+            "ticker":   meta["ticker"],
+            "cik":      meta.get("cik", ""),
+            "distance": distance,
+            "passages": [],
+        })
+        if len(company["passages"]) < passages:
+            company["passages"].append({
+                "text":             doc,
+                "filing_type":      meta.get("filing_type"),
+                "date":             meta.get("date"),
+                "accession_number": meta.get("accession_number"),
+                "distance":         distance,
+            })
+
+    ranked = list(companies.values())[:limit]          # insertion order = best distance first
+    return {
+        "query":   query,
+        "results": ranked,
+        "count":   len(ranked),
+        "index":   "global" if config.SEC_GLOBAL_INDEX else "per_ticker",
+        "status":  "success",
+    }
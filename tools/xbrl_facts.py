@@ -0,0 +1,257 @@
+"""
+tools/xbrl_facts.py — multi-year fundamentals from SEC XBRL companyfacts
+=========================================================================
+yfinance `info` gives one snapshot. SEC's companyfacts JSON has every
+reported value of every line item, with filing dates, straight from the
+10-K / 10-Q XBRL. This module keeps what the agents need from it:
+
+    fetch      companyfacts/CIK{cik}.json, once per CIK
+    compact    annual (FY, ~12-month) points of the LINE_ITEMS concepts only,
+               stored as small JSON under output/sec/facts/
+    revalidate facts only change when a new 10-K/10-Q is filed, so the
+               (cached) submissions list is checked first and the facts are
+               re-requested — conditionally, with ETag/Last-Modified — only
+               when a 10-K/10-Q newer than the last one seen at fetch time
+               exists
+    series     annual_series() aligns every line item on fiscal year as
+               NumPy arrays; margins, FCF and growth are array expressions
+"""
+
+import json
+import os
+import time
+from datetime import date, timedelta
+from typing import Dict
+
+import numpy as np
+import config
+from tools.sec_client import sec_get
+from tools.sec_fetcher import get_cik_from_ticker, get_submissions
+from tools.numeric import finite_round
+
+# line item → us-gaap concepts, in priority order (companies switch tags over time)
+LINE_ITEMS = {
+    "revenue":             ["Revenues", "RevenueFromContractWithCustomerExcludingAssessedTax",
+                            "SalesRevenueNet", "RevenueFromContractWithCustomerIncludingAssessedTax"],
+    "gross_profit":        ["GrossProfit"],
+    "operating_income":    ["OperatingIncomeLoss"],
+    "net_income":          ["NetIncomeLoss"],
+    "eps_diluted":         ["EarningsPerShareDiluted"],
+    "operating_cash_flow": ["NetCashProvidedByUsedInOperatingActivities"],
+    "capex":               ["PaymentsToAcquirePropertyPlantAndEquipment"],
+    "cash":                ["CashAndCashEquivalentsAtCarryingValue"],
+    "long_term_debt":      ["LongTermDebtNoncurrent", "LongTermDebt"],
+}
+FACTS_VERSION = 1      # bump when LINE_ITEMS or the compaction changes
+FACT_FORMS    = ("10-K", "10-Q", "10-K/A", "10-Q/A")   # filings that add or restate facts
+FY_END_GRACE_DAYS = 7  # 52/53-week years end up to this many days into January
+
+
+def _facts_path(cik: str) -> str:
+    return os.path.join(config.SEC_CACHE_DIR, "facts", f"CIK{cik}.json")
+
+
+def _is_annual(point: dict) -> bool:
+    if point.get("fp") != "FY" or not str(point.get("form", "")).startswith("10-K"):
+        return False
+    if "start" not in point:                       # balance-sheet (instant) value
+        return True
+    days = (date.fromisoformat(point["end"]) - date.fromisoformat(point["start"])).days
+    return 350 <= days <= 380
+
+
+def compact_facts(raw: dict) -> dict:
+    """Annual points of the tracked concepts: {concept: {"end": [...], "val": [...], "filed": [...]}}."""
+    gaap = raw.get("facts", {}).get("us-gaap", {})
+    out = {}
+    for concept in {c for tags in LINE_ITEMS.values() for c in tags}:
+        units = gaap.get(concept, {}).get("units", {})
+        points = units.get("USD") or units.get("USD/shares") or []
+        by_end = {}
+        for p in points:
+            if _is_annual(p):
+                # restatements: the latest filing for a period wins
+                if p["end"] not in by_end or p["filed"] > by_end[p["end"]]["filed"]:
+                    by_end[p["end"]] = p
+        if by_end:
+            ends = sorted(by_end)
+            out[concept] = {
+                "end":   ends,
+                "val":   [by_end[e]["val"] for e in ends],
+                "filed": [by_end[e]["filed"] for e in ends],
+            }
+    return out
+
+
+def _newest_filing(cik: str) -> str:
+    """filingDate of the company's newest 10-K / 10-Q ("" if unknown)."""
+    try:
+        recent = get_submissions(cik)
+    except Exception:
+        return ""
+    return max((filed for form, filed in zip(recent["form"], recent["filingDate"])
+                if form in FACT_FORMS), default="")
+
+
+def get_company_facts(cik: str) -> dict:
+    """Compact annual facts for a CIK — disk cache, revalidated per new filing."""
+    try:
+        with open(_facts_path(cik)) as f:
+            entry = json.load(f)
+        if entry.get("version") != FACTS_VERSION:
+            entry = None
+    except Exception:
+        entry = None
+
+    if entry and time.time() - entry["checked_at"] < config.SEC_FACTS_TTL:
+        return entry["facts"]
+    # latest_filing: newest 10-K/10-Q in the submissions list when the facts
+    # were last fetched — compared with the list as it is now
+    newest = _newest_filing(cik)
+    if entry and newest and newest <= entry.get("latest_filing", ""):
+        entry["checked_at"] = time.time()        # nothing filed since — no request
+        _save(cik, entry)
+        return entry["facts"]
+
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+
+    try:
+        response = sec_get(f"https://data.sec.gov/api/xbrl/companyfacts/CIK{cik}.json",
+                           headers=headers)
+        if response.status_code == 304 and entry:
+            entry["checked_at"]    = time.time()
+            entry["latest_filing"] = newest
+        else:
+            response.raise_for_status()
+            facts = compact_facts(response.json())
+            entry = {
+                "version":       FACTS_VERSION,
+                "facts":         facts,
+                "latest_filing": newest,
+                "etag":          response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "checked_at":    time.time(),
+            }
+            print(f"  [XBRL] CIK{cik}: {len(facts)} line items cached")
+        _save(cik, entry)
+    except Exception as e:
+        if not entry:
+            raise
+        print(f"  [XBRL] CIK{cik} revalidation failed, using cached facts: {e}")
+    return entry["facts"]
+
+
+def _save(cik: str, entry: dict) -> None:
+    os.makedirs(os.path.dirname(_facts_path(cik)), exist_ok=True)
+    tmp = _facts_path(cik) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(entry, f)
+    os.replace(tmp, _facts_path(cik))
+
+
+# ── Time series ───────────────────────────────────────────────────────────────
+
+def fiscal_year(end: str) -> int:
+    """
+    Fiscal year of a period ending on `end`. 52/53-week years that end in
+    the first days of January belong to the year before, so e.g. ends of
+    2023-01-01 and 2023-12-30 are FY2022 and FY2023, not both 2023.
+    """
+    return (date.fromisoformat(end) - timedelta(days=FY_END_GRACE_DAYS)).year
+
+
+def annual_series(facts: dict, years: int = None) -> Dict[str, np.ndarray]:
+    """
+    Line items aligned on fiscal year (fiscal_year of the period end), last
+    `years` years, NaN where a year wasn't reported — every year in the span
+    gets a slot, so adjacent slots are consecutive years. Concepts later in a
+    LINE_ITEMS list only fill years the preferred concept doesn't cover.
+    """
+    years = years or config.XBRL_YEARS
+    values: Dict[str, Dict[int, float]] = {}
+    for item, concepts in LINE_ITEMS.items():
+        merged = {}
+        for concept in concepts:
+            c = facts.get(concept)
+            if c:
+                for end, val in zip(c["end"], c["val"]):
+                    merged.setdefault(fiscal_year(end), float(val))
+        values[item] = merged
+
+    reported  = {y for m in values.values() for y in m}
+    all_years = list(range(min(reported), max(reported) + 1))[-years:] if reported else []
+    series = {"year": np.array(all_years, dtype=int)}
+    for item, merged in values.items():
+        series[item] = np.array([merged.get(y, np.nan) for y in all_years])
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rev = series["revenue"]
+        series["gross_margin"]     = series["gross_profit"] / rev
+        series["operating_margin"] = series["operating_income"] / rev
+        series["net_margin"]       = series["net_income"] / rev
+        series["free_cash_flow"]   = series["operating_cash_flow"] - series["capex"]
+        series["revenue_growth"]   = np.concatenate([[np.nan], rev[1:] / rev[:-1] - 1])   # slots are consecutive years
+    return series
+
+
+def get_financial_trends(ticker: str, years: int = None) -> dict:
+    """Multi-year trend summary for a ticker (JSON-safe)."""
+    cik = get_cik_from_ticker(ticker)
+    if not cik:
+        return {"error": f"No SEC CIK for {ticker}", "status": "failed"}
+    series = annual_series(get_company_facts(cik), years)
+    if len(series["year"]) == 0:
+        return {"error": f"No annual XBRL facts for {ticker}", "status": "failed"}
+
+    rev = series["revenue"]
+    valid = np.flatnonzero(np.isfinite(rev) & (rev > 0))
+    cagr = np.nan
+    if len(valid) >= 2:
+        first, last = valid[0], valid[-1]
+        cagr = (rev[last] / rev[first]) ** (1 / (series["year"][last] - series["year"][first])) - 1
+
+    return {
+        "ticker":       ticker.upper(),
+        "cik":          cik,
+        "years":        series["year"].tolist(),
+        "series":       {k: [finite_round(v, 4) for v in arr] for k, arr in series.items() if k != "year"},
+        "revenue_cagr": finite_round(cagr, 4),
+        "status":       "success",
+    }
+
+
+def format_trends_summary(trends: dict) -> str:
+    """One line per fiscal year for agent prompts."""
+    if not trends or trends.get("status") != "success":
+        return "Multi-year SEC data unavailable"
+
+    def money(v):
+        if v is None:
+            return "N/A"
+        for div, unit in ((1e12, "T"), (1e9, "B"), (1e6, "M")):
+            if abs(v) >= div:
+                return f"${v / div:.1f}{unit}"
+        return f"${v:,.0f}"
+
+    def pct(v):
+        return "N/A" if v is None else f"{v * 100:.1f}%"
+
+    def eps(v):
+        return "N/A" if v is None else f"${v:.2f}"
+
+    s = trends["series"]
+    lines = []
+    for i, year in enumerate(trends["years"]):
+        lines.append(
+            f"- FY{year}: revenue {money(s['revenue'][i])} (growth {pct(s['revenue_growth'][i])}), "
+            f"gross margin {pct(s['gross_margin'][i])}, operating margin {pct(s['operating_margin'][i])}, "
+            f"net margin {pct(s['net_margin'][i])}, diluted EPS {eps(s['eps_diluted'][i])}, "
+            f"free cash flow {money(s['free_cash_flow'][i])}"
+        )
+    if trends.get("revenue_cagr") is not None:
+        lines.append(f"- Revenue CAGR over the period: {pct(trends['revenue_cagr'])}")
+    return "\n".join(lines)